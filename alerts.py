@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+alerts.py – Streaming-Alarmregeln für Messwerte (eigener Thread, nie im Tk-Thread)
+
+Regeltypen (config.json "alerts": {"rules": [...]}):
+    threshold  {"op": ">" | "<", "value": 1.6}
+    band       {"low": 20, "high": 28}            – Alarm außerhalb des Bands
+    rate       {"max_per_h": 3.0, "window_s": 300} – |Änderung/h| zu groß
+    stale      {"max_age_s": 60}                  – keine gültigen Werte mehr
+Gemeinsam: name, channel, hysteresis, min_duration_s, cooldown_s, actions.
+
+Aktionen: "highlight" (Karte rot umranden), "log", "sound",
+          {"command": "notify-send VPD"}, {"webhook": "http://127.0.0.1:9000/alert"}
+
+Beispiel:
+    "alerts": {"rules": [
+        {"name": "VPD hoch", "channel": "vpd_int", "type": "threshold", "op": ">",
+         "value": 1.6, "hysteresis": 0.05, "min_duration_s": 60, "cooldown_s": 900,
+         "actions": ["highlight", "log", "sound"]}
+    ]}
+Regeln werden bei Änderung von config.json ohne Neustart neu geladen.
+Der Regelzustand (pending/firing/Cooldown) gilt je Gerät – der Collector
+speist mehrere Geräte in eine Engine.
+Aktive Alarme stehen zusätzlich in ALERTS_FILE (für ein angehängtes Dashboard).
+"""
+
+import json
+import os
+import queue
+import shlex
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+import utils
+import async_reader
+import derived
+from rolling_stats import RollingWindow
+
+CHANNELS = tuple(dict.fromkeys(("t_main", "h_main", "vpd_int", "t_ext", "h_ext", "vpd_ext") + derived.KEYS))
+RULE_TYPES = ("threshold", "band", "rate", "stale")
+
+_engine = None
+
+
+def _log(msg):
+    async_reader._log(msg)
+
+
+def channel_values(sample):
+    """Sample → Kanäle wie auf den Karten (h_* = Feuchte mit Offset, derived.py)."""
+    out = {k: sample.get(k) for k in CHANNELS}
+    out["h_main"] = sample.get("h_main_adj")
+    out["h_ext"] = sample.get("h_ext_adj")
+    return out
+
+
+# ===============================================================
+# 📏 REGEL
+# ===============================================================
+class Rule:
+    """Zustände: ok → pending (Bedingung seit `since`) → firing → ok."""
+
+    def __init__(self, spec):
+        self.spec = dict(spec)
+        self.type = spec.get("type", "threshold")
+        if self.type not in RULE_TYPES:
+            raise ValueError(f"unbekannter Regeltyp {self.type!r}")
+        self.channel = spec.get("channel")
+        if self.type != "stale" and self.channel not in CHANNELS:
+            raise ValueError(f"unbekannter Kanal {self.channel!r}")
+        self.name = spec.get("name") or f"{self.channel}:{self.type}"
+        self.hyst = float(spec.get("hysteresis", 0.0))
+        self.min_duration = float(spec.get("min_duration_s", 0.0))
+        self.cooldown = float(spec.get("cooldown_s", 300.0))
+        self.actions = spec.get("actions") or ["log", "highlight"]
+
+        self.state = "ok"
+        self.since = None
+        self.last_fired = None
+        self.last_value = None
+        self.last_seen = time.time()
+        self._rate = None
+        if self.type == "rate":
+            self._rate = RollingWindow(float(spec.get("window_s", 300)), buckets=10)
+
+    def key(self):
+        return json.dumps(self.spec, sort_keys=True)
+
+    # --- Bedingung (mit Hysterese: aktive Regeln brauchen Abstand zum Lösen) ---
+    def _condition(self, value, now):
+        active = self.state == "firing"
+        h = self.hyst if active else 0.0
+        t = self.type
+        if t == "stale":
+            return now - self.last_seen > float(self.spec.get("max_age_s", 60))
+        if value is None:
+            return active  # kein Wert → Zustand halten (dafür gibt es "stale")
+        if t == "threshold":
+            limit = float(self.spec["value"])
+            if self.spec.get("op", ">") == "<":
+                return value < limit + h
+            return value > limit - h
+        if t == "band":
+            return value < float(self.spec["low"]) + h or value > float(self.spec["high"]) - h
+        if t == "rate":
+            rate = self._rate.result()
+            rate = rate and rate["rate_h"]
+            if rate is None:
+                return active
+            self.last_value = rate
+            return abs(rate) > float(self.spec["max_per_h"]) - h
+        return False
+
+    def evaluate(self, values, now):
+        """Gibt "fire", "resolve" oder None zurück. O(1)."""
+        value = values.get(self.channel) if values is not None and self.channel else None
+        if values is not None:
+            if self.type == "stale":
+                if self.channel is None or value is not None:
+                    self.last_seen = now
+            elif value is not None:
+                self.last_value = value
+                self.last_seen = now
+                if self._rate is not None:
+                    self._rate.add(now, value)
+
+        cond = self._condition(value, now)
+        if cond:
+            if self.state == "ok":
+                self.state, self.since = "pending", now
+            if self.state == "pending" and now - self.since >= self.min_duration:
+                if self.last_fired is not None and now - self.last_fired < self.cooldown:
+                    return None  # Cooldown – bleibt pending, feuert danach
+                self.state, self.last_fired = "firing", now
+                return "fire"
+        elif self.state == "firing":
+            self.state, self.since = "ok", None
+            return "resolve"
+        else:
+            self.state, self.since = "ok", None
+        return None
+
+
+# ===============================================================
+# 🔔 AKTIONEN
+# ===============================================================
+def _play_sound(path=None):
+    path = path or getattr(config, "ALERT_SOUND", None)
+    try:
+        if sys.platform.startswith("win"):
+            import winsound
+            if path:
+                winsound.PlaySound(str(path), winsound.SND_FILENAME | winsound.SND_ASYNC)
+            else:
+                winsound.MessageBeep()
+            return
+        if path and sys.platform == "darwin":
+            subprocess.Popen(["afplay", str(path)])
+            return
+        if path:
+            subprocess.Popen(["paplay", str(path)], stderr=subprocess.DEVNULL)
+            return
+    except Exception as e:
+        _log(f"⚠️ Alarm-Sound fehlgeschlagen: {e}")
+    sys.stdout.write("\a")
+    sys.stdout.flush()
+
+
+def _run_command(cmd, event):
+    env = dict(os.environ, ALERT_NAME=event["rule"], ALERT_STATE=event["state"],
+               ALERT_DEVICE=str(event.get("device") or ""),
+               ALERT_CHANNEL=str(event.get("channel")), ALERT_VALUE=str(event.get("value")))
+    args = shlex.split(cmd) if isinstance(cmd, str) else list(cmd)
+    subprocess.Popen(args, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _post_webhook(url, event):
+    body = json.dumps(event).encode("utf-8")
+    req = urllib.request.Request(url, data=body, method="POST",
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=5) as resp:
+        resp.read()
+
+
+# ===============================================================
+# ⚙️ ENGINE
+# ===============================================================
+class AlertEngine:
+    """Bekommt Samples per feed() (Reader-Listener), wertet im eigenen Thread aus.
+    self.rules sind die geladenen Regeln; ausgewertet wird je Gerät eine eigene
+    Kopie (_device_rules), damit sich Zustände mehrerer Geräte nicht mischen."""
+
+    def __init__(self, config_path=None, alerts_file=None):
+        self.config_path = str(config_path or config.CONFIG_FILE)
+        self.alerts_file = str(alerts_file or getattr(config, "ALERTS_FILE",
+                                                      config.DATA_DIR / "alerts.json"))
+        self.rules = []
+        self._device_rules = {}  # device_id → [Rule] (None = vor dem ersten Sample)
+        self._queue = queue.Queue(maxsize=1000)
+        self._stop = threading.Event()
+        self._thread = None
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="alert-action")
+        self._cfg_mtime = None
+        self._active = {}      # Kanal → [Regelnamen] (highlight)
+        self._lock = threading.Lock()
+
+    # --- Regeln laden / Hot-Reload ---
+    def reload(self, force=False):
+        try:
+            mtime = os.path.getmtime(self.config_path)
+        except OSError:
+            mtime = None
+        if not force and mtime == self._cfg_mtime:
+            return False
+        self._cfg_mtime = mtime
+        cfg = utils.safe_read_json(self.config_path) or {}
+        sec = cfg.get("alerts") or {}
+        specs = sec.get("rules", getattr(config, "ALERT_RULES", [])) if sec.get("enabled", True) else []
+
+        rules = []
+        for spec in specs:
+            try:
+                rule = Rule(spec)
+            except Exception as e:
+                _log(f"⚠️ Alarmregel ungültig ({spec.get('name', spec)}): {e}")
+                continue
+            rules.append(rule)
+        if [r.key() for r in rules] != [r.key() for r in self.rules]:
+            _log(f"🔔 Alarmregeln geladen: {len(rules)}")
+        self.rules = rules
+        for device_id, dev_rules in self._device_rules.items():
+            kept = {r.key(): r for r in dev_rules}  # unveränderte Regel behält Zustand
+            self._device_rules[device_id] = [kept.get(r.key()) or Rule(r.spec) for r in rules]
+        self._sync_active()
+        return True
+
+    # --- Eingang ---
+    def feed(self, sample):
+        """Reader-Listener: nur einreihen (nicht blockierend)."""
+        try:
+            self._queue.put_nowait(sample)
+        except queue.Full:
+            pass
+
+    def start(self):
+        self.reload(force=True)
+        async_reader.add_sample_listener(self.feed)
+        self._thread = threading.Thread(target=self._worker, name="alerts", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        async_reader.remove_sample_listener(self.feed)
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._pool.shutdown(wait=False)
+
+    def _rules_for(self, device_id):
+        rules = self._device_rules.get(device_id)
+        if rules is None:
+            # das erste Gerät übernimmt den Zustand von vor dem ersten Sample (stale)
+            rules = self._device_rules.pop(None, None) if device_id is not None else None
+            if rules is None:
+                rules = [Rule(r.spec) for r in self.rules]
+            self._device_rules[device_id] = rules
+        return rules
+
+    def _worker(self):
+        interval = float(getattr(config, "ALERT_RELOAD_INTERVAL", 2.0))
+        next_reload = time.monotonic() + interval
+        while not self._stop.is_set():
+            try:
+                sample = self._queue.get(timeout=1.0)
+                batch = [(sample.get("device_id"), channel_values(sample))]
+            except queue.Empty:
+                # Tick ohne Sample → nur stale-Regeln relevant, für jedes bekannte Gerät
+                batch = [(device_id, None) for device_id in list(self._device_rules) or [None]]
+            now = time.time()
+            for device_id, values in batch:
+                for rule in self._rules_for(device_id):
+                    if values is None and rule.type != "stale":
+                        continue
+                    try:
+                        event = rule.evaluate(values, now)
+                    except Exception as e:
+                        _log(f"⚠️ Alarmregel {rule.name}: {e}")
+                        continue
+                    if event:
+                        self._dispatch(rule, event, now, device_id)
+            if time.monotonic() >= next_reload:
+                next_reload = time.monotonic() + interval
+                self.reload()
+
+    # --- Aktionen ---
+    def _dispatch(self, rule, state, now, device_id=None):
+        event = {"rule": rule.name, "state": state, "channel": rule.channel,
+                 "type": rule.type, "value": rule.last_value, "ts": now, "device": device_id}
+        where = f" [{device_id}]" if device_id and len(self._device_rules) > 1 else ""
+        for action in rule.actions:
+            try:
+                if action == "log":
+                    icon = "🚨" if state == "fire" else "✅"
+                    val = "" if rule.last_value is None else f" ({rule.last_value:.2f})"
+                    _log(f"{icon} Alarm {rule.name}{val}{where}: "
+                         f"{'ausgelöst' if state == 'fire' else 'aufgehoben'}")
+                elif action == "highlight":
+                    pass  # über _sync_active
+                elif action == "sound":
+                    if state == "fire":
+                        self._submit(_play_sound, rule.spec.get("sound"))
+                elif isinstance(action, dict) and "command" in action:
+                    self._submit(_run_command, action["command"], event)
+                elif isinstance(action, dict) and "webhook" in action:
+                    self._submit(_post_webhook, action["webhook"], event)
+            except Exception as e:
+                _log(f"⚠️ Alarm-Aktion {action!r} fehlgeschlagen: {e}")
+        self._sync_active()
+
+    def _submit(self, func, *args):
+        """Langsame Aktionen (Prozess, HTTP) im Pool – Auswertung läuft weiter."""
+        def run():
+            try:
+                func(*args)
+            except Exception as e:
+                _log(f"⚠️ Alarm-Aktion {func.__name__} fehlgeschlagen: {type(e).__name__}: {e}")
+        self._pool.submit(run)
+
+    def _sync_active(self):
+        active = {}
+        for dev_rules in list(self._device_rules.values()):
+            for r in dev_rules:
+                if r.state == "firing" and "highlight" in r.actions and r.channel:
+                    names = active.setdefault(r.channel, [])
+                    if r.name not in names:
+                        names.append(r.name)
+        with self._lock:
+            if active == self._active:
+                return
+            self._active = active
+        utils.safe_write_json(self.alerts_file, {"active": active, "updated": time.time()})
+
+    def active(self):
+        with self._lock:
+            return {k: list(v) for k, v in self._active.items()}
+
+
+# ===============================================================
+# 🌐 MODUL-API
+# ===============================================================
+def start_engine():
+    global _engine
+    if _engine is None:
+        _engine = AlertEngine().start()
+    return _engine
+
+
+def stop_engine():
+    global _engine
+    if _engine is not None:
+        _engine.stop()
+        _engine = None
+
+
+def any_active():
+    """True, wenn die laufende Engine einen aktiven Alarm hat (ohne Dateizugriff)."""
+    return _engine is not None and bool(_engine.active())
+
+
+def active_channels():
+    """{kanal: [regeln]} – aus der laufenden Engine oder (angehängt) aus ALERTS_FILE."""
+    if _engine is not None:
+        return _engine.active()
+    path = getattr(config, "ALERTS_FILE", config.DATA_DIR / "alerts.json")
+    return (utils.safe_read_json(path) or {}).get("active", {})
@@ -5,7 +5,6 @@ async_reader.py – stabile Version mit automatischem Reconnect bei externem Sen
 """
 
 import asyncio
-import datetime
 import traceback
 import threading
 import os
@@ -13,12 +12,15 @@ import sys
 import time
 
 try:
-    from . import utils, config
+    from . import utils, config, perf, metrics, thermo_clients, sinks, filters, derived, calibration, status, scheduler, connections, samples
 except ImportError:
-    import utils, config
+    import utils, config, perf, metrics, thermo_clients, sinks, filters, derived, calibration, status, scheduler, connections, samples
 
 _log_callback = None
 _status_callback = None
+_sample_listeners = []   # func(sample_dict) – nach jeder Messung (Reader-Thread!)
+_status_listeners = []   # func(status_dict) – bei jedem Statusübergang (status.py)
+_tickers = {}            # device_id -> scheduler.Ticker (Jitter-Statistik)
 
 def set_log_callback(func):
     global _log_callback
@@ -28,6 +30,51 @@ def set_status_callback(func):
     global _status_callback
     _status_callback = func
 
+def add_sample_listener(func):
+    """Registriert func(sample) für jede neue Messung. Läuft im Reader-Thread –
+    Listener müssen schnell sein bzw. selbst in ihren Thread/Loop übergeben."""
+    if func not in _sample_listeners:
+        _sample_listeners.append(func)
+
+
+def remove_sample_listener(func):
+    try:
+        _sample_listeners.remove(func)
+    except ValueError:
+        pass
+
+
+def add_status_listener(func):
+    if func not in _status_listeners:
+        _status_listeners.append(func)
+
+
+def remove_status_listener(func):
+    try:
+        _status_listeners.remove(func)
+    except ValueError:
+        pass
+
+
+def tick_stats():
+    """Takt-Jitter je Gerät (scheduler.Ticker.stats) – für Overlay/Diagnose."""
+    return {device: ticker.stats() for device, ticker in list(_tickers.items())}
+
+
+def _alert_active():
+    # nicht importieren: alerts importiert async_reader – nur nutzen, wenn geladen
+    mod = sys.modules.get("alerts")
+    return bool(mod is not None and mod.any_active())
+
+
+def _notify(listeners, obj):
+    for func in list(listeners):
+        try:
+            func(obj)
+        except Exception:
+            pass
+
+
 def _log(msg):
     print(msg)
     if _log_callback:
@@ -60,38 +107,40 @@ def resource_path(relative_path: str) -> str:
 # -------------------------------------------------------------------
 _running = False
 _thread = None
+_loop = None           # Event-Loop des Reader-Threads (für stop_reader)
+_task = None           # laufender _read_loop-Task
 _stop_event = threading.Event()
 STATUS_FILE = resource_path(getattr(config, "STATUS_FILE", "status.json"))
 
-# Wir merken uns den vorherigen Zustand des externen Sensors:
-_last_sensor_ok_ext = [False]
+
+def default_paths():
+    """Standard-Ausgabedateien (GUI-Kompatibel): DATA_FILE, HISTORY_FILE, STATUS_FILE."""
+    return {
+        "data": resource_path(config.DATA_FILE),
+        "history": resource_path(config.HISTORY_FILE),
+        "status": STATUS_FILE,
+    }
+
+
+def device_paths(device_id):
+    """Eigene Ausgabedateien für weitere Geräte (Collector mit mehreren Readern)."""
+    safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(device_id))
+    base = os.path.join(str(config.DATA_DIR), "devices", safe)
+    os.makedirs(base, exist_ok=True)
+    return {
+        "data": os.path.join(base, os.path.basename(str(config.DATA_FILE))),
+        "history": os.path.join(base, os.path.basename(str(config.HISTORY_FILE))),
+        "status": os.path.join(base, os.path.basename(str(config.STATUS_FILE))),
+    }
 
 
 # -------------------------------------------------------------------
 # Hilfsfunktionen
 # -------------------------------------------------------------------
-def sanitize(value):
-    if value is None:
-        return None
-    try:
-        v = float(value)
-        if -0.07 <= v <= 0.07:
-            return None
-        return v
-    except Exception:
-        return None
-
-
-def _clear_data_file():
-    """Leert thermo_values.json (DATA_FILE)."""
+def _clear_data_file(path=None):
+    """Leert thermo_values.json (DATA_FILE) – über den JSON-Sink, falls aktiv."""
     try:
-        utils.safe_write_json(resource_path(config.DATA_FILE), {
-            "timestamp": None,
-            "t_main": None,
-            "h_main": None,
-            "t_ext": None,
-            "h_ext": None,
-        })
+        sinks.clear_mirror(path or resource_path(config.DATA_FILE))
         _log("🧹 DATA_FILE geleert (Verbindungsverlust oder Sensor-Wechsel).")
     except Exception as e:
         _log(f"⚠️ DATA_FILE konnte nicht geleert werden: {e}")
@@ -117,10 +166,11 @@ def _trigger_chart_reset():
             _log("✅ Chart-Frame über builtins._vivosun_chart_frame zurückgesetzt.")
             return
 
-        # 3️⃣ Fallback: Direktes Importieren von charts_gui (wenn geladen)
+        # 3️⃣ Fallback: charts_gui nur nutzen, wenn schon geladen
+        #    (kein Import → headless Collector zieht kein matplotlib/tkinter)
         try:
-            import main_gui.charts_gui as charts_gui
-            if hasattr(charts_gui, "data_buffers"):
+            charts_gui = sys.modules.get("main_gui.charts_gui")
+            if charts_gui is not None and hasattr(charts_gui, "data_buffers"):
                 for key, buf in charts_gui.data_buffers.items():
                     if isinstance(buf, list):
                         buf.clear()
@@ -137,36 +187,36 @@ def _trigger_chart_reset():
         _log(f"⚠️ Fehler beim Chart-Reset aus async_reader: {e}")
 
 
-def _update_status(connected: bool, sensor_ok_main: bool, sensor_ok_ext: bool):
-    """Schreibt status.json neu, erkennt externe Sensor-Wechsel und triggert Reconnect."""
+def _update_status(connected: bool, sensor_ok_main: bool, sensor_ok_ext: bool, paths=None):
+    """
+    Meldet den Status an den Zustandsautomaten (status.py). status.json wird nur
+    bei echten Übergängen geschrieben; nur dann laufen Listener und Aufräumlogik.
+    """
     try:
-        global _last_sensor_ok_ext
-
-        data = {
-            "connected": connected,
-            "sensor_ok_main": sensor_ok_main,
-            "sensor_ok_ext": sensor_ok_ext,
-            "sensor_ok": sensor_ok_main or sensor_ok_ext
-        }
+        paths = paths or default_paths()
+        status_file = paths["status"]
+        transition = status.publisher(status_file).update(connected, sensor_ok_main, sensor_ok_ext)
+        if transition is None:
+            return
 
-        utils.safe_write_json(STATUS_FILE, data)
+        data = transition["status"]
+        prev = transition["prev"] or {}
         _status(connected)
+        _notify(_status_listeners, dict(data, status_file=status_file))
 
         # 🧹 Bei kompletter Trennung → Daten löschen
         if not connected:
-            _clear_data_file()
+            _clear_data_file(paths["data"])
 
         # 🔁 Externer Sensor von False → True → Soft-Reconnect
-        if sensor_ok_ext and not _last_sensor_ok_ext[0]:
+        if sensor_ok_ext and not prev.get("sensor_ok_ext", False):
             _log("🔁 Externer Sensor wieder erkannt – Soft-Reconnect & Chart-Reset.")
             _trigger_chart_reset()
 
         # 🧹 Externer Sensor entfernt → Datenfile leeren
-        elif not sensor_ok_ext and _last_sensor_ok_ext[0]:
+        elif not sensor_ok_ext and prev.get("sensor_ok_ext", False):
             _log("🧹 Externer Sensor entfernt – DATA_FILE leeren.")
-            _clear_data_file()
-
-        _last_sensor_ok_ext[0] = sensor_ok_ext
+            _clear_data_file(paths["data"])
 
     except Exception as e:
         _log(f"⚠️ Fehler im Status-Update: {e}")
@@ -175,45 +225,118 @@ def _update_status(connected: bool, sensor_ok_main: bool, sensor_ok_ext: bool):
 # -------------------------------------------------------------------
 # Haupt-Async-Loop (mit Sensor-Reset-Erkennung)
 # -------------------------------------------------------------------
-_sensor_reset_pending = False  # globales Flag außerhalb der Schleifen
-
-async def _read_loop(device_id, log_callback=None):
-    from vivosun_thermo import (
-        VivosunThermoClient,
-        PROBE_MAIN,
-        PROBE_EXTERNAL,
-        UNIT_CELSIUS,
-    )
 
-    SCAN_INTERVAL = getattr(config, "SCAN_INTERVAL", 5)
-    RECONNECT_DELAY = getattr(config, "RECONNECT_DELAY", 10)
+async def _read_loop(device_id, log_callback=None, client_factory=None, paths=None, detach_flush=False):
+    """
+    client_factory: optionaler Ersatz für VivosunThermoClient (z. B. Fake-Client
+    im Benchmark). Er muss PROBE_MAIN, PROBE_EXTERNAL und UNIT_CELSIUS als
+    Attribute tragen. Ohne Angabe entscheidet config.json "backend"
+    (ble / sim / replay, siehe thermo_clients.py).
+    paths: Ausgabedateien {"data", "history", "status"} – Standard: default_paths().
+    Messwerte gehen über die Sink-Pipeline (sinks.py, config.json "sinks").
+    detach_flush: beim Stoppen Sinks in eigenem Thread flushen (stop_reader()
+    wartet dann nur auf den Reader, nicht auf langsame Sinks).
+    """
+    if client_factory is None:
+        client_factory = thermo_clients.client_factory_from_config()
+        if client_factory is not None:
+            _log(f"🧪 Client-Backend: {client_factory!r}")
+    if client_factory is None:
+        import vivosun_thermo
+        VivosunThermoClient = vivosun_thermo.VivosunThermoClient
+        consts = vivosun_thermo
+    else:
+        VivosunThermoClient = consts = client_factory
+    paths = paths or default_paths()
+    pipeline = sinks.pipeline_from_config(paths=paths)
+    _log(f"💾 Sinks: {', '.join(s.name for s in pipeline.sinks) or '–'}")
+    try:
+        await _read_loop_inner(device_id, VivosunThermoClient, consts, paths, pipeline)
+    finally:
+        timeout = getattr(config, "SINK_FLUSH_TIMEOUT", 5.0)
+        if detach_flush and _stop_event.is_set():
+            # nicht-daemon → der Prozess wartet beim Beenden auf den Flush, das Fenster nicht
+            threading.Thread(target=pipeline.close, args=(timeout,), name="sink-flush",
+                             daemon=False).start()
+        else:
+            # Flush im Executor → der Event-Loop (HTTP-API, weitere Reader) läuft weiter
+            await asyncio.get_running_loop().run_in_executor(None, pipeline.close, timeout)
+
+
+async def _read_loop_inner(device_id, VivosunThermoClient, consts, paths, pipeline):
+    PROBE_MAIN = consts.PROBE_MAIN
+    PROBE_EXTERNAL = consts.PROBE_EXTERNAL
+    UNIT_CELSIUS = consts.UNIT_CELSIUS
 
     last_ext_state = None  # Merkt sich den letzten Sensorstatus
+    sample_filter = filters.SampleFilter()  # Bereich / Spikes / Hänger je Kanal
+    was_connected = False  # für vivosun_reconnects_total
+    seq = 0                # fortlaufende Sample-Nummer (über Reconnects hinweg)
+    adaptive = scheduler.AdaptiveRate()  # schnell bei Änderung/Alarm, langsam wenn stabil
+    time_scale = 1.0       # Zeitraffer (Simulator/Replay), echte Geräte = 1.0
+    conn = connections.profile(device_id)  # letzte Verbindung, TTFS, schneller Reconnect
+    sensor_reset_pending = False           # je Gerät – der Collector liest mehrere auf einer Loop
+    path = "full"          # "fast" = kurz nach einem Aussetzer (connections.next_delay)
 
     while _running and not _stop_event.is_set():
+        attempt_t0 = time.monotonic()
+        first_sample = True
         try:
             async with VivosunThermoClient(device_id) as client:
-                _log(f"✅ Connected to device {device_id}")
-                _update_status(True, False, False)
+                connect_s = time.monotonic() - attempt_t0
+                _log(f"✅ Connected to device {device_id} ({connect_s:.2f}s)")
+                _update_status(True, False, False, paths)
+                metrics.connected.set(1, device=device_id)
+                if was_connected:
+                    metrics.reconnects.inc(device=device_id)
+                was_connected = True
+                time_scale = float(getattr(client, "time_scale", 1.0)) or 1.0
+                clock = getattr(client, "clock", time.time)
+                # Fester Takt (scheduler.py): Intervall adaptiv/live aus config.json, BLE-Latenz driftet nicht
+                ticker = _tickers[device_id] = scheduler.Ticker(adaptive.interval, time_scale, device=device_id)
 
                 while _running and not _stop_event.is_set():
                     try:
-                        global _sensor_reset_pending
-
                         # --- Prüfe, ob Sensor-Reset markiert wurde ---
-                        if _sensor_reset_pending:
+                        if sensor_reset_pending:
                             _log("🧹 Sensor-Reset aktiv – DATA_FILE leeren & Charts zurücksetzen …")
-                            _clear_data_file()
+                            _clear_data_file(paths["data"])
                             _trigger_chart_reset()
-                            _sensor_reset_pending = False
+                            sensor_reset_pending = False
                             await asyncio.sleep(2)
+                            ticker.reset()
                             continue
 
+                        # --- Auf den nächsten Takt warten ---
+                        if await ticker.wait():
+                            perf.count("read_late")
+
                         # --- Sensorwerte lesen ---
-                        t_main = sanitize(await client.current_temperature(PROBE_MAIN, UNIT_CELSIUS))
-                        h_main = sanitize(await client.current_humidity(PROBE_MAIN))
-                        t_ext  = sanitize(await client.current_temperature(PROBE_EXTERNAL, UNIT_CELSIUS))
-                        h_ext  = sanitize(await client.current_humidity(PROBE_EXTERNAL))
+                        cycle_t0 = time.perf_counter()
+                        with perf.timer("ble_read"):
+                            raw = {
+                                "t_main": await client.current_temperature(PROBE_MAIN, UNIT_CELSIUS),
+                                "h_main": await client.current_humidity(PROBE_MAIN),
+                                "t_ext":  await client.current_temperature(PROBE_EXTERNAL, UNIT_CELSIUS),
+                                "h_ext":  await client.current_humidity(PROBE_EXTERNAL),
+                            }
+                        metrics.read_latency.observe(time.perf_counter() - cycle_t0, device=device_id)
+                        perf.count("samples")
+
+                        # --- Plausibilität: Werte bleiben roh, Auffälligkeiten als Flag ---
+                        sample_ts = clock()
+                        values, quality = sample_filter.apply(raw, sample_ts)
+
+                        # --- Kalibrierprofil je Gerät/Kanal (calibration.py, Hot-Reload) ---
+                        profile = calibration.profile_for(device_id)
+                        uncalibrated = values
+                        if profile:
+                            values = profile.apply(values)
+                        t_main, h_main = values["t_main"], values["h_main"]
+                        t_ext, h_ext = values["t_ext"], values["h_ext"]
+                        for ch, flag in quality.items():
+                            if filters.is_suspect(flag):
+                                perf.count(f"filter.{flag}")
 
                         # --- Sensorstatus bestimmen ---
                         sensor_ok_main = (t_main is not None and h_main is not None)
@@ -224,50 +347,74 @@ async def _read_loop(device_id, log_callback=None):
                             last_ext_state = sensor_ok_ext
                         elif last_ext_state != sensor_ok_ext:
                             last_ext_state = sensor_ok_ext
-                            _sensor_reset_pending = True
+                            sensor_reset_pending = True
                             if sensor_ok_ext:
                                 _log("🔁 Externer Sensor erkannt – Soft-Reconnect & Chart-Reset markiert.")
                             else:
                                 _log("🔌 Externer Sensor entfernt – Chart-Reset markiert.")
 
                         # --- Statusdatei aktualisieren ---
-                        _update_status(True, sensor_ok_main, sensor_ok_ext)
-
-                        # --- Daten speichern ---
-                        payload = {
-                            "timestamp": datetime.datetime.utcnow().isoformat(),
-                            "t_main": t_main,
-                            "h_main": h_main,
-                            "t_ext":  t_ext,
-                            "h_ext":  h_ext,
-                        }
-                        utils.safe_write_json(resource_path(config.DATA_FILE), payload)
-
-                        # --- CSV Logging (optional) ---
-                        ts_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        vpd = utils.calc_vpd(t_main, h_main) if sensor_ok_main else None
-                        utils.append_csv_row(
-                            resource_path(config.HISTORY_FILE),
-                            ["Timestamp", "Temperature", "Humidity", "VPD"],
-                            [ts_str, t_main, h_main, vpd],
-                        )
+                        _update_status(True, sensor_ok_main, sensor_ok_ext, paths)
+
+                        # --- Nächstes Intervall (adaptiv) – GUI richtet ihre Redraws danach ---
+                        interval = adaptive.update(values, sample_ts, alert=_alert_active())
+                        metrics.sample_interval.set(interval, device=device_id)
+
+                        # --- Datensatz (samples.Sample) + abgeleitete Kanäle (VPD, Taupunkt …) ---
+                        seq += 1
+                        record = samples.Sample.build(device_id, seq, sample_ts, values, quality,
+                                                      round(interval / time_scale, 3), derived.derive(values))
+                        extra = {"cal": profile.version}
+                        if profile:
+                            extra["raw"] = uncalibrated
+                        sample = record.as_dict(**extra)
+
+                        # --- An Sinks übergeben (JSON, CSV, SQLite … – nur Einreihen) ---
+                        pipeline.publish(sample)
+                        metrics.observe_sample(sample)
+                        _notify(_sample_listeners, sample)
+                        perf.record("read_cycle", time.perf_counter() - cycle_t0)
+
+                        # --- Zeit bis zum ersten Sample je Verbindungsversuch ---
+                        if first_sample:
+                            first_sample = False
+                            ttfs = time.monotonic() - attempt_t0
+                            conn.connected(getattr(client, "address", None) or device_id, connect_s,
+                                           ttfs, path, backend=type(client).__name__)
+                            metrics.time_to_first_sample.observe(ttfs, device=device_id, path=path)
+                            perf.record(f"ttfs_{path}", ttfs)
+                            _log(f"⏱️ Erstes Sample nach {ttfs:.2f}s ({path})")
+                        else:
+                            conn.sample()
 
                     except Exception as e:
+                        perf.count("read_errors")
+                        metrics.read_errors.inc(device=device_id)
+                        metrics.connected.set(0, device=device_id)
                         _log(f"⚠️ Device read error – reconnecting: {type(e).__name__}: {e}")
-                        _update_status(False, False, False)
+                        _update_status(False, False, False, paths)
+                        conn.disconnected()
                         break
 
-                    await asyncio.sleep(SCAN_INTERVAL)
-
         except Exception as e:
-            _log(f"❌ Bluetooth connection failed: {type(e).__name__}: {e}")
-            _update_status(False, False, False)
+            metrics.connected.set(0, device=device_id)
+            if first_sample:
+                # nur Versuche ohne Sample zählen – Fehler beim Schließen (__aexit__) nach
+                # einer Sitzung sind kein Verbindungsfehler (Profil ist schon gespeichert)
+                conn.attempt_failed(path)
+                perf.count("connect_failures")
+                metrics.connect_failures.inc(device=device_id)
+                _log(f"❌ Bluetooth connection failed: {type(e).__name__}: {e}")
+            else:
+                _log(f"⚠️ Fehler beim Trennen: {type(e).__name__}: {e}")
+            _update_status(False, False, False, paths)
 
         if _stop_event.is_set():
             break
 
-        _log(f"🔄 Reconnecting in {RECONNECT_DELAY}s ...")
-        await asyncio.sleep(RECONNECT_DELAY)
+        delay, path = conn.next_delay(scheduler.reconnect_delay())
+        _log(f"{'⚡' if path == 'fast' else '🔄'} Reconnecting in {delay:g}s ...")
+        await asyncio.sleep(delay / time_scale)
 # -------------------------------------------------------------------
 # Thread-Wrapper
 # -------------------------------------------------------------------
@@ -281,14 +428,25 @@ def start_reader_thread(device_id, log_callback=None):
     _log("🧵 Reader-Thread gestartet")
 
     def runner():
+        global _running, _loop, _task
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
+        task = loop.create_task(_read_loop(device_id, log_callback, detach_flush=True),
+                                name=f"reader-{device_id}")
+        _loop, _task = loop, task
         try:
-            loop.run_until_complete(_read_loop(device_id, log_callback))
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass  # stop_reader() – Client geschlossen, Sinks flushen im Hintergrund (_read_loop finally)
         except Exception as e:
             _log(f"❌ Fehler im Reader-Thread: {e}")
             traceback.print_exc()
         finally:
+            _loop = _task = None
+            try:
+                loop.run_until_complete(loop.shutdown_default_executor())
+            except Exception:
+                pass
             loop.close()
             _update_status(False, False, False)
             _log("🧹 Reader-Thread beendet.")
@@ -298,14 +456,38 @@ def start_reader_thread(device_id, log_callback=None):
     _thread.start()
 
 
-def stop_reader():
+def stop_reader(timeout=None):
+    """
+    Beendet den Reader-Thread: bricht den laufenden BLE-Aufruf bzw. die
+    Reconnect-Pause per Task-Cancel ab, der Client wird geschlossen. Die Sinks
+    flushen danach in eigenem Thread (max. SINK_FLUSH_TIMEOUT) – gewartet wird
+    nur auf den Reader, max. timeout Sekunden (READER_STOP_TIMEOUT).
+    Rückgabe: True, wenn der Thread beendet ist.
+    """
     global _running
-    if not _running:
-        return
+    thread = _thread
+    if not _running and not (thread and thread.is_alive()):
+        return True
     _log("[🧹] Stoppe Async-Reader …")
     _stop_event.set()
     _running = False
+    loop, task = _loop, _task
+    if loop is not None and task is not None:
+        try:
+            loop.call_soon_threadsafe(task.cancel)
+        except RuntimeError:
+            pass  # Loop bereits geschlossen
+    if thread and thread is not threading.current_thread():
+        if timeout is None:
+            timeout = getattr(config, "READER_STOP_TIMEOUT", 1.0)
+        t0 = time.monotonic()
+        thread.join(timeout)
+        if thread.is_alive():
+            _log(f"⚠️ Reader-Thread nach {timeout:g}s nicht beendet – Daten evtl. unvollständig.")
+            return False
+        _log(f"🧹 Reader gestoppt in {time.monotonic() - t0:.2f}s")
     try:
         _update_status(False, False, False)
     except Exception:
         pass
+    return True
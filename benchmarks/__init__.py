@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks – headless Benchmark-Suite für die Hot-Paths des 🌱 VIVOSUN Dashboard.
+Start: `MPLBACKEND=Agg python3 -m benchmarks [--quick] [--out results.json]`
+"""
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+__main__.py – Einstiegspunkt für `python3 -m benchmarks`
+
+Beispiele:
+    MPLBACKEND=Agg python3 -m benchmarks --quick
+    MPLBACKEND=Agg python3 -m benchmarks --out bench_v3.json --compare bench_v2.json
+    MPLBACKEND=Agg python3 -m benchmarks --only vpd,io
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from benchmarks import harness
+from benchmarks.cases import ALL_CASES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m benchmarks",
+                                     description="Headless Benchmarks für das VIVOSUN Dashboard")
+    parser.add_argument("--quick", action="store_true", help="kleinere Datenmengen (kein 1M-CSV)")
+    parser.add_argument("--only", default="", help="kommagetrennte Auswahl: " +
+                        ",".join(name for name, _, _ in ALL_CASES))
+    parser.add_argument("--out", default="bench_results.json", help="Ergebnisdatei (JSON)")
+    parser.add_argument("--compare", default=None, help="frühere Ergebnisdatei zum Vergleich")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Regressionsschwelle für --compare (Faktor p50)")
+    args = parser.parse_args(argv)
+
+    selected = {s.strip() for s in args.only.split(",") if s.strip()}
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix="vivosun_bench_") as tmpdir:
+        for name, func, needs_tmp in ALL_CASES:
+            if selected and name not in selected:
+                continue
+            print(f"▶ {name}")
+            try:
+                results += func(tmpdir, quick=args.quick) if needs_tmp else func(quick=args.quick)
+            except Exception as e:
+                print(f"  ⚠️ {name} übersprungen: {type(e).__name__}: {e}")
+
+    harness.write_results(args.out, results)
+    print(f"\n💾 Ergebnisse gespeichert → {args.out}")
+
+    if args.compare:
+        regressions = harness.compare(args.compare, results, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} Regression(en) über ×{args.threshold:.2f}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
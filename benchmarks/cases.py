@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+cases.py – Benchmark-Fälle für die Hot-Paths (synthetische Daten, kein Tk-Fenster)
+Alle Figures laufen über matplotlib.figure.Figure + Agg-Canvas, unabhängig vom pyplot-Backend.
+"""
+
+import asyncio
+import csv
+import datetime
+import importlib
+import math
+import os
+import random
+
+from benchmarks.harness import bench
+
+BUFFER_SIZES = (50, 200, 1000, 5000)
+
+
+# ===============================================================
+# 🧰 HELFER
+# ===============================================================
+def _headless_import(name):
+    """Importiert ein Widget-Modul und setzt das Backend danach wieder auf Agg
+    (einige Widgets rufen beim Import matplotlib.use("TkAgg") auf)."""
+    import matplotlib
+    mod = importlib.import_module(name)
+    matplotlib.use("Agg", force=True)
+    return mod
+
+
+def _agg_figure(figsize):
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot(111)
+
+
+def synthetic_series(n, base=24.0, amp=2.0, noise=0.15, step_s=2, seed=1):
+    """Sinus + Rauschen, wie in dummys/ und test_window für manuelle Tests."""
+    rnd = random.Random(seed)
+    t0 = datetime.datetime(2025, 1, 1, 12, 0, 0)
+    ts = [t0 + datetime.timedelta(seconds=i * step_s) for i in range(n)]
+    ys = [base + amp * math.sin(i / 30.0) + rnd.gauss(0, noise) for i in range(n)]
+    return ts, ys
+
+
+def write_growhub_csv(path, rows, seed=2):
+    rnd = random.Random(seed)
+    t0 = datetime.datetime(2025, 1, 1)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["Timestamp", "Inside Temp(°C)", "Inside Humidity(%)", "Inside VPD(kPa)",
+                    "Outside Temp(°C)", "Outside Humidity(%)", "Outside VPD(kPa)"])
+        for i in range(rows):
+            ts = (t0 + datetime.timedelta(minutes=i)).strftime("%Y/%m/%d %H:%M")
+            ti = 24 + 3 * math.sin(i / 720.0) + rnd.random() * 0.2
+            to = 18 + 5 * math.sin(i / 720.0)
+            w.writerow([ts, f"{ti:.1f}", "60", "1.20", f"{to:.1f}", "70", "0.62"])
+
+
+# ===============================================================
+# 💧 VPD
+# ===============================================================
+def bench_vpd(quick=False):
+    import numpy as np
+    import utils
+
+    n = 10_000 if quick else 100_000
+    temps = [15 + (i % 200) * 0.1 for i in range(n)]
+    hums = [30 + (i % 500) * 0.1 for i in range(n)]
+    t_arr, h_arr = np.asarray(temps), np.asarray(hums)
+    vec = np.vectorize(utils.calc_vpd)
+
+    def scalar():
+        calc = utils.calc_vpd
+        for t, h in zip(temps, hums):
+            calc(t, h)
+
+    def array_vectorize():
+        vec(t_arr, h_arr)
+
+    def array_numpy():
+        svp = 0.6108 * np.exp((17.27 * t_arr) / (t_arr + 237.3))
+        np.round(svp * (1.0 - h_arr / 100.0), 3)
+
+    return [
+        bench("vpd.scalar_loop", scalar, {"n": n}),
+        bench("vpd.np_vectorize", array_vectorize, {"n": n}),
+        bench("vpd.numpy_formula", array_numpy, {"n": n}, number=10),
+    ]
+
+
+def bench_derived_series(quick=False):
+    """Offset-Änderung → ganze Serie neu (vektorisiert) vs. Append bei gleicher Version."""
+    import derived
+    import utils
+
+    n = 2_000 if quick else 20_000
+    _, temps = synthetic_series(n)
+    _, hums = synthetic_series(n, base=60.0, amp=8.0, seed=3)
+    buf = derived.SeriesBuffer(n)
+    buf.extend({"t_main": t, "h_main": h, "t_ext": t - 2, "h_ext": h + 5}
+               for t, h in zip(temps, hums))
+    saved = (utils.offsets.leaf_offset, utils.offsets.hum_offset)
+    toggle = [0]
+
+    def offset_change():
+        toggle[0] ^= 1
+        utils.offsets.set_offsets(-1.0 - toggle[0], 2.0, persist=False)
+        buf.series("vpd_int")
+
+    def append_tick():
+        buf.append({"t_main": 24.0, "h_main": 60.0, "t_ext": 22.0, "h_ext": 65.0})
+        buf.series("vpd_int")
+
+    try:
+        return [
+            bench("derived.rebuild_on_offset", offset_change, {"n": n}, repeat=3),
+            bench("derived.append_tick", append_tick, {"n": n}, number=200),
+        ]
+    finally:
+        utils.offsets.set_offsets(*saved, persist=False)
+
+
+# ===============================================================
+# 📈 ROLLIERENDE STATISTIK
+# ===============================================================
+def bench_rolling_stats(quick=False):
+    import rolling_stats
+
+    n = 20_000 if quick else 200_000
+    rnd = random.Random(4)
+    t0 = 1_735_732_800.0
+    samples = [(t0 + i * 2.0, {k: 20 + rnd.gauss(0, 1) for k in rolling_stats.CHANNELS})
+               for i in range(n)]
+
+    def run():
+        engine = rolling_stats.StatsEngine({"5m": 300, "1h": 3600, "24h": 86400})
+        for ts, values in samples:
+            engine.update(ts, values)
+        engine.snapshot()
+
+    return [bench("stats.update_6ch_3win", run, {"samples": n}, repeat=3)]
+
+
+# ===============================================================
+# 📊 CHARTS
+# ===============================================================
+def bench_charts_update(quick=False):
+    charts_gui = _headless_import("main_gui.charts_gui")
+    import config
+
+    results = []
+    sizes = BUFFER_SIZES[:3] if quick else BUFFER_SIZES
+    for n in sizes:
+        x, y = synthetic_series(n)
+        fig, ax = _agg_figure((4.1, 2.0))
+
+        def run():
+            charts_gui.draw_card(ax, x, y, "#ff6633", config.CARD)
+            fig.tight_layout(pad=0.6)
+            fig.canvas.draw()
+
+        results.append(bench("charts.card_update", run, {"buffer": n}))
+    return results
+
+
+def bench_enlarged_update(quick=False):
+    enlarged = _headless_import("widgets.enlarged_charts")
+    import matplotlib.dates as mdates
+
+    results = []
+    sizes = BUFFER_SIZES[:3] if quick else BUFFER_SIZES
+    for n in sizes:
+        ts, vals = synthetic_series(n)
+        vals[n // 2] = None  # Lücke wie bei Sensorausfall
+        fig, ax = _agg_figure((10, 5))
+        line, = ax.plot([], [], linewidth=2.3)
+
+        def run():
+            xs = list(mdates.date2num(ts))
+            ys = enlarged.build_series(vals, True, celsius=False)
+            enlarged.apply_series(ax, line, xs, ys, 1 / 24)
+            fig.canvas.draw()
+
+        results.append(bench("enlarged.update", run, {"buffer": n}))
+    return results
+
+
+def bench_scatter_background(quick=False):
+    scatter = _headless_import("widgets.scattered_chart_widget")
+
+    results = []
+    for res in ((100, 300) if not quick else (100,)):
+        def run():
+            fig, ax = _agg_figure((9, 7))
+            scatter.build_vpd_background(fig, ax, True, resolution=res)
+            fig.canvas.draw()
+
+        results.append(bench("scatter.background_build", run, {"grid": res}, repeat=3))
+    return results
+
+
+# ===============================================================
+# 📂 GROWHUB CSV
+# ===============================================================
+def bench_growhub_load(tmpdir, quick=False):
+    viewer = _headless_import("widgets.growhub_csv_viewer")
+
+    results = []
+    for rows in ((10_000,) if quick else (10_000, 1_000_000)):
+        path = os.path.join(tmpdir, f"growhub_{rows}.csv")
+        write_growhub_csv(path, rows)
+        results.append(bench("growhub.load_csv", lambda: viewer.load_growhub_csv(path),
+                             {"rows": rows}, repeat=3 if rows <= 10_000 else 1))
+    return results
+
+
+# ===============================================================
+# 💾 DATEI-I/O
+# ===============================================================
+def bench_file_io(tmpdir, quick=False):
+    import utils
+
+    json_path = os.path.join(tmpdir, "thermo_values.json")
+    csv_path = os.path.join(tmpdir, "thermo_history.csv")
+    payload = {"timestamp": datetime.datetime.now().isoformat(),
+               "t_main": 24.3, "h_main": 61.0, "t_ext": 19.8, "h_ext": 70.2}
+    header = ["Timestamp", "Temperature", "Humidity", "VPD"]
+    row = ["2025-01-01 12:00:00", 24.3, 61.0, 1.18]
+    n = 200 if quick else 1000
+
+    def reset_csv():
+        if os.path.exists(csv_path):
+            os.remove(csv_path)
+
+    return [
+        bench("io.safe_write_json", lambda: utils.safe_write_json(json_path, payload),
+              {"writes": 1}, number=n),
+        bench("io.append_csv_row", lambda: utils.append_csv_row(csv_path, header, row),
+              {"rows": 1}, number=n, setup=reset_csv),
+    ]
+
+
+def bench_sink_pipeline(tmpdir, quick=False):
+    """publish() muss für den Reader praktisch gratis sein – Schreiben passiert im Sink-Thread."""
+    import sinks
+
+    n = 2_000 if quick else 20_000
+    t0 = 1_735_732_800.0
+    records = [{"timestamp": None, "t_main": 24.0 + (i % 50) * 0.1, "h_main": 60.0,
+                "t_ext": 19.5, "h_ext": 70.0, "vpd_int": 1.2, "ts": t0 + i * 2,
+                "device_id": "bench"} for i in range(n)]
+    specs = [{"type": "csv", "path": os.path.join(tmpdir, "sink_history.csv"), "queue_size": n},
+             {"type": "sqlite", "path": os.path.join(tmpdir, "sink_history.db"), "queue_size": n},
+             {"type": "influx", "path": os.path.join(tmpdir, "sink.lp"), "queue_size": n}]
+    timing = {}
+
+    def run():
+        pipeline = sinks.pipeline_from_config({"sinks": specs})
+        start = datetime.datetime.now()
+        for r in records:
+            pipeline.publish(r)
+        timing["publish"] = (datetime.datetime.now() - start).total_seconds()
+        pipeline.close(timeout=60)
+
+    r = bench("sinks.publish_and_flush", run, {"samples": n}, repeat=3)
+    print(f"  {'sinks.publish_only':<28}{'':<24}last {timing['publish'] * 1000:>9.3f} ms")
+    return [r]
+
+
+# ===============================================================
+# 📡 READER-LOOP
+# ===============================================================
+class FakeThermoClient:
+    """Antwortet sofort mit synthetischen Werten; stoppt den Reader nach `limit` Zyklen."""
+    PROBE_MAIN = 0
+    PROBE_EXTERNAL = 1
+    UNIT_CELSIUS = 0
+    limit = 200
+
+    def __init__(self, device_id):
+        self.device_id = device_id
+        self.cycles = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def current_temperature(self, probe, unit=None):
+        return 24.0 + probe + (self.cycles % 10) * 0.1
+
+    async def current_humidity(self, probe):
+        if probe == self.PROBE_EXTERNAL:
+            self.cycles += 1
+            if self.cycles >= self.limit:
+                import async_reader
+                async_reader._stop_event.set()
+        return 60.0 - probe
+
+
+def bench_reader_loop(tmpdir, quick=False):
+    import async_reader
+    import config
+    import connections
+    import scheduler
+
+    cycles = 100 if quick else 500
+    saved = {
+        "DATA_FILE": config.DATA_FILE,
+        "HISTORY_FILE": config.HISTORY_FILE,
+        "CONNECTIONS_FILE": config.CONNECTIONS_FILE,
+        "STATUS_FILE": async_reader.STATUS_FILE,
+        "settings": scheduler.settings,
+        "profiles": dict(connections._profiles),
+    }
+    config.DATA_FILE = os.path.join(tmpdir, "thermo_values.json")
+    config.HISTORY_FILE = os.path.join(tmpdir, "thermo_history.csv")
+    config.CONNECTIONS_FILE = os.path.join(tmpdir, "connections.json")
+    async_reader.STATUS_FILE = os.path.join(tmpdir, "status.json")
+    connections._profiles.clear()
+    # Ungebremst messen: Takt 0, kein adaptives Intervall (scheduler.Ticker/AdaptiveRate)
+    unpaced = dict(saved["settings"](), poll=0.0, reconnect=0.0, adaptive={"enabled": False})
+    scheduler.settings = lambda: unpaced
+    FakeThermoClient.limit = cycles
+
+    def run():
+        async_reader._running = True
+        async_reader._stop_event.clear()
+        asyncio.run(async_reader._read_loop("bench-device", client_factory=FakeThermoClient))
+        async_reader._running = False
+
+    try:
+        r = bench("reader.loop_total", run, {"cycles": cycles}, repeat=3)
+        per = dict(r, name="reader.per_cycle",
+                   min_ms=r["min_ms"] / cycles, mean_ms=r["mean_ms"] / cycles,
+                   p50_ms=r["p50_ms"] / cycles, max_ms=r["max_ms"] / cycles)
+        print(f"  {'reader.per_cycle':<28}{'':<24}p50 {per['p50_ms']:>10.3f} ms")
+        return [r, per]
+    finally:
+        config.DATA_FILE = saved["DATA_FILE"]
+        config.HISTORY_FILE = saved["HISTORY_FILE"]
+        config.CONNECTIONS_FILE = saved["CONNECTIONS_FILE"]
+        async_reader.STATUS_FILE = saved["STATUS_FILE"]
+        scheduler.settings = saved["settings"]
+        connections._profiles.clear()
+        connections._profiles.update(saved["profiles"])
+
+
+# Reihenfolge = Ausgabe-Reihenfolge; (Name, Funktion, braucht tmpdir)
+ALL_CASES = [
+    ("vpd", bench_vpd, False),
+    ("derived", bench_derived_series, False),
+    ("stats", bench_rolling_stats, False),
+    ("charts", bench_charts_update, False),
+    ("enlarged", bench_enlarged_update, False),
+    ("scatter", bench_scatter_background, False),
+    ("growhub", bench_growhub_load, True),
+    ("io", bench_file_io, True),
+    ("sinks", bench_sink_pipeline, True),
+    ("reader", bench_reader_loop, True),
+]
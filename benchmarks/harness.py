@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+harness.py – Mess-Harness für die Benchmarks (Timing, JSON-Export, Vergleich)
+Ergebnisse sind maschinenlesbar, damit Versionen gegeneinander verglichen werden können.
+"""
+
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+
+# ===============================================================
+# ⏱️ MESSEN
+# ===============================================================
+def bench(name, func, params=None, repeat=5, number=1, setup=None):
+    """
+    Führt func `repeat` × `number` mal aus und liefert ein Ergebnis-Dict
+    (Zeiten in ms pro Aufruf). setup() läuft vor jeder Wiederholung ungemessen.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - t0) / number)
+
+    times_ms = sorted(t * 1000.0 for t in times)
+    result = {
+        "name": name,
+        "params": params or {},
+        "repeat": repeat,
+        "number": number,
+        "min_ms": times_ms[0],
+        "mean_ms": statistics.fmean(times_ms),
+        "p50_ms": statistics.median(times_ms),
+        "max_ms": times_ms[-1],
+    }
+    print(f"  {name:<28}{_fmt_params(result['params']):<24}"
+          f"p50 {result['p50_ms']:>10.3f} ms   min {result['min_ms']:>10.3f} ms")
+    return result
+
+
+def _fmt_params(params):
+    return ", ".join(f"{k}={v}" for k, v in params.items())
+
+
+def result_key(result):
+    """Eindeutiger Schlüssel (Name + Parameter) für Vergleiche."""
+    return f"{result['name']}[{_fmt_params(result['params'])}]"
+
+
+# ===============================================================
+# 🧾 METADATEN & EXPORT
+# ===============================================================
+def _git_commit():
+    try:
+        base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=base,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def collect_meta():
+    meta = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "git_commit": _git_commit(),
+        "mpl_backend": os.environ.get("MPLBACKEND"),
+    }
+    try:
+        import config
+        meta["app_version"] = getattr(config, "VERSION", None)
+    except Exception:
+        pass
+    for mod in ("numpy", "matplotlib", "pandas"):
+        try:
+            meta[mod] = __import__(mod).__version__
+        except Exception:
+            meta[mod] = None
+    return meta
+
+
+def write_results(path, results):
+    doc = {"meta": collect_meta(), "results": results}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2)
+    return doc
+
+
+# ===============================================================
+# 🔍 VERGLEICH
+# ===============================================================
+def compare(baseline_path, results, threshold=1.25):
+    """
+    Vergleicht p50-Zeiten mit einer früheren Ergebnisdatei.
+    Gibt die Liste der Regressionen (Faktor > threshold) zurück.
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        base = {result_key(r): r for r in json.load(f).get("results", [])}
+
+    regressions = []
+    print(f"\n🔍 Vergleich mit {baseline_path} (Schwelle ×{threshold:.2f})")
+    for r in results:
+        key = result_key(r)
+        old = base.get(key)
+        if not old or not old.get("p50_ms"):
+            print(f"  {key:<52} neu")
+            continue
+        ratio = r["p50_ms"] / old["p50_ms"]
+        flag = "❌" if ratio > threshold else ("✅" if ratio < 1 / threshold else "  ")
+        print(f"  {key:<52} {old['p50_ms']:>10.3f} → {r['p50_ms']:>10.3f} ms  ×{ratio:.2f} {flag}")
+        if ratio > threshold:
+            regressions.append({"key": key, "ratio": ratio})
+    return regressions
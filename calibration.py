@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+calibration.py – Kalibrierprofile je Gerät und Fühlerkanal (config.json "calibration")
+
+    "calibration": {
+        "*":            {"h_main": {"type": "offset", "offset": -2.5}},
+        "<device_id>":  {"t_ext":  {"type": "two_point", "points": [[0.4, 0.0], [99.1, 100.0]]},
+                         "h_ext":  {"type": "poly", "coeffs": [1.2, 0.97, 0.0004]}}
+    }
+
+Typen (alle auf ein Polynom c0 + c1·x + c2·x² … zurückgeführt):
+    offset     – x + offset
+    two_point  – Gerade durch zwei (Rohwert, Referenz)-Paare
+    poly       – Koeffizienten aufsteigend (c0, c1, …)
+Gerätespezifische Kanäle überschreiben "*". Jedes Sample trägt die Profil-
+version ("cal", kurzer Hash) – so lässt sich Historie mit einem geänderten
+Profil gezielt neu ableiten (history_store.recalibrate).
+Leaf-/Humidity-Offset (OffsetManager) bleiben davon unberührt: sie sind
+Anzeige-Offsets, keine Sensorkorrektur.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import config
+
+CHANNELS = ("t_main", "h_main", "t_ext", "h_ext")
+IDENTITY = (0.0, 1.0)
+
+_lock = threading.Lock()
+_state = {"checked": 0.0, "mtime": None, "profiles": None, "resolved": {}}
+
+
+class CalibrationError(ValueError):
+    pass
+
+
+# ===============================================================
+# 🧾 PROFILE → POLYNOM
+# ===============================================================
+def coefficients(spec):
+    """Kanal-Spezifikation → Koeffizienten (aufsteigend). Wirft CalibrationError."""
+    kind = spec.get("type", "offset")
+    try:
+        if kind == "offset":
+            return (float(spec.get("offset", 0.0)), 1.0)
+        if kind == "two_point":
+            (r1, v1), (r2, v2) = spec["points"]
+            r1, v1, r2, v2 = float(r1), float(v1), float(r2), float(v2)
+            if r1 == r2:
+                raise CalibrationError("two_point: Rohwerte müssen verschieden sein")
+            slope = (v2 - v1) / (r2 - r1)
+            return (v1 - slope * r1, slope)
+        if kind == "poly":
+            coeffs = tuple(float(c) for c in spec["coeffs"])
+            if not coeffs:
+                raise CalibrationError("poly: keine Koeffizienten")
+            return coeffs
+    except (KeyError, TypeError, ValueError) as e:
+        if isinstance(e, CalibrationError):
+            raise
+        raise CalibrationError(f"{kind}: ungültige Angabe ({e})") from None
+    raise CalibrationError(f"unbekannter Typ '{kind}'")
+
+
+class Profile:
+    """Aufgelöstes Profil eines Geräts: Koeffizienten je Kanal + Version."""
+    __slots__ = ("coeffs", "version")
+
+    def __init__(self, coeffs):
+        self.coeffs = {ch: c for ch, c in coeffs.items() if c != IDENTITY}
+        if self.coeffs:
+            blob = json.dumps(sorted(self.coeffs.items()), separators=(",", ":"))
+            self.version = hashlib.sha1(blob.encode()).hexdigest()[:8]
+        else:
+            self.version = None  # unkalibriert
+
+    def __bool__(self):
+        return bool(self.coeffs)
+
+    def apply(self, values):
+        """Skalar (Reader): Dict mit Kanalwerten → kalibriertes Dict (None bleibt None)."""
+        if not self.coeffs:
+            return dict(values)
+        out = dict(values)
+        for ch, coeffs in self.coeffs.items():
+            x = out.get(ch)
+            if x is not None:
+                acc = 0.0
+                for c in reversed(coeffs):  # Horner
+                    acc = acc * x + c
+                out[ch] = round(acc, 2)
+        return out
+
+    def apply_arrays(self, columns):
+        """Vektorisiert (Historie): {kanal: Array/Liste} → {kanal: float-Array}, NaN = fehlend."""
+        import numpy as np
+
+        out = {}
+        for ch, col in columns.items():
+            arr = np.asarray(col, dtype=float)
+            coeffs = self.coeffs.get(ch)
+            out[ch] = np.round(np.polynomial.polynomial.polyval(arr, coeffs), 2) if coeffs else arr
+        return out
+
+
+# ===============================================================
+# ⚙️ LADEN (Hot-Reload über mtime der config.json)
+# ===============================================================
+def parse(section):
+    """config.json "calibration" → {device_id|"*": {kanal: Koeffizienten}} (ungültige Kanäle → Log)."""
+    parsed = {}
+    for device, channels in (section or {}).items():
+        if not isinstance(channels, dict):
+            continue
+        for ch, spec in channels.items():
+            if ch not in CHANNELS or not isinstance(spec, dict):
+                print(f"⚠️ Kalibrierung {device}/{ch}: unbekannter Kanal – ignoriert")
+                continue
+            try:
+                parsed.setdefault(device, {})[ch] = coefficients(spec)
+            except CalibrationError as e:
+                print(f"⚠️ Kalibrierung {device}/{ch}: {e} – ignoriert")
+    return parsed
+
+
+def _profiles():
+    now = time.monotonic()
+    with _lock:
+        if _state["profiles"] is not None and now - _state["checked"] < 2.0:
+            return _state["profiles"]
+        _state["checked"] = now
+        try:
+            mtime = os.path.getmtime(config.CONFIG_FILE)
+        except OSError:
+            mtime = None
+        if _state["profiles"] is None or mtime != _state["mtime"]:
+            import utils
+            cfg = utils.safe_read_json(config.CONFIG_FILE) or {}
+            section = dict(getattr(config, "CALIBRATION", {}))
+            for device, channels in (cfg.get("calibration") or {}).items():
+                section[device] = dict(section.get(device) or {}, **(channels or {}))
+            _state["profiles"] = parse(section)
+            _state["resolved"] = {}
+            _state["mtime"] = mtime
+        return _state["profiles"]
+
+
+def profile_for(device_id):
+    """Aktuelles Profil eines Geräts ("*" als Basis, Gerät überschreibt je Kanal)."""
+    profiles = _profiles()
+    resolved = _state["resolved"]
+    profile = resolved.get(device_id)
+    if profile is None:
+        merged = dict(profiles.get("*", {}))
+        merged.update(profiles.get(device_id, {}) if device_id else {})
+        profile = resolved[device_id] = Profile(merged)
+    return profile
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+collector – Headless-Datensammler (ohne Tk/matplotlib) für Server & Dauerbetrieb.
+Start per `python3 -m collector` oder aus der GUI (collector.spawn, config.json
+"reader_process"). Das Dashboard hängt sich dann nur lesend an.
+"""
+
+from .pidfile import is_running, read_pid
+from .launcher import spawn, stop
+
+__all__ = ["is_running", "read_pid", "spawn", "stop"]
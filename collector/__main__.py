@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+__main__.py – Einstiegspunkt für `python3 -m collector`
+
+Beispiele:
+    python3 -m collector                      # Gerät aus config.json
+    python3 -m collector --device AA:BB:… --device CC:DD:…
+    python3 -m collector --recalibrate        # Historie mit aktuellem Kalibrierprofil neu ableiten
+"""
+
+import argparse
+import os
+import sys
+
+# Muss vor dem ersten config-Import stehen (kein Theme → kein tkinter)
+os.environ["VIVOSUN_HEADLESS"] = "1"
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+
+def main(argv=None):
+    import config, utils
+    from collector.daemon import run_collector
+
+    parser = argparse.ArgumentParser(prog="python3 -m collector",
+                                     description="Headless-Datensammler für VIVOSUN THB-1S")
+    parser.add_argument("--device", action="append", default=[],
+                        help="Device-ID (mehrfach möglich; Standard: device_id aus config.json)")
+    parser.add_argument("--stats-interval", type=float, default=3600,
+                        help="Sekunden zwischen Status-/Speicher-Logzeilen (0 = aus)")
+    parser.add_argument("--http", metavar="HOST:PORT", default=None,
+                        help="lokale HTTP-API starten (Standard aus config.json \"http_api\")")
+    parser.add_argument("--recalibrate", action="store_true",
+                        help="history.db mit den aktuellen Kalibrierprofilen neu ableiten und beenden")
+    args = parser.parse_args(argv)
+
+    if args.recalibrate:
+        import history_store
+        n = history_store.recalibrate(device_id=args.device[0] if len(args.device) == 1 else None)
+        print(f"🎯 Historie neu kalibriert: {n} Zeilen aktualisiert.")
+        return 0
+
+    cfg = utils.safe_read_json(config.CONFIG_FILE) or {}
+    devices = args.device or [cfg.get("device_id")]
+    devices = [d for d in devices if d]
+    if not devices and cfg.get("backend", config.CLIENT_BACKEND) in ("sim", "replay"):
+        devices = [config.SIM_DEVICE_ID]
+    if not devices:
+        print("❌ Keine Device-ID (config.json oder --device).")
+        return 2
+
+    import http_api
+    enabled, host, port = http_api.settings_from_config(cfg)
+    if args.http:
+        h, _, p = args.http.rpartition(":")
+        enabled, host, port = True, h or host, int(p or port)
+    http = (host, port) if enabled else None
+
+    return run_collector(devices, stats_interval=args.stats_interval, http=http)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
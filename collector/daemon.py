@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+daemon.py – Headless-Collector: Reader (einer oder mehrere) + History-Writer
+- läuft auf einem asyncio-Loop im Hauptthread (kein Reader-Thread nötig)
+- SIGINT/SIGTERM → sauberes Beenden (Status "disconnected", PID-Datei weg)
+- erstes Gerät schreibt die Standarddateien (GUI-kompatibel),
+  weitere Geräte unter data/devices/<id>/
+"""
+
+import asyncio
+import datetime
+import gc
+import signal
+import sys
+
+import config
+import async_reader
+import alerts
+import reports
+from collector import pidfile
+
+
+def _log(msg):
+    ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{ts}] {msg}", flush=True)
+
+
+def _max_rss_mb():
+    """Maximaler Speicherverbrauch des Prozesses (MB), falls ermittelbar."""
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS liefert Bytes, Linux KiB
+        return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+    except Exception:
+        return None
+
+
+async def _stats_task(interval):
+    while True:
+        await asyncio.sleep(interval)
+        gc.collect()
+        rss = _max_rss_mb()
+        _log(f"📈 Collector läuft – max RSS {rss:.1f} MB" if rss else "📈 Collector läuft")
+
+
+def _install_signal_handlers(loop, request_stop):
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, request_stop)
+        except (NotImplementedError, RuntimeError):
+            # Windows: kein add_signal_handler → klassischer Handler
+            signal.signal(sig, lambda *_: loop.call_soon_threadsafe(request_stop))
+
+
+async def _run(device_ids, stats_interval, http=None):
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+
+    def request_stop():
+        if not stop.is_set():
+            _log("🛑 Stop-Signal empfangen – beende Collector …")
+        stop.set()
+        async_reader._stop_event.set()
+
+    _install_signal_handlers(loop, request_stop)
+
+    async_reader._running = True
+    async_reader._stop_event.clear()
+    alerts.start_engine()
+    reports.start_scheduler()
+
+    readers = []
+    for i, dev in enumerate(device_ids):
+        paths = async_reader.default_paths() if i == 0 else async_reader.device_paths(dev)
+        _log(f"🔌 Reader für {dev} → {paths['data']}")
+        task = asyncio.create_task(async_reader._read_loop(dev, paths=paths), name=f"reader-{dev}")
+        readers.append((task, paths))
+
+    extra = [asyncio.create_task(_stats_task(stats_interval))] if stats_interval else []
+    if http:
+        import http_api
+        # gleicher Loop wie die Reader – der Server blockiert nie (Dateizugriff im Executor)
+        extra.append(asyncio.create_task(http_api.serve(*http), name="http-api"))
+
+    # Läuft, bis Signal kommt oder alle Reader von selbst enden
+    waiter = asyncio.create_task(stop.wait())
+    await asyncio.wait([waiter] + [t for t, _ in readers], return_when=asyncio.FIRST_COMPLETED)
+    request_stop()
+
+    async_reader._running = False
+    for task in [t for t, _ in readers] + extra + [waiter]:
+        task.cancel()
+    await asyncio.gather(*[t for t, _ in readers], *extra, waiter, return_exceptions=True)
+
+    for _, paths in readers:
+        async_reader._update_status(False, False, False, paths)
+    alerts.stop_engine()
+    reports.stop_scheduler()
+
+
+def run_collector(device_ids, stats_interval=3600, http=None):
+    """
+    Startet den Collector blockierend. Rückgabe: Exit-Code.
+    http: (host, port) für die lokale HTTP-API oder None.
+    """
+    if pidfile.is_running(config.DATA_DIR):
+        _log(f"❌ Collector läuft bereits (PID {pidfile.read_pid(config.DATA_DIR)}).")
+        return 1
+
+    async_reader.set_log_callback(None)
+    pidfile.write_pid(config.DATA_DIR)
+    _log(f"🌱 Collector gestartet (PID-Datei {pidfile.pid_path(config.DATA_DIR)})")
+    try:
+        asyncio.run(_run(device_ids, stats_interval, http))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pidfile.remove_pid(config.DATA_DIR)
+        _log("🧹 Collector beendet.")
+    return 0
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+launcher.py – Collector als eigenständigen Prozess starten/stoppen (für die GUI)
+
+Der Collector läuft in einer eigenen Session: Schließen, Neustart oder
+Absturz der GUI beenden die Messung nicht. Die GUI hängt sich danach
+lesend an (Dateien bzw. Shared-Memory-Ring).
+Bewusst ohne config-Import – Pfade kommen vom Aufrufer.
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+from .pidfile import is_running, read_pid
+
+LOG_NAME = "collector.log"
+
+
+def command():
+    """Startkommando: Quelltext → `python -m collector`, gebündelt → `<exe> --collector`."""
+    if getattr(sys, "frozen", False):
+        return [sys.executable, "--collector"]
+    return [sys.executable, "-m", "collector"]
+
+
+def spawn(data_dir, base_dir, wait_s=10.0):
+    """
+    Startet den Collector losgelöst und wartet, bis seine PID-Datei steht.
+    Rückgabe: PID oder None (Start fehlgeschlagen / Zeit abgelaufen).
+    """
+    if is_running(data_dir):
+        return read_pid(data_dir)
+    kwargs = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = (subprocess.DETACHED_PROCESS
+                                   | subprocess.CREATE_NEW_PROCESS_GROUP)
+    else:
+        kwargs["start_new_session"] = True   # kein SIGHUP/SIGINT der GUI
+    log_path = os.path.join(str(data_dir), LOG_NAME)
+    with open(log_path, "ab") as log:
+        proc = subprocess.Popen(command(), cwd=str(base_dir), stdin=subprocess.DEVNULL,
+                                stdout=log, stderr=subprocess.STDOUT, close_fds=True, **kwargs)
+    # Exit-Status abholen, sobald er endet – sonst bleibt ein Zombie mit gültiger PID
+    threading.Thread(target=proc.wait, name="collector-reaper", daemon=True).start()
+    deadline = time.monotonic() + wait_s
+    while time.monotonic() < deadline:
+        if is_running(data_dir):
+            return read_pid(data_dir)
+        if proc.poll() is not None:
+            return None
+        time.sleep(0.1)
+    return None
+
+
+def stop(data_dir, timeout=10.0):
+    """SIGTERM an den laufenden Collector; True, wenn er innerhalb von timeout endet."""
+    pid = read_pid(data_dir)
+    if not pid or not is_running(data_dir):
+        return True
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except OSError:
+        return False
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not is_running(data_dir):
+            return True
+        time.sleep(0.1)
+    return False
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+pidfile.py – PID-Datei des Collectors (data/collector.pid)
+Bewusst ohne config-Import, damit das Paket vor dem Headless-Setup importierbar bleibt.
+"""
+
+import os
+
+PID_NAME = "collector.pid"
+
+
+def pid_path(data_dir):
+    return os.path.join(str(data_dir), PID_NAME)
+
+
+def read_pid(data_dir):
+    try:
+        with open(pid_path(data_dir), "r", encoding="utf-8") as f:
+            return int(f.read().strip() or 0) or None
+    except Exception:
+        return None
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except Exception:
+        return False
+    return True
+
+
+def is_running(data_dir):
+    """True, wenn laut PID-Datei ein Collector-Prozess lebt (nicht wir selbst)."""
+    pid = read_pid(data_dir)
+    return bool(pid) and pid != os.getpid() and _alive(pid)
+
+
+def write_pid(data_dir):
+    path = pid_path(data_dir)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(str(os.getpid()))
+    os.replace(tmp, path)
+    return path
+
+
+def remove_pid(data_dir):
+    try:
+        if read_pid(data_dir) == os.getpid():
+            os.remove(pid_path(data_dir))
+    except Exception:
+        pass
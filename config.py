@@ -36,6 +36,9 @@ CONFIG_FILE  = DATA_DIR / "config.json"
 DATA_FILE    = DATA_DIR / "thermo_values.json"
 HISTORY_FILE = DATA_DIR / "thermo_history.csv"
 STATUS_FILE  = DATA_DIR / "status.json"
+HISTORY_DB   = DATA_DIR / "history.db"
+ALERTS_FILE  = DATA_DIR / "alerts.json"
+CONNECTIONS_FILE = DATA_DIR / "connections.json"
 
 # --- UI Farben (Fallback, falls Theme nicht geladen werden kann) ---
 BG     = "#0b1620"
@@ -50,6 +53,7 @@ ACCENT = "#8be9fd"
 # --- Dashboard / GUI ---
 UI_POLL_INTERVAL = 1.0         # Sekunden für UI-Refresh
 PLOT_BUFFER_LEN  = 600         # Anzahl gespeicherter Werte (~10 min bei 1s)
+CHART_PRELOAD_MINUTES = 30     # beim Start aus der Historie laden (config.json "chart_preload_minutes", 0 = aus)
 
 # --- Sensor Polling ---
 SENSOR_POLL_INTERVAL = 1       # Sekunden zwischen Messwertabfragen
@@ -57,6 +61,145 @@ SENSOR_POLL_INTERVAL = 1       # Sekunden zwischen Messwertabfragen
 # --- Reconnect-Verhalten ---
 RECONNECT_DELAY = 3            # Sekunden zwischen Reconnect-Versuchen
 
+# --- Schneller Reconnect (connections.py, config.json: "fast_reconnect") ---
+# Lieferte das Gerät vor < window_s noch Werte, folgen die Versuche der kurzen
+# Leiter "delays" (Sekunden) – erst danach wieder RECONNECT_DELAY.
+FAST_RECONNECT = {
+    "enabled": True,
+    "delays": [0.0, 0.5, 1.0, 2.0],
+    "window_s": 60.0,
+}
+
+# --- Setup-Scan ---
+SETUP_SCAN_TIMEOUT = 10.0      # max. Sekunden BLE-Suche (Auswahl beendet früher)
+
+# --- Adaptiver Takt (scheduler.AdaptiveRate, config.json: "adaptive_sampling") ---
+# Änderung ≥ deadband oder aktiver Alarm → burst_s lang fast_s; stable_after_s ruhig →
+# Intervall wächst je Takt um backoff bis idle_s. Dazwischen SENSOR_POLL_INTERVAL.
+ADAPTIVE_SAMPLING = {
+    "enabled": True,
+    "fast_s": 1.0,
+    "burst_s": 60.0,
+    "idle_s": 30.0,
+    "stable_after_s": 300.0,
+    "backoff": 1.5,
+    "deadband": {"t": 0.3, "h": 1.5},   # °C / % seit letzter Änderung
+}
+
+# --- Energieprofil (config.json: "power_profile") ---
+# max_fps: Obergrenze für Chart-Redraws; fill: Fläche unter der Kurve zeichnen;
+# adaptive: überschreibt ADAPTIVE_SAMPLING
+POWER_PROFILE = "normal"
+POWER_PROFILES = {
+    "normal": {"max_fps": 1.0, "fill": True, "adaptive": {}},
+    "kiosk":  {"max_fps": 0.2, "fill": False, "adaptive": {"idle_s": 60.0, "stable_after_s": 120.0}},
+}
+
+# =====================================================
+#               CLIENT-BACKEND (BLE / SIM)
+# =====================================================
+
+CLIENT_BACKEND = "ble"         # "ble" | "sim" | "replay" (config.json: "backend")
+SIM_DEVICE_ID  = "SIM-THB1S"   # Device-ID, wenn ohne echtes Gerät gestartet wird
+
+# Standardwerte für den Simulator (config.json: "simulator": {...})
+SIMULATOR_DEFAULTS = {
+    "waveform": "sine",
+    "period_s": 3600.0,
+    "dropout_rate": 0.0,
+    "ext_plug_period_s": 0.0,
+    "speed": 1.0,
+}
+
+# =====================================================
+#                 LOKALE HTTP-API 🌐
+# =====================================================
+
+HTTP_API_ENABLED = False       # config.json: "http_api": {"enabled": true, ...}
+HTTP_API_HOST    = "127.0.0.1" # "0.0.0.0" für LAN-Zugriff
+HTTP_API_PORT    = 8765
+
+# =====================================================
+#                 AUSGABE-SINKS 💾
+# =====================================================
+
+# Ohne "sinks" in config.json: bisheriges Verhalten (JSON-Spiegel + CSV)
+DEFAULT_SINKS = [
+    {"type": "json"},
+    {"type": "csv"},
+]
+SINK_FLUSH_TIMEOUT = 5.0       # Sekunden, die beim Beenden für den Flush bleiben
+READER_STOP_TIMEOUT = 1.0      # stop_reader(): max. Warten auf den Reader (Flush läuft danach weiter)
+MIRROR_RECENT = 20             # letzte N Messungen in DATA_FILE["recent"] (Nachholpuffer)
+EXPORT_STEP = 0                # Export-Auflösung in s (0 = Rohwerte), config.json "export_step"
+
+# =====================================================
+#          READER-PROZESS / SHARED MEMORY 🧠
+# =====================================================
+
+# Reader als eigener Prozess (Headless-Collector, eigene Session) statt Thread;
+# Samples per Shared-Memory-Ring (Sink "shm") an die GUI. GUI-Neustart oder
+# -Absturz unterbricht die Messung nicht. config.json "reader_process": {...}
+READER_PROCESS = {
+    "enabled": False,
+    "slots": 1024,             # Ringgröße (Samples)
+    "stop_with_gui": False,    # Collector beim Schließen der GUI mit beenden
+}
+
+# =====================================================
+#                   BERICHTE 🖼️
+# =====================================================
+
+# Mitternachts-Berichte (reports.py), config.json "reports": {...} überschreibt
+REPORTS = {
+    "enabled": False,
+    "daily": True,
+    "weekly": False,           # montags zusätzlich die Vorwoche
+    "formats": ["png"],        # "png" | "pdf"
+    "dir": None,               # None → data/reports
+    "device_id": None,         # None → alle Geräte gemittelt
+}
+# (Name, von kPa, bis kPa) – None = offen
+REPORT_VPD_ZONES = [
+    ("zu niedrig", 0.0, 0.4),
+    ("Stecklinge", 0.4, 0.8),
+    ("Wachstum", 0.8, 1.2),
+    ("Blüte", 1.2, 1.6),
+    ("zu hoch", 1.6, None),
+]
+
+# =====================================================
+#               PLAUSIBILITÄTSFILTER 🧪
+# =====================================================
+
+# Überschreibt filters.DEFAULTS (config.json: "filter": {...})
+FILTER_SETTINGS = {}
+SUSPECT_POINTS = "mark"        # "show" | "mark" | "hide" – auffällige Werte in Charts
+
+# =====================================================
+#               KALIBRIERUNG 🎯
+# =====================================================
+
+# Profile je Gerät ("*" = alle) und Kanal, siehe calibration.py
+# (config.json: "calibration": {...}, überschreibt je Kanal)
+CALIBRATION = {}
+
+# =====================================================
+#               ROLLIERENDE STATISTIK 📈
+# =====================================================
+
+STATS_WINDOWS = {"5m": 300, "1h": 3600, "24h": 86400}  # config.json: "stats_windows"
+STATS_BUCKETS = 120            # Buckets je Fenster (Speicher konstant)
+STATS_CARD_WINDOW = "1h"       # Fenster für die Karten-Unterzeile
+
+# =====================================================
+#                   ALARMREGELN 🚨
+# =====================================================
+
+ALERT_RULES = []               # Standardregeln, config.json: "alerts": {"rules": [...]}
+ALERT_SOUND = None             # WAV-Datei für "sound" (None → System-Beep)
+ALERT_RELOAD_INTERVAL = 2.0    # Sekunden zwischen config.json-Prüfungen (Hot-Reload)
+
 # =====================================================
 #                     OFFSETS
 # =====================================================
@@ -72,6 +215,13 @@ TEMP_DECIMALS = 1        # Nachkommastellen für Temperatur (°C/°F)
 HUMID_DECIMALS = 1       # Nachkommastellen für Luftfeuchte (%)
 VPD_DECIMALS  = 2        # Nachkommastellen für VPD (kPa)
 
+# =====================================================
+#                 PERFORMANCE-MESSUNG ⏱️
+# =====================================================
+
+PERF_ENABLED = False     # Timer/Counter aktiv (config.json: "perf_enabled")
+PERF_WINDOW  = 256       # Messwerte pro Timer im rollierenden Fenster
+
 # =====================================================
 #                     THEME SYSTEM 🌈
 # =====================================================
@@ -106,8 +256,11 @@ def load_active_theme():
         return theme
 
 
+# Headless-Betrieb (python -m collector): kein Theme → kein tkinter-Import
+HEADLESS = bool(os.environ.get("VIVOSUN_HEADLESS"))
+
 # Globale THEME-Variable für alle Module verfügbar machen
-THEME = load_active_theme()
+THEME = None if HEADLESS else load_active_theme()
 
 
 DEBUG_LOGGING = True  # Kann über Settings toggled werden
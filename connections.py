@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+connections.py – Verbindungsprofil je Gerät (data/connections.json) + schneller Reconnect
+
+    prof = connections.profile(device_id)
+    prof.connected(address, connect_s, ttfs_s, path)   # erstes Sample nach Verbindungsaufbau
+    prof.disconnected()
+    delay, path = prof.next_delay(scheduler.reconnect_delay())
+
+Gespeichert: letzte Adresse, Backend, Verbindungsdauer, Zeit bis zum ersten
+Sample (TTFS) der letzten Versuche, letzter Kontakt. Nach einem kurzen
+Aussetzer (letztes Sample < window_s her) verbindet der Reader sofort bzw.
+entlang der kurzen Leiter "delays" neu – erst danach gilt wieder
+RECONNECT_DELAY. Geschrieben wird nur bei Verbindungswechseln, nie je Sample.
+"""
+
+import threading
+import time
+
+import config
+import utils
+
+TTFS_HISTORY = 20
+
+_lock = threading.Lock()
+_profiles = {}
+
+
+def settings():
+    cfg = utils.safe_read_json(config.CONFIG_FILE) or {}
+    out = dict(getattr(config, "FAST_RECONNECT", {}))
+    out.update(cfg.get("fast_reconnect") or {})
+    return out
+
+
+def _path():
+    return getattr(config, "CONNECTIONS_FILE", config.DATA_DIR / "connections.json")
+
+
+class ConnectionProfile:
+    def __init__(self, device_id, data=None):
+        self.device_id = device_id
+        self.data = dict(data or {})
+        self.last_sample = None        # Echtzeit (time.time) des letzten Samples
+        self._ladder = None            # verbleibende Schnell-Wartezeiten (None = keine Leiter)
+        self._armed = False            # nach erfolgreicher Verbindung: nächste Trennung darf schnell
+
+    def attempt_failed(self, path):
+        with _lock:
+            key = "fast_failures" if path == "fast" else "failures"
+            self.data[key] = self.data.get(key, 0) + 1
+            self._save_locked()
+
+    def connected(self, address, connect_s, ttfs_s, path, backend=None):
+        """Erstes Sample nach einem Verbindungsaufbau – Profil aktualisieren und speichern."""
+        now = time.time()
+        self.last_sample = now
+        self._ladder = None
+        self._armed = True
+        with _lock:
+            d = self.data
+            d["address"] = str(address or self.device_id)
+            if backend:
+                d["backend"] = backend
+            d["last_connected"] = now
+            d["connect_s"] = round(connect_s, 3)
+            d["ttfs_s"] = round(ttfs_s, 3)
+            d["path"] = path
+            d["connects"] = d.get("connects", 0) + 1
+            d["ttfs_history"] = (d.get("ttfs_history") or [])[-(TTFS_HISTORY - 1):] + [
+                [round(now, 1), path, round(ttfs_s, 3)]]
+            self._save_locked()
+
+    def sample(self):
+        """Nach jedem weiteren Sample (nur im Speicher)."""
+        self.last_sample = time.time()
+
+    def disconnected(self):
+        """Verbindung verloren – letzten Kontakt festhalten (einmal je Abbruch)."""
+        with _lock:
+            if self.last_sample:
+                self.data["last_seen"] = self.last_sample
+            self._save_locked()
+
+    def next_delay(self, reconnect_delay, cfg=None):
+        """
+        → (Wartezeit in s, "fast" | "full"). Kurz nach einem Aussetzer die
+        Schnell-Leiter, danach bzw. ohne jüngeren Kontakt RECONNECT_DELAY.
+        """
+        cfg = settings() if cfg is None else cfg
+        if not cfg.get("enabled", True):
+            return reconnect_delay, "full"
+        if self._armed:
+            # eine Leiter je Aussetzer – nur, wenn das Gerät eben noch lieferte
+            self._armed = False
+            window = float(cfg.get("window_s", 60.0))
+            if self.last_sample and time.time() - self.last_sample < window:
+                self._ladder = [float(d) for d in cfg.get("delays", (0.0, 0.5, 1.0, 2.0))]
+        if self._ladder:
+            return min(self._ladder.pop(0), reconnect_delay), "fast"
+        return reconnect_delay, "full"
+
+    def _save_locked(self):
+        try:
+            path = _path()
+            all_profiles = utils.safe_read_json(path) or {}
+            all_profiles[self.device_id] = self.data
+            utils.safe_write_json(path, all_profiles)
+        except Exception as e:
+            print(f"⚠️ Verbindungsprofil konnte nicht gespeichert werden: {e}")
+
+
+def profile(device_id):
+    """Profil eines Geräts (einmal je Prozess aus connections.json geladen)."""
+    with _lock:
+        prof = _profiles.get(device_id)
+        if prof is None:
+            stored = (utils.safe_read_json(_path()) or {}).get(device_id)
+            prof = _profiles[device_id] = ConnectionProfile(device_id, stored)
+        return prof
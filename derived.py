@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+derived.py – abgeleitete Kanäle, einmal pro Sample berechnet (statt pro Widget/Tick)
+
+Je Fühler (main → *_int, ext → *_ext):
+    h_main_adj   Luftfeuchte mit humidity_offset, auf 0–100 % begrenzt
+    t_main_leaf  Blatttemperatur = Temperatur + leaf_offset
+    vpd_int      Blatt-VPD  = SVP(T_leaf) − AVP          (Karten / Scatter)
+    vpd_air_int  Luft-VPD   = SVP(T) − AVP
+    dew_int      Taupunkt (°C, Magnus)
+    ah_int       absolute Feuchte (g/m³)
+mit SVP(T) = 0.6108 · exp(17.27·T / (T + 237.3)) kPa und AVP = SVP(T) · RH/100.
+
+derive()       – Einzelsample (math, kein numpy nötig → Reader/Collector)
+derive_arrays() – gleiche Formeln vektorisiert über numpy-Arrays (Historie, Batches)
+SeriesBuffer   – Roh-Puffer für Charts; abgeleitete Serien lazy, gecacht je Offset-Version
+"""
+
+import math
+import os
+import time
+from collections import deque
+
+import config
+import utils
+
+PROBES = (("main", "int"), ("ext", "ext"))
+KEYS = tuple(
+    k for p, s in PROBES
+    for k in (f"h_{p}_adj", f"t_{p}_leaf", f"vpd_{s}", f"vpd_air_{s}", f"dew_{s}", f"ah_{s}")
+)
+
+_A, _B = 17.27, 237.3
+_offsets_check = {"t": 0.0, "mtime": None}
+
+
+# ===============================================================
+# 🎚️ OFFSETS (Hot-Reload aus config.json, max. alle 2 s geprüft)
+# ===============================================================
+def current_offsets():
+    """(leaf_offset, humidity_offset) – auch im Collector aktuell, wenn das
+    Dashboard die Offsets in config.json ändert."""
+    now = time.monotonic()
+    if now - _offsets_check["t"] >= 2.0:
+        _offsets_check["t"] = now
+        try:
+            mtime = os.path.getmtime(config.CONFIG_FILE)
+        except OSError:
+            mtime = None
+        if mtime != _offsets_check["mtime"]:
+            _offsets_check["mtime"] = mtime
+            utils.offsets.load_from_config()
+    return utils.offsets.leaf_offset, utils.offsets.hum_offset
+
+
+# ===============================================================
+# 🧮 SKALAR
+# ===============================================================
+def _svp(t):
+    return 0.6108 * math.exp(_A * t / (t + _B))
+
+
+def probe_values(t, h, leaf_offset=0.0, hum_offset=0.0):
+    """Abgeleitete Werte eines Fühlers (alle None, wenn t oder h fehlt)."""
+    if t is None or h is None:
+        return None, None, None, None, None, None
+    rh = min(max(h + hum_offset, 0.0), 100.0)
+    t_leaf = t + leaf_offset
+    svp = _svp(t)
+    avp = svp * rh / 100.0
+    vpd_leaf = max(0.0, _svp(t_leaf) - avp)
+    vpd_air = svp - avp
+    if rh > 0:
+        g = math.log(rh / 100.0) + _A * t / (_B + t)
+        dew = _B * g / (_A - g)
+    else:
+        dew = None
+    ah = 2166.8 * avp / (t + 273.15)
+    return (
+        round(rh, 2), round(t_leaf, 2), round(vpd_leaf, 3), round(vpd_air, 3),
+        None if dew is None else round(dew, 2), round(ah, 2),
+    )
+
+
+def derive(values, leaf_offset=None, hum_offset=None):
+    """values: {"t_main", "h_main", "t_ext", "h_ext"} → Dict mit KEYS."""
+    if leaf_offset is None or hum_offset is None:
+        leaf, hum = current_offsets()
+        leaf_offset = leaf if leaf_offset is None else leaf_offset
+        hum_offset = hum if hum_offset is None else hum_offset
+    out = {}
+    for p, s in PROBES:
+        rh, t_leaf, vpd_leaf, vpd_air, dew, ah = probe_values(
+            values.get(f"t_{p}"), values.get(f"h_{p}"), leaf_offset, hum_offset)
+        out[f"h_{p}_adj"] = rh
+        out[f"t_{p}_leaf"] = t_leaf
+        out[f"vpd_{s}"] = vpd_leaf
+        out[f"vpd_air_{s}"] = vpd_air
+        out[f"dew_{s}"] = dew
+        out[f"ah_{s}"] = ah
+    return out
+
+
+# ===============================================================
+# 📊 VEKTORISIERT
+# ===============================================================
+def derive_arrays(t, h, leaf_offset=0.0, hum_offset=0.0):
+    """
+    numpy-Variante von probe_values() für ganze Serien (NaN = fehlend).
+    Rückgabe: {"h_adj", "t_leaf", "vpd", "vpd_air", "dew", "ah"} als float-Arrays.
+    """
+    import numpy as np
+
+    t = np.asarray(t, dtype=float)
+    h = np.asarray(h, dtype=float)
+    # wie probe_values(): fehlt t oder h, ist der ganze Fühlerwert fehlend
+    missing = np.isnan(t) | np.isnan(h)
+    t = np.where(missing, np.nan, t)
+    rh = np.where(missing, np.nan, np.clip(h + hum_offset, 0.0, 100.0))
+    t_leaf = t + leaf_offset
+    svp = 0.6108 * np.exp(_A * t / (t + _B))
+    avp = svp * rh / 100.0
+    vpd_leaf = np.maximum(0.6108 * np.exp(_A * t_leaf / (t_leaf + _B)) - avp, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        g = np.log(rh / 100.0) + _A * t / (_B + t)
+        dew = np.where(rh > 0, _B * g / (_A - g), np.nan)
+    ah = 2166.8 * avp / (t + 273.15)
+    return {
+        "h_adj": np.round(rh, 2),
+        "t_leaf": np.round(t_leaf, 2),
+        "vpd": np.round(vpd_leaf, 3),
+        "vpd_air": np.round(svp - avp, 3),
+        "dew": np.round(dew, 2),
+        "ah": np.round(ah, 2),
+    }
+
+
+# ===============================================================
+# 🗂️ ROH-PUFFER + LAZY ABGELEITETE SERIEN
+# ===============================================================
+RAW_KEYS = ("t_main", "h_main", "t_ext", "h_ext")
+
+
+def _nan_to_none(arr):
+    return [None if v != v else float(v) for v in arr.tolist()]
+
+
+class SeriesBuffer:
+    """
+    Speichert nur Rohwerte (RAW_KEYS). Offset-abhängige Serien (KEYS) werden
+    bei Bedarf berechnet und je utils.offsets.version gecacht:
+      - neue Samples bei gleicher Version → nur das neue Sample (skalar)
+      - Offset geändert → ganze Serie in einem vektorisierten Durchlauf
+    So zeigt der Verlauf nach einer Offset-Änderung durchgehend eine Kalibrierung.
+    """
+
+    def __init__(self, maxlen=200):
+        self.maxlen = int(maxlen)
+        self.raw = {k: deque(maxlen=self.maxlen) for k in RAW_KEYS}
+        self._cache = None
+        self._version = None
+
+    def __len__(self):
+        return len(self.raw["t_main"])
+
+    def clear(self):
+        for buf in self.raw.values():
+            buf.clear()
+        self._cache = None
+
+    def append(self, values):
+        """values: Dict mit Rohwerten (fehlend/auffällig ausgeblendet = None)."""
+        for k in RAW_KEYS:
+            self.raw[k].append(values.get(k))
+        if self._cache is not None and self._version == self._current_version():
+            leaf, hum = utils.offsets.leaf_offset, utils.offsets.hum_offset
+            for k, v in derive(values, leaf, hum).items():
+                self._cache[k].append(v)
+        else:
+            self._cache = None
+
+    def extend(self, rows):
+        """Bulk-Load (z. B. Historie): Rohwerte anhängen, Cache neu aufbauen lassen."""
+        for row in rows:
+            for k in RAW_KEYS:
+                self.raw[k].append(row.get(k))
+        self._cache = None
+
+    def series(self, key):
+        """Liste für Roh- oder abgeleiteten Kanal (gleich lang wie die Rohpuffer)."""
+        if key in self.raw:
+            return list(self.raw[key])
+        if self._cache is None or self._version != self._current_version():
+            self._rebuild()
+        return list(self._cache[key])
+
+    @staticmethod
+    def _current_version():
+        current_offsets()  # ggf. Hot-Reload aus config.json (anderer Prozess)
+        return utils.offsets.version
+
+    def _rebuild(self):
+        import numpy as np
+
+        version = self._current_version()
+        leaf, hum = utils.offsets.leaf_offset, utils.offsets.hum_offset
+        cache = {k: deque(maxlen=self.maxlen) for k in KEYS}
+        for p, s in PROBES:
+            t = np.array([np.nan if v is None else v for v in self.raw[f"t_{p}"]], dtype=float)
+            h = np.array([np.nan if v is None else v for v in self.raw[f"h_{p}"]], dtype=float)
+            out = derive_arrays(t, h, leaf, hum)
+            cache[f"h_{p}_adj"].extend(_nan_to_none(out["h_adj"]))
+            cache[f"t_{p}_leaf"].extend(_nan_to_none(out["t_leaf"]))
+            cache[f"vpd_{s}"].extend(_nan_to_none(out["vpd"]))
+            cache[f"vpd_air_{s}"].extend(_nan_to_none(out["vpd_air"]))
+            cache[f"dew_{s}"].extend(_nan_to_none(out["dew"]))
+            cache[f"ah_{s}"].extend(_nan_to_none(out["ah"]))
+        self._cache, self._version = cache, version
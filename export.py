@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+export.py – Streaming-Export der Historie (CSV, JSONL, Parquet)
+Liest blockweise aus history_store (bzw. HISTORY_FILE, wenn keine SQLite-DB
+existiert) und schreibt direkt in die Zieldatei – Speicher ~ ein Block,
+egal wie groß der Zeitraum ist.
+
+    job = export.start_export("season.csv.gz", t_from, t_to, step=300)
+    job.progress  → 0.0 … 1.0     job.cancel()     job.state / job.error
+
+Formate:     csv | jsonl | parquet (pyarrow, optional)
+Kompression: gzip | zstd (zstandard, optional) – bei Parquet als Spalten-Codec
+Auflösung:   step = 0 → Rohwerte, step > 0 → Mittelwerte je step Sekunden
+"""
+
+import csv
+import datetime
+import gzip
+import io
+import json
+import os
+import threading
+import time
+
+import config
+import history_store
+import utils
+
+FORMATS = ("csv", "jsonl", "parquet")
+COMPRESSIONS = (None, "gzip", "zstd")
+_EXT_COMPRESSION = {".gz": "gzip", ".zst": "zstd"}
+_EXT_FORMAT = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+
+
+class ExportError(RuntimeError):
+    pass
+
+
+def detect(path):
+    """Format + Kompression aus dem Dateinamen ("x.csv.gz" → ("csv", "gzip"))."""
+    root, ext = os.path.splitext(path.lower())
+    compression = _EXT_COMPRESSION.get(ext)
+    if compression:
+        root, ext = os.path.splitext(root)
+    return _EXT_FORMAT.get(ext, "csv"), compression
+
+
+def fields_for(step):
+    if step > 0:
+        return ("timestamp", "ts", "n") + history_store.COLUMNS
+    return ("timestamp", "ts", "device_id") + history_store.COLUMNS
+
+
+# ===============================================================
+# 📥 QUELLEN (blockweise)
+# ===============================================================
+def _iter_csv(t_from, t_to, step, path, chunk):
+    """HISTORY_FILE (Timestamp, Temperature, Humidity, VPD) → Blöcke wie history_store."""
+    fmt = "%Y-%m-%d %H:%M:%S"
+    lo = datetime.datetime.fromtimestamp(t_from).strftime(fmt)
+    hi = datetime.datetime.fromtimestamp(t_to).strftime(fmt)
+    names = ("t_main", "h_main", "vpd_air_int")  # CSV-"VPD" = Luft-VPD ohne Offsets
+    block, bucket = [], None  # bucket: [key, n, sums, counts] – Datei ist zeitlich sortiert
+
+    def flush_bucket():
+        key, n, sums, counts = bucket
+        p = {"ts": t_from + key * step, "n": n}
+        p.update({c: None for c in history_store.COLUMNS})
+        p.update({c: (round(s / k, 3) if k else None) for c, s, k in zip(names, sums, counts)})
+        block.append(p)
+
+    try:
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if not row or row[0] < lo or row[0] > hi:
+                    continue
+                try:
+                    ts = datetime.datetime.strptime(row[0], fmt).timestamp()
+                except ValueError:
+                    continue
+                values = [_to_float(v) for v in row[1:4]]
+                if step > 0:
+                    key = int((ts - t_from) // step)
+                    if bucket is not None and bucket[0] != key:
+                        flush_bucket()
+                        bucket = None
+                    if bucket is None:
+                        bucket = [key, 0, [0.0] * 3, [0] * 3]
+                    bucket[1] += 1
+                    for i, v in enumerate(values):
+                        if v is not None:
+                            bucket[2][i] += v
+                            bucket[3][i] += 1
+                else:
+                    rec = {"ts": ts, "device_id": None}
+                    rec.update({c: None for c in history_store.COLUMNS})
+                    rec.update(zip(names, values))
+                    block.append(rec)
+                if len(block) >= chunk:
+                    yield block
+                    block = []
+    except FileNotFoundError:
+        return
+    if bucket is not None:
+        flush_bucket()
+    if block:
+        yield block
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_source(t_from, t_to, step=0.0, device_id=None, chunk=5000):
+    if history_store.exists():
+        return history_store.iter_range(t_from, t_to, step, device_id=device_id, chunk=chunk)
+    return _iter_csv(t_from, t_to, step, utils.resource_path(config.HISTORY_FILE), chunk)
+
+
+# ===============================================================
+# 📤 WRITER
+# ===============================================================
+def _open_binary(path, compression):
+    if compression == "gzip":
+        return gzip.open(path, "wb", compresslevel=6)
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ExportError("zstd benötigt das Paket 'zstandard' (pip install zstandard)") from None
+        raw = open(path, "wb")
+        return zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=True)
+    return open(path, "wb")
+
+
+class _TextWriter:
+    def __init__(self, path, fields, compression):
+        self.fields = fields
+        self._bin = _open_binary(path, compression)
+        self._f = io.TextIOWrapper(self._bin, encoding="utf-8", newline="")
+
+    def close(self):
+        self._f.close()
+
+
+class CsvWriter(_TextWriter):
+    def __init__(self, path, fields, compression):
+        super().__init__(path, fields, compression)
+        self._w = csv.writer(self._f)
+        self._w.writerow(fields)
+
+    def write(self, rows):
+        self._w.writerows([["" if r.get(k) is None else r.get(k) for k in self.fields] for r in rows])
+
+
+class JsonlWriter(_TextWriter):
+    def write(self, rows):
+        self._f.write("".join(
+            json.dumps({k: r.get(k) for k in self.fields}, ensure_ascii=False) + "\n" for r in rows))
+
+
+class ParquetWriter:
+    def __init__(self, path, fields, compression):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ExportError("Parquet benötigt das Paket 'pyarrow' (pip install pyarrow)") from None
+        self._pa = pa
+        self.fields = fields
+        types = {"timestamp": pa.string(), "device_id": pa.string(), "n": pa.int64()}
+        self._schema = pa.schema([(k, types.get(k, pa.float64())) for k in fields])
+        self._w = pq.ParquetWriter(path, self._schema, compression=compression or "snappy")
+
+    def write(self, rows):
+        columns = {k: [r.get(k) for r in rows] for k in self.fields}
+        self._w.write_table(self._pa.Table.from_pydict(columns, schema=self._schema))
+
+    def close(self):
+        self._w.close()
+
+
+WRITERS = {"csv": CsvWriter, "jsonl": JsonlWriter, "parquet": ParquetWriter}
+
+
+# ===============================================================
+# 🧵 EXPORT-JOB (Hintergrund-Thread)
+# ===============================================================
+class ExportJob(threading.Thread):
+    """Ein Export im Hintergrund; schreibt nach <path>.part und benennt erst am Ende um."""
+
+    def __init__(self, path, t_from, t_to, fmt=None, compression=None, step=0.0,
+                 device_id=None, chunk=5000, on_done=None):
+        super().__init__(name="export", daemon=True)
+        auto_fmt, auto_comp = detect(path)
+        self.path = path
+        self.fmt = fmt or auto_fmt
+        self.compression = compression if compression is not None else auto_comp
+        if self.fmt not in FORMATS:
+            raise ExportError(f"unbekanntes Format '{self.fmt}'")
+        if self.compression not in COMPRESSIONS:
+            raise ExportError(f"unbekannte Kompression '{self.compression}'")
+        self.t_from, self.t_to = float(t_from), float(t_to)
+        self.step = float(step or 0.0)
+        self.device_id = device_id
+        self.chunk = int(chunk)
+        self.on_done = on_done
+        self.progress = 0.0
+        self.rows = 0
+        self.state = "pending"   # pending | running | done | cancelled | error
+        self.error = None
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        self.state = "running"
+        tmp = self.path + ".part"
+        writer = None
+        try:
+            writer = WRITERS[self.fmt](tmp, fields_for(self.step), self.compression)
+            origin = None  # Fortschritt ab erster echter Zeile (t_from darf 0 sein)
+            for block in iter_source(self.t_from, self.t_to, self.step, self.device_id, self.chunk):
+                if self._cancel.is_set():
+                    break
+                if origin is None:
+                    origin = block[0]["ts"]
+                    span = max(self.t_to - origin, 1e-9)
+                for r in block:
+                    r["timestamp"] = datetime.datetime.fromtimestamp(r["ts"]).isoformat(timespec="seconds")
+                writer.write(block)
+                self.rows += len(block)
+                self.progress = min(1.0, (block[-1]["ts"] - origin) / span)
+            writer.close()
+            writer = None
+            if self._cancel.is_set():
+                os.remove(tmp)
+                self.state = "cancelled"
+                print(f"⏹️ Export abgebrochen ({self.rows} Zeilen verworfen).")
+            else:
+                os.replace(tmp, self.path)
+                self.progress = 1.0
+                self.state = "done"
+                print(f"💾 Export fertig → {self.path} ({self.rows} Zeilen)")
+        except Exception as e:
+            self.error = e
+            self.state = "error"
+            print(f"❌ Export fehlgeschlagen: {e}")
+            try:
+                if writer is not None:
+                    writer.close()
+            except Exception:
+                pass
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+        finally:
+            if self.on_done:
+                try:
+                    self.on_done(self)
+                except Exception as e:
+                    print(f"⚠️ Export-Callback-Fehler: {e}")
+
+
+# ===============================================================
+# 📅 ZEITRAUM (Export-Dialog)
+# ===============================================================
+RANGE_PRESETS = {
+    "Letzte 24 Stunden": 86400,
+    "Letzte 7 Tage": 7 * 86400,
+    "Letzte 30 Tage": 30 * 86400,
+    "Alles": None,
+}
+TIME_FORMATS = ("%Y-%m-%d %H:%M", "%Y-%m-%d")
+
+
+def parse_time(text):
+    """"2025-03-01" bzw. "2025-03-01 18:30" (Ortszeit) → Epoch-Sekunden."""
+    text = (text or "").strip()
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, fmt).timestamp()
+        except ValueError:
+            continue
+    raise ExportError(f"Ungültiges Datum: {text!r} (erwartet JJJJ-MM-TT [HH:MM])")
+
+
+def preset_range(name, now=None):
+    """Voreinstellung aus RANGE_PRESETS → (t_from, t_to)."""
+    now = time.time() if now is None else now
+    span = RANGE_PRESETS[name]
+    return (0.0 if span is None else now - span), now
+
+
+def start_export(path, t_from, t_to, **kwargs):
+    """Startet einen ExportJob und gibt ihn zurück (kwargs siehe ExportJob)."""
+    job = ExportJob(path, t_from, t_to, **kwargs)
+    job.start()
+    return job
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+feed.py – neue Messungen aus DATA_FILE lückenlos und ohne Duplikate lesen
+
+Der Reader nummeriert jedes Sample ("seq") und stempelt die Erfassungszeit
+("ts"); der JSON-Spiegel führt die letzten N Samples in "recent" mit.
+SampleCursor merkt sich die zuletzt gesehene seq:
+
+    cursor = SampleCursor(config.DATA_FILE)
+    new, latest = cursor.poll()   # new = nur unbekannte Samples, nach seq sortiert
+
+Unverändertes DATA_FILE (mtime/Größe) → kein JSON-Parse. seq kleiner als
+zuletzt gesehen → neuer Reader-Lauf, Zählung beginnt neu.
+
+Läuft der Reader als eigener Prozess mit Shared-Memory-Ring (Sink "shm",
+shm_ring.py), liest der Cursor direkt aus dem Ring; ohne Ring oder nach dem
+Ende des Schreibers fällt er auf DATA_FILE zurück.
+
+load_history() liefert beim Start die letzten Minuten aus der persistenten
+Historie (history.db, sonst das Ende von HISTORY_FILE) zum Vorbefüllen.
+"""
+
+import datetime
+import os
+import time
+
+import config
+import history_store
+import utils
+
+RING_RETRY_S = 5.0   # so oft nach einem (neuen) Ring sehen
+CSV_ROW_BYTES = 96   # großzügige Zeilenlänge von HISTORY_FILE (Tail-Lesen)
+
+
+class SampleCursor:
+    def __init__(self, path, use_ring=True):
+        self.path = utils.resource_path(path)
+        self.last_seq = None
+        self.latest = {}
+        self.missed = 0   # Samples, die selbst "recent" nicht mehr enthielt
+        self._stamp = None
+        self._use_ring = use_ring
+        self._ring = None
+        self._ring_checked = -RING_RETRY_S
+
+    def reset(self):
+        """Position vergessen – im Ring ab dem aktuellen Stand weiterlesen."""
+        self.last_seq = self._ring.head() if self._ring is not None else None
+
+    # --- Shared-Memory-Ring ---
+    def _attach_ring(self):
+        now = time.monotonic()
+        if not self._use_ring or now - self._ring_checked < RING_RETRY_S:
+            return None
+        self._ring_checked = now
+        try:
+            import shm_ring
+            ring = shm_ring.RingReader.attach(shm_ring.name_for(self.path))
+        except Exception as e:
+            print(f"⚠️ Shared-Memory-Ring nicht lesbar: {e}")
+            return None
+        if ring is not None:
+            if not ring.writer_alive():
+                ring.close()
+                return None
+            print(f"🧠 Lese Samples aus Shared Memory ({ring.slots} Slots, PID {ring.pid})")
+            self.last_seq = None
+        return ring
+
+    def _poll_ring(self):
+        ring = self._ring
+        if not ring.writer_alive():
+            # Collector beendet → Ring verwerfen, Datei bzw. neuer Ring übernehmen
+            ring.close()
+            self._ring = None
+            self._stamp = None
+            self.last_seq = None
+            return None
+        if ring.cleared():
+            self.latest = {}
+            self.last_seq = ring.head()   # Samples vor dem Leeren nicht erneut liefern
+        missed = ring.missed
+        new, self.last_seq = ring.read_since(self.last_seq)
+        self.missed += ring.missed - missed
+        if new:
+            self.latest = new[-1]
+        return new, self.latest
+
+    def poll(self):
+        """→ (neue Samples, jüngster Stand)."""
+        if self._ring is None:
+            self._ring = self._attach_ring()
+        if self._ring is not None:
+            result = self._poll_ring()
+            if result is not None:
+                return result
+
+        try:
+            st = os.stat(self.path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        if stamp == self._stamp:
+            return [], self.latest
+        self._stamp = stamp
+        d = (utils.safe_read_json(self.path) or {}) if stamp else {}
+        self.latest = d
+
+        if d.get("seq") is None:
+            # geleert (Sensorwechsel/Trennung) oder Reader ohne seq
+            return [], d
+        recent = d.get("recent") or [d]
+        if self.last_seq is not None and d["seq"] < self.last_seq:
+            self.last_seq = None  # Reader neu gestartet
+
+        if self.last_seq is None:
+            new = [r for r in recent if r.get("seq") is not None]
+        else:
+            new = [r for r in recent if r.get("seq") is not None and r["seq"] > self.last_seq]
+            if new and new[0]["seq"] > self.last_seq + 1:
+                self.missed += new[0]["seq"] - self.last_seq - 1
+        new.sort(key=lambda r: r["seq"])
+        if new:
+            self.last_seq = new[-1]["seq"]
+        return new, d
+
+
+# ===============================================================
+# 📈 HISTORIE FÜR DEN START
+# ===============================================================
+def load_history(minutes, limit, device_id=None):
+    """
+    Letzte minutes Minuten (max. limit Zeilen, älteste zuerst) als
+    [{ts, t_main, h_main, t_ext, h_ext, …}] – eine Abfrage bzw. ein Tail-Read.
+    """
+    t_from = time.time() - float(minutes) * 60.0
+    if history_store.exists():
+        return history_store.recent(t_from, limit, device_id=device_id)
+    return _csv_tail(utils.resource_path(config.HISTORY_FILE), t_from, limit)
+
+
+def _csv_tail(path, t_from, limit):
+    """Nur das Dateiende lesen – HISTORY_FILE wächst über Neustarts hinweg."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - (limit + 1) * CSV_ROW_BYTES))
+            lines = f.read().decode("utf-8", "replace").splitlines()
+    except OSError:
+        return []
+    if len(lines) > limit:
+        lines = lines[-limit:]  # erste Zeile ggf. angeschnitten
+    rows = []
+    for line in lines:
+        parts = line.split(",")
+        if len(parts) < 3:
+            continue
+        try:
+            ts = datetime.datetime.strptime(parts[0], "%Y-%m-%d %H:%M:%S").timestamp()
+        except ValueError:
+            continue  # Kopfzeile / angeschnittene Zeile
+        if ts < t_from:
+            continue
+        rows.append({"ts": ts, "t_main": _to_float(parts[1]), "h_main": _to_float(parts[2]),
+                     "t_ext": None, "h_ext": None})
+    return rows
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+filters.py – Plausibilitätsfilter je Kanal (ersetzt async_reader.sanitize)
+Jeder Messwert bekommt ein Qualitäts-Flag statt stillschweigend None zu werden:
+    "ok"       – unauffällig
+    "missing"  – kein Wert / Fühler nicht gesteckt (Wert = None)
+    "range"    – außerhalb des physikalischen Bereichs
+    "spike"    – Hampel-Filter: weicht stark vom Median der letzten N Werte ab
+    "stuck"    – identischer Wert länger als stuck_s Sekunden
+Auffällige Werte bleiben als Rohwert erhalten – Charts entscheiden selbst
+(ausblenden / markieren, config.json "suspect_points").
+Aufwand pro Sample konstant (Fenster fester Länge N).
+"""
+
+import math
+from collections import deque
+
+import config
+
+OK, MISSING, RANGE, SPIKE, STUCK = "ok", "missing", "range", "spike", "stuck"
+CHANNELS = ("t_main", "h_main", "t_ext", "h_ext")
+
+# Nicht gesteckter Fühler meldet Temperatur UND Feuchte ≈ 0 – erst beide
+# zusammen gelten als "fehlt" (0 °C allein ist ein gültiger Messwert).
+ABSENT_EPS = 0.07
+
+DEFAULTS = {
+    "temp_range": (-40.0, 80.0),
+    "hum_range": (0.0, 100.0),
+    "window": 7,          # Hampel-Fenster (Werte)
+    "k": 3.0,             # Schwelle in skalierten MADs
+    "temp_min_delta": 0.5,  # Mindestabweichung (°C) – Quantisierung → MAD = 0
+    "hum_min_delta": 2.0,   # Mindestabweichung (%)
+    "stuck_s": 1800.0,    # 0 = aus
+}
+
+
+def to_float(value):
+    """Beliebige Rohwerte → float oder None (NaN/inf/ungültig → None)."""
+    if value is None:
+        return None
+    try:
+        v = float(value)
+    except (TypeError, ValueError):
+        return None
+    return v if math.isfinite(v) else None
+
+
+# ===============================================================
+# 📏 EIN KANAL
+# ===============================================================
+class ChannelFilter:
+    __slots__ = ("lo", "hi", "k", "min_delta", "stuck_s", "_win", "_run_value", "_run_since")
+
+    def __init__(self, lo, hi, window=7, k=3.0, min_delta=0.5, stuck_s=1800.0):
+        self.lo, self.hi = float(lo), float(hi)
+        self.k = float(k)
+        self.min_delta = float(min_delta)
+        self.stuck_s = float(stuck_s)
+        self._win = deque(maxlen=max(3, int(window)))
+        self.reset()
+
+    def reset(self):
+        self._win.clear()
+        self._run_value = None
+        self._run_since = None
+
+    def push(self, value, ts):
+        """Bewertet value (float oder None) und liefert das Flag."""
+        if value is None:
+            self.reset()  # nach Lücke/Fühlerwechsel neu einschwingen
+            return MISSING
+        if not (self.lo <= value <= self.hi):
+            return RANGE  # nicht ins Fenster – sonst verzerrt der Ausreißer den Median
+
+        flag = OK
+        win = self._win
+        if len(win) >= 3:
+            s = sorted(win)
+            med = s[len(s) // 2]
+            mad = sorted(abs(v - med) for v in s)[len(s) // 2]
+            if abs(value - med) > max(self.k * 1.4826 * mad, self.min_delta):
+                flag = SPIKE
+        win.append(value)
+
+        if value != self._run_value:
+            self._run_value, self._run_since = value, ts
+        elif flag == OK and self.stuck_s > 0 and ts - self._run_since >= self.stuck_s:
+            flag = STUCK
+        return flag
+
+
+# ===============================================================
+# 🧪 ALLE KANÄLE EINES GERÄTS
+# ===============================================================
+def settings_from_config(cfg=None):
+    settings = dict(DEFAULTS, **getattr(config, "FILTER_SETTINGS", {}))
+    if cfg is None:
+        import utils
+        cfg = utils.safe_read_json(config.CONFIG_FILE) or {}
+    settings.update(cfg.get("filter") or {})
+    return settings
+
+
+class SampleFilter:
+    """Ein Filter je Gerät (Reader); apply() → (werte, quality)."""
+
+    def __init__(self, settings=None):
+        s = dict(DEFAULTS, **(settings or settings_from_config()))
+        common = {"window": s["window"], "k": s["k"], "stuck_s": s["stuck_s"]}
+        self.channels = {}
+        for ch in CHANNELS:
+            if ch.startswith("t_"):
+                self.channels[ch] = ChannelFilter(*s["temp_range"], min_delta=s["temp_min_delta"], **common)
+            else:
+                self.channels[ch] = ChannelFilter(*s["hum_range"], min_delta=s["hum_min_delta"], **common)
+
+    def apply(self, raw, ts):
+        values = {ch: to_float(raw.get(ch)) for ch in CHANNELS}
+        for probe in ("main", "ext"):
+            t, h = values[f"t_{probe}"], values[f"h_{probe}"]
+            if t is not None and h is not None and abs(t) <= ABSENT_EPS and abs(h) <= ABSENT_EPS:
+                values[f"t_{probe}"] = values[f"h_{probe}"] = None
+        quality = {ch: self.channels[ch].push(values[ch], ts) for ch in CHANNELS}
+        return values, quality
+
+
+def is_suspect(flag):
+    return flag in (RANGE, SPIKE, STUCK)
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+history_store.py – persistente Messwert-Historie in SQLite (data/history.db)
+Eine Tabelle `samples` (ts = Epoch-Sekunden, Index auf ts) – Abfragen nach
+Zeitbereich mit serverseitiger Mittelung über Buckets (GROUP BY).
+Neben den kalibrierten Werten werden die unkalibrierten Rohwerte (raw_*) und
+die Profilversion (cal) gespeichert → recalibrate() leitet nach einer
+Profiländerung die Historie vektorisiert neu ab.
+"""
+
+import os
+import sqlite3
+import threading
+
+import calibration
+import config
+import derived
+import utils
+
+# vpd_air_int = Luft-VPD ohne Offsets – "vpd_int" (Blatt-VPD) wird beim Lesen abgeleitet
+COLUMNS = ("t_main", "h_main", "t_ext", "h_ext", "vpd_air_int")
+RAW_COLUMNS = tuple(f"raw_{c}" for c in calibration.CHANNELS)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    ts        REAL NOT NULL,
+    device_id TEXT,
+    t_main    REAL,
+    h_main    REAL,
+    t_ext     REAL,
+    h_ext     REAL,
+    vpd_air_int REAL,
+    raw_t_main REAL,
+    raw_h_main REAL,
+    raw_t_ext  REAL,
+    raw_h_ext  REAL,
+    cal        TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_samples_ts ON samples (ts);
+"""
+
+_schema_lock = threading.Lock()
+
+
+def default_path():
+    return str(getattr(config, "HISTORY_DB", os.path.join(str(config.DATA_DIR), "history.db")))
+
+
+def connect(path=None, readonly=False):
+    """Öffnet die DB (WAL → Leser blockieren den Schreiber nicht)."""
+    path = path or default_path()
+    if readonly:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=5)
+    else:
+        conn = sqlite3.connect(path, timeout=10)
+        with _schema_lock:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            _migrate(conn)
+    return conn
+
+
+def _migrate(conn):
+    """
+    Ältere DBs: vpd_int (war schon immer Luft-VPD) → vpd_air_int umbenennen;
+    ohne raw_*/cal Spalten ergänzen, bisherige Werte waren unkalibriert.
+    """
+    have = {row[1] for row in conn.execute("PRAGMA table_info(samples)")}
+    if "vpd_int" in have and "vpd_air_int" not in have:
+        with conn:
+            conn.execute("ALTER TABLE samples RENAME COLUMN vpd_int TO vpd_air_int")
+        have = (have - {"vpd_int"}) | {"vpd_air_int"}
+    missing = [c for c in RAW_COLUMNS + ("cal",) if c not in have]
+    if not missing:
+        return
+    with conn:
+        for col in missing:
+            conn.execute(f"ALTER TABLE samples ADD COLUMN {col} {'TEXT' if col == 'cal' else 'REAL'}")
+        conn.execute(
+            "UPDATE samples SET "
+            + ", ".join(f"raw_{c} = {c}" for c in calibration.CHANNELS)
+            + " WHERE raw_t_main IS NULL AND raw_h_main IS NULL"
+        )
+
+
+def exists(path=None):
+    return os.path.exists(path or default_path())
+
+
+def insert_samples(conn, records):
+    """records: Iterable von Sample-Dicts (ts, device_id, t_main, …, raw, cal).
+    Gespeichert werden Sensorwerte ohne Anzeige-Offsets – offsetabhängige Kanäle
+    werden beim Lesen abgeleitet."""
+    rows = []
+    for r in records:
+        if r.get("ts") is None:
+            continue
+        raw = r.get("raw") or r
+        rows.append(
+            (r["ts"], r.get("device_id"), r.get("t_main"), r.get("h_main"), r.get("t_ext"),
+             r.get("h_ext"), utils.calc_vpd(r.get("t_main"), r.get("h_main")))
+            + tuple(raw.get(c) for c in calibration.CHANNELS)
+            + (r.get("cal"),)
+        )
+    if rows:
+        cols = COLUMNS + RAW_COLUMNS + ("cal",)
+        with conn:
+            conn.executemany(
+                f"INSERT INTO samples (ts, device_id, {', '.join(cols)}) "
+                f"VALUES (?, ?, {', '.join('?' * len(cols))})",
+                rows,
+            )
+    return len(rows)
+
+
+def recalibrate(device_id=None, path=None, chunk=50_000):
+    """
+    Leitet gespeicherte Werte aus raw_* mit dem aktuellen Profil neu ab
+    (nur Zeilen mit abweichender Profilversion, blockweise vektorisiert).
+    Liefert die Anzahl aktualisierter Zeilen.
+    """
+    import numpy as np
+
+    if not exists(path):
+        return 0
+    conn = connect(path)
+    try:
+        if device_id:
+            devices = [device_id]
+        else:
+            devices = [row[0] for row in conn.execute("SELECT DISTINCT device_id FROM samples")]
+        updated = 0
+        for dev in devices:
+            profile = calibration.profile_for(dev)
+            dev_clause = "device_id IS ?" if dev is None else "device_id = ?"
+            last = 0
+            while True:
+                rows = conn.execute(
+                    f"SELECT rowid, {', '.join(RAW_COLUMNS)} FROM samples "
+                    f"WHERE {dev_clause} AND cal IS NOT ? AND rowid > ? ORDER BY rowid LIMIT ?",
+                    (dev, profile.version, last, chunk),
+                ).fetchall()
+                if not rows:
+                    break
+                last = rows[-1][0]
+                arr = np.array([[np.nan if v is None else v for v in row[1:]] for row in rows], dtype=float)
+                cal = profile.apply_arrays({c: arr[:, i] for i, c in enumerate(calibration.CHANNELS)})
+                vpd = derived.derive_arrays(cal["t_main"], cal["h_main"])["vpd_air"]
+                cols = [cal[c] for c in calibration.CHANNELS] + [vpd]
+                values = [
+                    tuple(None if v != v else float(v) for v in vals) + (profile.version, rowid)
+                    for rowid, *vals in zip([row[0] for row in rows], *cols)
+                ]
+                with conn:
+                    conn.executemany(
+                        f"UPDATE samples SET {', '.join(f'{c} = ?' for c in COLUMNS)}, cal = ? "
+                        f"WHERE rowid = ?",
+                        values,
+                    )
+                updated += len(values)
+        return updated
+    finally:
+        conn.close()
+
+
+def query_range(t_from, t_to, step=0.0, device_id=None, path=None, max_points=5000):
+    """
+    Liefert Punkte [{ts, n, t_main, …}] im Bereich [t_from, t_to].
+    step > 0 → Mittelwert je Bucket; step = 0 → automatisch auf ≤ max_points.
+    """
+    if not exists(path):
+        return []
+    if step <= 0:
+        step = max(1.0, (t_to - t_from) / max_points)
+
+    where = "ts >= ? AND ts <= ?"
+    params = [t_from, t_to]
+    if device_id:
+        where += " AND device_id = ?"
+        params.append(device_id)
+
+    avgs = ", ".join(f"AVG({c})" for c in COLUMNS)
+    sql = (
+        f"SELECT CAST((ts - ?) / ? AS INTEGER) AS b, COUNT(*), {avgs} "
+        f"FROM samples WHERE {where} GROUP BY b ORDER BY b"
+    )
+    conn = connect(path, readonly=True)
+    try:
+        points = []
+        for row in conn.execute(sql, [t_from, step] + params):
+            p = {"ts": t_from + row[0] * step, "n": row[1]}
+            for name, val in zip(COLUMNS, row[2:]):
+                p[name] = None if val is None else round(val, 3)
+            points.append(p)
+        return points
+    finally:
+        conn.close()
+
+
+def recent(t_from, limit, device_id=None, path=None):
+    """
+    Jüngste Rohzeilen ab t_from (max. limit, älteste zuerst) – eine indizierte
+    Abfrage für das Vorbefüllen der Chart-Puffer beim Start.
+    """
+    if not exists(path):
+        return []
+    where = "ts >= ?"
+    params = [t_from]
+    if device_id:
+        where += " AND device_id = ?"
+        params.append(device_id)
+    sql = (f"SELECT ts, device_id, {', '.join(COLUMNS)} FROM samples "
+           f"WHERE {where} ORDER BY ts DESC LIMIT ?")
+    conn = connect(path, readonly=True)
+    try:
+        rows = conn.execute(sql, params + [int(limit)]).fetchall()
+    finally:
+        conn.close()
+    keys = ("ts", "device_id") + COLUMNS
+    return [dict(zip(keys, r)) for r in reversed(rows)]
+
+
+def iter_range(t_from, t_to, step=0.0, device_id=None, path=None, chunk=5000):
+    """
+    Streamt den Bereich [t_from, t_to] blockweise (Listen von Dicts, nach ts sortiert).
+    step = 0 → Rohzeilen (ts, device_id, …); step > 0 → Bucket-Mittelwerte (ts, n, …).
+    Speicherbedarf ~ chunk Zeilen, unabhängig von der Bereichsgröße.
+    """
+    if not exists(path):
+        return
+    where = "ts >= ? AND ts <= ?"
+    params = [t_from, t_to]
+    if device_id:
+        where += " AND device_id = ?"
+        params.append(device_id)
+
+    if step > 0:
+        avgs = ", ".join(f"AVG({c})" for c in COLUMNS)
+        sql = (f"SELECT CAST((ts - ?) / ? AS INTEGER) AS b, COUNT(*), {avgs} "
+               f"FROM samples WHERE {where} GROUP BY b ORDER BY b")
+        params = [t_from, step] + params
+    else:
+        sql = f"SELECT ts, device_id, {', '.join(COLUMNS)} FROM samples WHERE {where} ORDER BY ts"
+
+    conn = connect(path, readonly=True)
+    try:
+        cur = conn.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(chunk)
+            if not rows:
+                break
+            if step > 0:
+                yield [
+                    dict({"ts": t_from + r[0] * step, "n": r[1]},
+                         **{c: None if v is None else round(v, 3) for c, v in zip(COLUMNS, r[2:])})
+                    for r in rows
+                ]
+            else:
+                yield [dict(zip(("ts", "device_id") + COLUMNS, r)) for r in rows]
+    finally:
+        conn.close()
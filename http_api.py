@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+http_api.py – optionaler lokaler HTTP-Server (asyncio, ohne Zusatzpakete)
+Endpunkte:
+    GET /latest[?device=]          → letzte Messung (JSON)
+    GET /status                    → Verbindungs-/Sensorstatus (JSON)
+    GET /history?from=&to=&step=[&device=] → Verlauf aus history.db (SQLite-Sink) bzw.
+                                       HISTORY_FILE, serverseitig gemittelt
+    GET /stream                    → Server-Sent Events, eine Nachricht pro Messung
+    GET /metrics                   → Prometheus-Textformat (metrics.py)
+
+Konfiguration (config.json):
+    "http_api": {"enabled": true, "host": "127.0.0.1", "port": 8765}
+Läuft entweder im eigenen Thread (start_in_thread) oder als Task auf einem
+vorhandenen Loop (await serve(...)), z. B. im Headless-Collector.
+"""
+
+import asyncio
+import csv
+import datetime
+import json
+import threading
+import time
+from urllib.parse import urlsplit, parse_qs
+
+import config
+import utils
+import async_reader
+import history_store
+import metrics
+
+MAX_POINTS = 5000          # Obergrenze /history ohne explizites step
+STREAM_QUEUE = 100         # gepufferte Events pro SSE-Client
+KEEPALIVE_S = 15.0
+
+_state = {
+    "latest": None,
+    "latest_by_device": {},
+    "status": None,
+    "clients": set(),      # asyncio.Queue je SSE-Client
+    "loop": None,
+}
+
+
+# ===============================================================
+# 📡 ANBINDUNG AN DEN READER
+# ===============================================================
+def _on_sample(sample):
+    """Reader-Listener: merkt Messung & verteilt sie threadsicher an SSE-Clients."""
+    _state["latest"] = sample
+    _state["latest_by_device"][sample.get("device_id")] = sample
+    loop = _state["loop"]
+    if loop is None or not _state["clients"]:
+        return
+    try:
+        loop.call_soon_threadsafe(_broadcast, sample)
+    except RuntimeError:
+        pass  # Loop bereits geschlossen
+
+
+def _on_status(status):
+    _state["status"] = status
+
+
+def _broadcast(sample):
+    for q in list(_state["clients"]):
+        if q.full():
+            try:
+                q.get_nowait()  # langsamer Client → ältestes Event verwerfen
+            except asyncio.QueueEmpty:
+                pass
+        q.put_nowait(sample)
+
+
+# ===============================================================
+# 🕰️ HISTORY
+# ===============================================================
+def _parse_time(value, default):
+    """Akzeptiert Epoch-Sekunden oder ISO-Zeit; sonst default."""
+    if value in (None, ""):
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return default
+
+
+def read_history(t_from, t_to, step=0.0, path=None, device_id=None):
+    """
+    Mit aktivem SQLite-Sink: Abfrage über history_store (Felder t_main, h_main,
+    t_ext, h_ext, vpd_air_int). Sonst HISTORY_FILE zeilenweise lesen (Felder
+    temperature, humidity, vpd). Mittelung auf Buckets von `step` Sekunden,
+    step=0 → automatisch auf ≤ MAX_POINTS.
+    """
+    if path is None and history_store.exists():
+        return history_store.query_range(t_from, t_to, step, device_id=device_id,
+                                         max_points=MAX_POINTS)
+    path = path or utils.resource_path(config.HISTORY_FILE)
+    fmt = "%Y-%m-%d %H:%M:%S"
+    # Zeitstempel sind lexikografisch sortierbar → grober String-Vorfilter
+    lo = datetime.datetime.fromtimestamp(t_from).strftime(fmt)
+    hi = datetime.datetime.fromtimestamp(t_to).strftime(fmt)
+    if step <= 0:
+        step = max(1.0, (t_to - t_from) / MAX_POINTS)
+
+    buckets = {}
+    try:
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header:
+                return []
+            for row in reader:
+                if not row or row[0] < lo or row[0] > hi:
+                    continue
+                try:
+                    ts = datetime.datetime.strptime(row[0], fmt).timestamp()
+                except ValueError:
+                    continue
+                key = int((ts - t_from) // step)
+                b = buckets.get(key)
+                if b is None:
+                    b = buckets[key] = [0, [0.0] * (len(header) - 1), [0] * (len(header) - 1)]
+                b[0] += 1
+                for i, cell in enumerate(row[1:len(header)]):
+                    try:
+                        b[1][i] += float(cell)
+                        b[2][i] += 1
+                    except ValueError:
+                        pass
+    except FileNotFoundError:
+        return []
+
+    names = [h.strip().lower() for h in header[1:]]
+    points = []
+    for key in sorted(buckets):
+        n, sums, counts = buckets[key]
+        p = {"ts": t_from + key * step, "n": n}
+        for name, s, c in zip(names, sums, counts):
+            p[name] = round(s / c, 3) if c else None
+        points.append(p)
+    return points
+
+
+# ===============================================================
+# 🌐 HTTP
+# ===============================================================
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+def _response(status, body, content_type="application/json"):
+    if not isinstance(body, (bytes, bytearray)):
+        body = json.dumps(body).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+        f"Content-Type: {content_type}; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Access-Control-Allow-Origin: *\r\n"
+        "Cache-Control: no-store\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    return head.encode("ascii") + body
+
+
+async def _read_request(reader):
+    raw = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=10)
+    if len(raw) > 8192:
+        raise ValueError("header too large")
+    line = raw.split(b"\r\n", 1)[0].decode("latin-1")
+    method, target, _ = line.split(" ", 2)
+    url = urlsplit(target)
+    query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+    return method.upper(), url.path.rstrip("/") or "/", query
+
+
+async def _stream(writer):
+    q = asyncio.Queue(maxsize=STREAM_QUEUE)
+    _state["clients"].add(q)
+    try:
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-store\r\n"
+            b"Access-Control-Allow-Origin: *\r\n"
+            b"Connection: keep-alive\r\n\r\n"
+        )
+        if _state["latest"]:
+            writer.write(f"data: {json.dumps(_state['latest'])}\n\n".encode("utf-8"))
+        await writer.drain()
+        while True:
+            try:
+                sample = await asyncio.wait_for(q.get(), timeout=KEEPALIVE_S)
+                writer.write(f"data: {json.dumps(sample)}\n\n".encode("utf-8"))
+            except asyncio.TimeoutError:
+                writer.write(b": keepalive\n\n")
+            await writer.drain()
+    finally:
+        _state["clients"].discard(q)
+
+
+async def _handle(reader, writer):
+    try:
+        try:
+            method, path, query = await _read_request(reader)
+        except Exception:
+            writer.write(_response(400, {"error": "bad request"}))
+            return
+
+        if method != "GET":
+            writer.write(_response(405, {"error": "GET only"}))
+        elif path == "/latest":
+            if "device" in query:
+                latest = _state["latest_by_device"].get(query["device"]) or {}
+            else:
+                latest = _state["latest"] or utils.safe_read_json(config.DATA_FILE) or {}
+            writer.write(_response(200, latest))
+        elif path == "/status":
+            status = _state["status"] or utils.safe_read_json(config.STATUS_FILE) or {}
+            writer.write(_response(200, status))
+        elif path == "/history":
+            now = time.time()
+            t_to = _parse_time(query.get("to"), now)
+            t_from = _parse_time(query.get("from"), t_to - 3600)
+            try:
+                step = float(query.get("step", 0) or 0)
+            except ValueError:
+                step = 0.0
+            loop = asyncio.get_running_loop()
+            # Dateizugriff im Executor → blockiert weder BLE noch andere Clients
+            points = await loop.run_in_executor(
+                None, read_history, t_from, t_to, step, None, query.get("device"))
+            writer.write(_response(200, {"from": t_from, "to": t_to, "step": step, "points": points}))
+        elif path == "/metrics":
+            body = metrics.render().encode("utf-8")
+            writer.write(_response(200, body, content_type=metrics.CONTENT_TYPE))
+        elif path == "/stream":
+            await _stream(writer)
+            return
+        elif path == "/":
+            writer.write(_response(200, {"endpoints": ["/latest", "/status", "/history", "/stream", "/metrics"]}))
+        else:
+            writer.write(_response(404, {"error": f"unknown path {path}"}))
+        await writer.drain()
+    except (ConnectionError, asyncio.CancelledError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        try:
+            writer.close()
+        except Exception:
+            pass
+
+
+async def serve(host="127.0.0.1", port=8765):
+    """Startet den Server auf dem laufenden Loop und läuft bis zur Cancellation."""
+    _state["loop"] = asyncio.get_running_loop()
+    async_reader.add_sample_listener(_on_sample)
+    async_reader.add_status_listener(_on_status)
+    server = await asyncio.start_server(_handle, host, port)
+    async_reader._log(f"🌐 HTTP-API aktiv auf http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        async_reader.remove_sample_listener(_on_sample)
+        async_reader.remove_status_listener(_on_status)
+        _state["loop"] = None
+
+
+def start_in_thread(host="127.0.0.1", port=8765):
+    """Eigener Thread + Loop (z. B. im Dashboard), unabhängig vom BLE-Loop."""
+    def runner():
+        try:
+            asyncio.run(serve(host, port))
+        except Exception as e:
+            async_reader._log(f"⚠️ HTTP-API beendet: {e}")
+
+    t = threading.Thread(target=runner, name="http-api", daemon=True)
+    t.start()
+    return t
+
+
+def settings_from_config(cfg=None):
+    """(enabled, host, port) aus config.json "http_api"."""
+    if cfg is None:
+        cfg = utils.safe_read_json(config.CONFIG_FILE) or {}
+    sec = cfg.get("http_api") or {}
+    return (
+        bool(sec.get("enabled", getattr(config, "HTTP_API_ENABLED", False))),
+        str(sec.get("host", getattr(config, "HTTP_API_HOST", "127.0.0.1"))),
+        int(sec.get("port", getattr(config, "HTTP_API_PORT", 8765))),
+    )
@@ -7,6 +7,7 @@ main.py – Startpunkt für das 🌱 VIVOSUN Thermo Dashboard
 import os
 import sys
 import json
+import multiprocessing
 
 # -------------------------------------------------------------
 # Setup: Arbeitsverzeichnis & Pfade sicherstellen
@@ -15,12 +16,22 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
+# -------------------------------------------------------------
+# Gebündelter Build: collector.spawn startet `<exe> --collector`
+# (vor den GUI-Imports – collector setzt VIVOSUN_HEADLESS vor config)
+# -------------------------------------------------------------
+if __name__ == "__main__" and "--collector" in sys.argv[1:]:
+    multiprocessing.freeze_support()
+    from collector.__main__ import main as collector_main
+    sys.exit(collector_main([a for a in sys.argv[1:] if a != "--collector"]))
+
 # -------------------------------------------------------------
 # Imports (neue Struktur)
 # -------------------------------------------------------------
 from main_gui.core_gui import run_app  # 🌿 Dashboard
 from setup.setup_gui import run_setup  # ⚙️ Neues Setup-Modul
-import config, utils
+import config, utils, sinks, status
+import collector
 
 
 # -------------------------------------------------------------
@@ -31,16 +42,32 @@ def main():
     cfg = utils.safe_read_json(config.CONFIG_FILE) or {}
     device_id = cfg.get("device_id")
 
+    # --- Simulator / Replay brauchen kein echtes Gerät ---
+    if not device_id and cfg.get("backend", config.CLIENT_BACKEND) in ("sim", "replay"):
+        device_id = config.SIM_DEVICE_ID
+
     # --- Kein Gerät gespeichert → Setup starten ---
     if not device_id:
         print("⚠️ Kein device_id gefunden → Starte Setup...")
         run_setup()
         sys.exit(0)
 
-    # --- Alte Log-/Status-Dateien löschen ---
-    for f in [config.DATA_FILE, config.HISTORY_FILE, getattr(config, "STATUS_FILE", None)]:
-        if not f:
-            continue
+    # --- Reader als eigener Prozess? → Collector losgelöst starten ---
+    if sinks.reader_process_settings(cfg).get("enabled") and not collector.is_running(config.DATA_DIR):
+        pid = collector.spawn(config.DATA_DIR, config.BASE_DIR)
+        if pid:
+            print(f"🧠 Reader-Prozess gestartet (PID {pid}) – Messung läuft unabhängig von der GUI")
+        else:
+            print(f"⚠️ Reader-Prozess startete nicht (siehe {collector.launcher.LOG_NAME}) → Reader-Thread")
+
+    # --- Läuft schon ein Headless-Collector? → nur lesend anhängen ---
+    if collector.is_running(config.DATA_DIR):
+        print(f"📡 Collector aktiv (PID {collector.read_pid(config.DATA_DIR)}) → Dashboard hängt sich lesend an")
+        run_app(device_id, attach=True)
+        return
+
+    # --- Alte Live-Datei löschen (Historie bleibt → Charts starten gefüllt) ---
+    for f in [config.DATA_FILE]:
         try:
             if os.path.exists(f):
                 os.remove(f)
@@ -48,13 +75,14 @@ def main():
         except Exception as e:
             print(f"⚠️ Fehler beim Löschen von {os.path.basename(f)}: {e}")
 
-    # --- Neue Statusdatei anlegen ---
+    # --- Statusdatei zurücksetzen (seq bleibt → über Neustarts monoton, status.py) ---
     try:
+        previous = utils.safe_read_json(config.STATUS_FILE) or {}
         with open(config.STATUS_FILE, "w", encoding="utf-8") as f:
-            json.dump({"connected": False}, f, indent=2)
-        print("📄 Neue status.json erstellt (connected = False)")
+            json.dump(dict(status.DISCONNECTED, seq=int(previous.get("seq", 0) or 0)), f, indent=2)
+        print("📄 status.json zurückgesetzt (connected = False)")
     except Exception as e:
-        print(f"⚠️ Fehler beim Erstellen von status.json: {e}")
+        print(f"⚠️ Fehler beim Zurücksetzen von status.json: {e}")
 
     # --- Dashboard starten ---
     print(f"🌱 Starte Dashboard mit Device: {device_id}")
@@ -65,4 +93,5 @@ def main():
 # Entry Point
 # -------------------------------------------------------------
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Berichts-Worker (spawn) im gebündelten Build
     main()
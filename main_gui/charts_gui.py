@@ -3,17 +3,19 @@
 """
 charts_gui.py – VIVOSUN Dashboard Charts (clean & stable)
 6 Charts (Temp/Hum/VPD für intern + extern) mit Auto-Switch Compact ↔ Full
-- nutzt utils.calc_vpd
-- Offsets (leaf_offset, humidity_offset) live aus config.json
+- Puffer speichern nur Rohwerte; Feuchte mit Offset + VPD werden lazy
+  abgeleitet (derived.SeriesBuffer) → nach Offset-Änderung ganze Serie konsistent
 - Umschaltung anhand status.json (sensor_ok_ext)
 - Klick öffnet widgets/enlarged_charts.open_window
 """
 
 import tkinter as tk
 import datetime
+import time
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import utils, config
+import utils, config, perf, metrics, rolling_stats, alerts, filters, derived, feed, scheduler
+from status import StatusWatcher
 
 # Titel, Key, Farbe
 CARD_LAYOUT = [
@@ -25,10 +27,44 @@ CARD_LAYOUT = [
     ("🫧 External VPD",   "vpd_ext", "#ff4444"),
 ]
 
+# Karten-Key → Serie in derived.SeriesBuffer (Temperatur roh, Feuchte mit Offset, Blatt-VPD)
+CARD_SOURCE = {
+    "t_main": "t_main", "h_main": "h_main_adj", "vpd_int": "vpd_int",
+    "t_ext": "t_ext", "h_ext": "h_ext_adj", "vpd_ext": "vpd_ext",
+}
+BUFFER_LEN = 200
+
 # Globale Referenz (optional für externe Resets)
 global_data_buffers = None
 
 
+def draw_card(ax, x, y, color, card_bg, fill=True):
+    """
+    Zeichnet eine Karte neu (Linie + Fläche + Zeitachse). Ohne Tk nutzbar (Benchmarks).
+    fill=False (Energieprofil "kiosk") spart das teure fill_between.
+    """
+    ax.clear()
+    ax.set_facecolor(card_bg)
+    ax.grid(True, color="#222", linestyle=":", alpha=0.35)
+    ax.tick_params(colors="#999", labelsize=7)
+    for s in ax.spines.values():
+        s.set_visible(False)
+
+    if len(x) > 1 and any(v is not None for v in y):
+        ax.plot(x, y, color=color, linewidth=2.3, alpha=0.95)
+        if fill:
+            try:
+                ymin = min(v for v in y if v is not None)
+                ax.fill_between(x, y, ymin, alpha=0.12, color=color)
+            except ValueError:
+                pass
+
+    if len(x) > 0:
+        step = max(1, len(x) // 6)
+        ax.set_xticks(x[::step])
+        ax.set_xticklabels([t.strftime("%H:%M") for t in x[::step]], fontsize=7, color="#888")
+
+
 def create_charts(parent, config, log=lambda *a, **k: None):
     """Erzeugt 6-Karten-Dashboard mit Auto-Switch Compact ↔ Full + Click-to-Enlarge."""
     frame = tk.Frame(parent, bg=config.BG)
@@ -40,17 +76,58 @@ def create_charts(parent, config, log=lambda *a, **k: None):
     temp_decimals = cfg.get("TEMP_DECIMALS", getattr(config, "TEMP_DECIMALS", 1))
     hum_decimals  = cfg.get("HUMID_DECIMALS", getattr(config, "HUMID_DECIMALS", 1))
     vpd_decimals  = cfg.get("VPD_DECIMALS", getattr(config, "VPD_DECIMALS", 2))
+    stats_window  = cfg.get("stats_card_window", getattr(config, "STATS_CARD_WINDOW", "1h"))
+    suspect_mode  = cfg.get("suspect_points", getattr(config, "SUSPECT_POINTS", "mark"))
+
+    # --- Rollierende Statistik (unabhängig von den 200er-Puffern) ---
+    stats = rolling_stats.get_engine()
+    if stats_window not in stats.windows:
+        stats_window = next(iter(stats.windows), None)
+    cursor = feed.SampleCursor(config.DATA_FILE)
+    drawn = {"view": None}
+    history_until = [None]  # ts der vorgeladenen Historie, bis das erste Live-Sample kommt
+    stats_version = [None]  # Offset-Version, mit der die Statistik gefüttert wurde
+    OFFSET_CARDS = tuple(k for k, src in CARD_SOURCE.items() if src != k)  # Feuchte/VPD mit Offset
+
+    def feed_stats(first, keys=tuple(CARD_SOURCE)):
+        """Statistik aus den Anzeige-Puffern ab Index first – gleiche Werte wie die Kurve."""
+        stamps, sus = data_buffers["timestamps"], data_buffers["suspect"]
+        for i in range(max(first, 0), len(stamps)):
+            stats.update(stamps[i].timestamp(),
+                         {k: (None if k in sus[i] else data_buffers[k][i]) for k in keys})
+
+    def sync_stats(n_new):
+        """Neue Werte nachtragen; nach Offset-Änderung Feuchte/VPD-Fenster neu aufbauen."""
+        if stats_version[0] != utils.offsets.version:
+            stats_version[0] = utils.offsets.version
+            stats.reset(OFFSET_CARDS)
+            feed_stats(0, OFFSET_CARDS)  # ältere Werte als der Puffer entfallen (alte Offsets)
+            feed_stats(len(data_buffers["timestamps"]) - n_new, tuple(CARD_SOURCE.keys() - set(OFFSET_CARDS)))
+        else:
+            feed_stats(len(data_buffers["timestamps"]) - n_new)
+    UI_MAX_DELAY_MS = 5000  # spätestens alle 5 s nachsehen (nur stat(), kein Redraw)
+
+    def next_delay(latest):
+        """Poll-Takt folgt dem Messintervall des Readers, gedeckelt durch max_fps des Profils."""
+        profile = scheduler.power_profile()
+        frame_ms = 1000.0 / max(float(profile.get("max_fps") or 1.0), 0.01)
+        hint_ms = float(latest.get("interval") or 2.0) * 1000.0
+        return int(max(frame_ms, min(hint_ms, UI_MAX_DELAY_MS)))
 
     # --- Datenpuffer ---
+    # series: Rohwerte + Cache; data_buffers: Anzeige-Listen (Enlarged, Export),
+    # pro Tick aus series befüllt
+    series = derived.SeriesBuffer(BUFFER_LEN)
     data_buffers = {k: [] for _, k, _ in CARD_LAYOUT}
     data_buffers["timestamps"] = []
+    data_buffers["suspect"] = []   # je Tick: Menge der Karten-Keys mit auffälligem Wert
 
     # globale Referenz aktualisieren
     global global_data_buffers
     global_data_buffers = data_buffers
 
 # --- Chart-Grid ---
-    cards, axes, figs, labels = [], [], [], []
+    cards, axes, figs, labels, stat_labels = [], [], [], [], []
     rows, cols = 2, 3
 
     for idx, (title, key, color) in enumerate(CARD_LAYOUT):
@@ -66,11 +143,13 @@ def create_charts(parent, config, log=lambda *a, **k: None):
         frame.grid_rowconfigure(r, weight=1)
         frame.grid_columnconfigure(c, weight=1)
 
-        # --- Hover-Effekt (dezent, kein Blinken) ---
-        def on_enter(e, c=card): 
-            c.config(highlightbackground="#555")
-        def on_leave(e, c=card): 
-            c.config(highlightbackground="#2a2a2a")
+        # --- Hover-Effekt (dezent, kein Blinken; Alarm-Rahmen bleibt) ---
+        def on_enter(e, c=card):
+            if not getattr(c, "_alert", False):
+                c.config(highlightbackground="#555")
+        def on_leave(e, c=card):
+            if not getattr(c, "_alert", False):
+                c.config(highlightbackground="#2a2a2a")
 
         card.bind("<Enter>", on_enter)
         card.bind("<Leave>", on_leave)
@@ -111,6 +190,18 @@ def create_charts(parent, config, log=lambda *a, **k: None):
         )
         lbl_title.place(relx=0.08, rely=0.26, anchor="nw")
 
+        # --- Statistik-Unterzeile (min/max/mean/σ/Rate) ---
+        lbl_stats = tk.Label(
+            card,
+            text="",
+            fg="#8a8a8a",
+            bg=config.CARD,
+            font=("Segoe UI", 10),
+            anchor="w",
+            justify="left"
+        )
+        lbl_stats.place(relx=0.08, rely=0.40, anchor="nw")
+
         # --- Klick → Enlarged View ---
         def make_open(key=key):
             def _open(event=None):
@@ -128,6 +219,7 @@ def create_charts(parent, config, log=lambda *a, **k: None):
         axes.append(ax)
         figs.append(fig)
         labels.append(lbl_value)
+        stat_labels.append(lbl_stats)
         
     # Start im Compact-Mode (nur interne Karten sichtbar)
     mode = {"compact": True}
@@ -137,11 +229,17 @@ def create_charts(parent, config, log=lambda *a, **k: None):
     log("📊 Charts gestartet (Compact Mode)")
 
     # --- Reset-Funktion ---
-    def reset_charts():
+    def reset_charts(keep_history=True):
+        """keep_history: automatische Resets (Reader, leere Daten) lassen die
+        vorgeladene Historie bis zum ersten Live-Sample stehen; der Button nicht."""
+        if keep_history and history_until[0] is not None:
+            return
+        history_until[0] = None
         try:
             for k, buf in data_buffers.items():
                 if isinstance(buf, list):
                     buf.clear()
+            series.clear()
             for ax in axes:
                 ax.clear()
                 ax.set_facecolor(config.CARD)
@@ -159,21 +257,21 @@ def create_charts(parent, config, log=lambda *a, **k: None):
 
     frame.reset_charts = reset_charts
 
+    status_watcher = StatusWatcher(config.STATUS_FILE)
+
     # --- Anzeige-Helfer ---
     def _fmt_temp(val_c):
         return val_c if use_celsius else utils.c_to_f(val_c)
 
-    # --- VPD sicher berechnen (None-tolerant) ---
-    def _vpd_safe(temp_c, rh):
-        if temp_c is None or rh is None:
-            return None
-        return utils.calc_vpd(temp_c, rh)
-
     # --- Update Loop ---
+    delay = [2000]
+
+    @perf.timed("render.charts")
+    @metrics.frame_timer("charts")
     def update():
         try:
             # Sensorstatus → ext-Karten sichtbar/unsichtbar
-            st = utils.safe_read_json(config.STATUS_FILE) or {}
+            st, _ = status_watcher.poll()
             ext_ok = bool(st.get("sensor_ok_ext", False))
             if ext_ok and mode["compact"]:
                 mode["compact"] = False
@@ -188,80 +286,86 @@ def create_charts(parent, config, log=lambda *a, **k: None):
                         cards[i][0].grid_remove()
                 log("🔁 Compact Mode (no external sensor)")
 
-            # Daten lesen
-            d = utils.safe_read_json(config.DATA_FILE) or {}
+            # Alarm-Hervorhebung (Regeln laufen im Alarm-Thread, hier nur lesen)
+            active = alerts.active_channels()
+            for card, key in cards:
+                alert = key in active
+                if alert != getattr(card, "_alert", False):
+                    card._alert = alert
+                    card.config(highlightbackground="#ff3030" if alert else "#2a2a2a",
+                                highlightthickness=3 if alert else 1)
+
+            # Neue Samples lesen (feed.py: seq + Erfassungszeit → keine Duplikate/Lücken)
+            new, d = cursor.poll()
+            if history_until[0] is not None and new:
+                # Ring/"recent" überlappen mit der vorgeladenen Historie
+                new = [s for s in new if s["ts"] > history_until[0]]
+                if new:
+                    history_until[0] = None
             if not d or all(v is None for v in d.values()):
-                reset_charts()
-                frame.after(2000, update)
+                cursor.reset()
+                if history_until[0] is None:
+                    reset_charts()
+                    frame.after(2000, update)
+                    return
+                delay[0] = 2000  # noch keine Live-Daten → vorgeladene Historie zeigen
+            else:
+                delay[0] = next_delay(d)
+
+            # Nur neu zeichnen bei neuen Samples, Offset-/Profiländerung oder Moduswechsel
+            derived.current_offsets()
+            fill = bool(scheduler.power_profile().get("fill", True))
+            view_key = (utils.offsets.version, mode["compact"], fill)
+            if not new and view_key == drawn["view"]:
+                frame.after(delay[0], update)
                 return
-
-            ts = datetime.datetime.now()
-            data_buffers["timestamps"].append(ts)
-            data_buffers["timestamps"] = data_buffers["timestamps"][-200:]
-
-            # Messwerte
-            t_main = d.get("t_main")
-            h_main = d.get("h_main")
-            t_ext  = d.get("t_ext")
-            h_ext  = d.get("h_ext")
-
-            # Offsets pro Tick aus config.json lesen
-            cfg_live = utils.safe_read_json(config.CONFIG_FILE) or {}
-            leaf_off = float(cfg_live.get("leaf_offset", 0.0))
-            hum_off  = float(cfg_live.get("humidity_offset", 0.0))
-
-            # VPD (intern + extern) mit Offsets (Temp-Delta in °C, RH-Delta in %)
-            vpd_int = _vpd_safe(
-                (t_main + leaf_off) if t_main is not None else None,
-                (h_main + hum_off)  if h_main is not None else None
-            )
-            vpd_ext = _vpd_safe(
-                (t_ext + leaf_off) if t_ext is not None else None,
-                (h_ext + hum_off)  if h_ext is not None else None
-            )
-
-            # Snapshot (für Charts: Humidity mit Offset anzeigen, Temp ohne Offset)
-            snapshot = {
-                "t_main": t_main,
-                "h_main": (h_main + hum_off) if h_main is not None else None,
-                "vpd_int": vpd_int,
-                "t_ext": t_ext,
-                "h_ext": (h_ext + hum_off) if h_ext is not None else None,
-                "vpd_ext": vpd_ext
-            }
-
-            for _, key, _ in CARD_LAYOUT:
-                data_buffers[key].append(snapshot.get(key))
-            for _, key, _ in CARD_LAYOUT:
-                data_buffers[key] = data_buffers[key][-200:]
+            drawn["view"] = view_key
+
+            # Externer Reset (Header/Reader leeren nur data_buffers) → Rohpuffer mit leeren
+            if not data_buffers["timestamps"]:
+                series.clear()
+
+            raws = []
+            for s in new:
+                # Qualitäts-Flags (filters.py) → auffällige Karten; VPD erbt von t/h
+                quality = s.get("quality") or {}
+                bad = {ch for ch, flag in quality.items() if filters.is_suspect(flag)}
+                suspect = {k for k in bad if k in CARD_SOURCE}
+                if bad & {"t_main", "h_main"}:
+                    suspect.add("vpd_int")
+                if bad & {"t_ext", "h_ext"}:
+                    suspect.add("vpd_ext")
+
+                # Nur Rohwerte puffern; "hide" blendet auffällige Rohkanäle aus
+                raw = {k: s.get(k) for k in derived.RAW_KEYS}
+                if suspect_mode == "hide":
+                    raw = {k: (None if k in bad else v) for k, v in raw.items()}
+                raws.append(raw)
+                data_buffers["timestamps"].append(datetime.datetime.fromtimestamp(s["ts"]))
+                data_buffers["suspect"].append(suspect)
+
+            if len(raws) == 1:
+                series.append(raws[0])
+            elif raws:
+                series.extend(raws)  # Bulk → ein vektorisierter Durchlauf
+            del data_buffers["timestamps"][:-BUFFER_LEN]
+            del data_buffers["suspect"][:-BUFFER_LEN]
+            for key, src in CARD_SOURCE.items():
+                data_buffers[key][:] = series.series(src)
+            # Statistik aus denselben Serien wie die Kurven (Offsets konsistent)
+            sync_stats(min(len(raws), len(data_buffers["timestamps"])))
+            suspect = data_buffers["suspect"][-1] if data_buffers["suspect"] else set()
+            now = time.time()
 
             # Zeichnen
-            for ax, (title, key, color), lbl in zip(axes, CARD_LAYOUT, labels):
+            for ax, (title, key, color), lbl, lbl_st in zip(axes, CARD_LAYOUT, labels, stat_labels):
                 if mode["compact"] and key.startswith(("t_ext", "h_ext", "vpd_ext")):
                     continue
 
                 x = data_buffers["timestamps"]
                 y = data_buffers[key]
 
-                ax.clear()
-                ax.set_facecolor(config.CARD)
-                ax.grid(True, color="#222", linestyle=":", alpha=0.35)
-                ax.tick_params(colors="#999", labelsize=7)
-                for s in ax.spines.values():
-                    s.set_visible(False)
-
-                if len(x) > 1 and any(v is not None for v in y):
-                    ax.plot(x, y, color=color, linewidth=2.3, alpha=0.95)
-                    try:
-                        ymin = min(v for v in y if v is not None)
-                        ax.fill_between(x, y, ymin, alpha=0.12, color=color)
-                    except ValueError:
-                        pass
-
-                if len(x) > 0:
-                    step = max(1, len(x) // 6)
-                    ax.set_xticks(x[::step])
-                    ax.set_xticklabels([t.strftime("%H:%M") for t in x[::step]], fontsize=7, color="#888")
+                draw_card(ax, x, y, color, config.CARD, fill)
 
                 latest = y[-1] if y else None
                 if latest is not None:
@@ -275,6 +379,14 @@ def create_charts(parent, config, log=lambda *a, **k: None):
                         lbl.config(text=f"{latest:.{vpd_decimals}f} kPa")
                 else:
                     lbl.config(text="--")
+                if latest is not None and suspect_mode == "mark" and key in suspect:
+                    lbl.config(text=lbl.cget("text") + " ⚠")
+
+                if stats_window:
+                    dec = temp_decimals if key.startswith("t_") else (
+                        hum_decimals if key.startswith("h_") else vpd_decimals)
+                    lbl_st.config(text=rolling_stats.format_summary(
+                        stats.stats(key, stats_window, now), key, use_celsius, dec, stats_window))
 
             for fig in figs:
                 fig.tight_layout(pad=0.6)
@@ -283,8 +395,31 @@ def create_charts(parent, config, log=lambda *a, **k: None):
         except Exception as e:
             log(f"⚠️ Chart-Update-Fehler: {e}")
 
-        frame.after(2000, update)
+        frame.after(delay[0], update)
 
+    # --- Historie vorladen (Neustart/Absturz → Trends sofort sichtbar) ---
+    def preload_history():
+        minutes = float(cfg.get("chart_preload_minutes", getattr(config, "CHART_PRELOAD_MINUTES", 30)) or 0)
+        if minutes <= 0:
+            return
+        try:
+            rows = feed.load_history(minutes, BUFFER_LEN, device_id=cfg.get("device_id"))
+        except Exception as e:
+            log(f"⚠️ Historie konnte nicht geladen werden: {e}")
+            return
+        if not rows:
+            return
+        series.extend(rows)  # ein vektorisierter Durchlauf für die abgeleiteten Serien
+        data_buffers["timestamps"].extend(datetime.datetime.fromtimestamp(r["ts"]) for r in rows)
+        data_buffers["suspect"].extend(set() for _ in rows)
+        for key, src in CARD_SOURCE.items():
+            data_buffers[key][:] = series.series(src)
+        stats_version[0] = utils.offsets.version
+        feed_stats(0)
+        history_until[0] = rows[-1]["ts"]
+        log(f"📈 {len(rows)} Werte der letzten {minutes:g} min aus der Historie geladen")
+
+    preload_history()
     update()
 
     # Referenzen
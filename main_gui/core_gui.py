@@ -9,7 +9,7 @@ import tkinter as tk
 import json
 from collections import deque
 
-import config, utils
+import config, utils, perf
 from main_gui.header_gui import build_header
 from widgets.footer_widget import create_footer
 from async_reader import start_reader_thread, set_log_callback, set_status_callback
@@ -17,13 +17,21 @@ from main_gui.log_gui import create_log_frame
 from main_gui.charts_gui import create_charts
 
 
-def run_app(device_id=None):
-    """Startet das Dashboard."""
+def run_app(device_id=None, attach=False):
+    """
+    Startet das Dashboard.
+    attach=True: ein Headless-Collector sammelt bereits → kein eigener Reader,
+    das Dashboard liest nur dessen Dateien.
+    """
     root = tk.Tk()
     root.title(getattr(config, "APP_DISPLAY", "🌱 VIVOSUN Thermo Dashboard"))
     root.geometry("1600x900")
     root.configure(bg=getattr(config, "BG", "#0b1620"))
 
+    # ---------- PERFORMANCE ----------
+    perf.load_from_config()
+    perf.watch_tk_lag(root)
+
     # Haupt-Container (ordnet alles vertikal)
     main_frame = tk.Frame(root, bg=config.BG)
     main_frame.pack(fill="both", expand=True)
@@ -62,11 +70,37 @@ def run_app(device_id=None):
     set_log_callback(log)
     set_status_callback(set_status)
 
-    try:
-        start_reader_thread(device_id)
-        log(f"🔌 Verbinde mit Gerät {device_id} ...")
-    except Exception as e:
-        log(f"❌ Fehler beim Starten des Readers: {e}")
+    if attach:
+        log("📡 Angehängt an laufenden Collector (read-only) – kein eigener Reader.")
+    else:
+        try:
+            start_reader_thread(device_id)
+            log(f"🔌 Verbinde mit Gerät {device_id} ...")
+        except Exception as e:
+            log(f"❌ Fehler beim Starten des Readers: {e}")
+
+        # ---------- ALARMREGELN (eigener Thread) ----------
+        try:
+            import alerts
+            alerts.start_engine()
+        except Exception as e:
+            log(f"⚠️ Alarm-Engine konnte nicht gestartet werden: {e}")
+
+        # ---------- BERICHTE (Mitternacht, eigener Prozess) ----------
+        try:
+            import reports
+            reports.start_scheduler()
+        except Exception as e:
+            log(f"⚠️ Berichts-Zeitplan konnte nicht gestartet werden: {e}")
+
+        # ---------- HTTP-API (optional) ----------
+        try:
+            import http_api
+            enabled, host, port = http_api.settings_from_config(cfg)
+            if enabled:
+                http_api.start_in_thread(host, port)
+        except Exception as e:
+            log(f"⚠️ HTTP-API konnte nicht gestartet werden: {e}")
 
 
     # ---------- SHUTDOWN ----------
@@ -75,14 +109,43 @@ def run_app(device_id=None):
             _app_closing[0] = True
         except Exception:
             pass
-        try:
-            from async_reader import stop_reader
-            log("[🧹] Stoppe Async-Reader …")
-            stop_reader()
-        except Exception as e:
-            log(f"⚠️ Fehler beim Stoppen des Readers: {e}")
+        if not attach:
+            try:
+                from async_reader import stop_reader
+                # Reader-Thread darf während des Joins kein Tk mehr anfassen (Deadlock)
+                set_log_callback(None)
+                set_status_callback(None)
+                stop_reader()
+            except Exception as e:
+                log(f"⚠️ Fehler beim Stoppen des Readers: {e}")
+            try:
+                import alerts
+                alerts.stop_engine()
+            except Exception:
+                pass
+            try:
+                import reports
+                reports.stop_scheduler()
+            except Exception:
+                pass
+        else:
+            # Reader-Prozess (config.json "reader_process") läuft normalerweise weiter
+            try:
+                import collector, sinks
+                settings = sinks.reader_process_settings()
+                if settings.get("enabled") and settings.get("stop_with_gui"):
+                    log("[🧹] Stoppe Reader-Prozess …")
+                    collector.stop(config.DATA_DIR)
+            except Exception as e:
+                log(f"⚠️ Fehler beim Stoppen des Reader-Prozesses: {e}")
         root.quit()
         root.after(50, root.destroy)
 
+    def toggle_perf_overlay(event=None):
+        from widgets.perf_overlay import toggle_overlay
+        toggle_overlay(root)
+
+    root.bind("<F12>", toggle_perf_overlay)
+
     root.protocol("WM_DELETE_WINDOW", on_close)
     root.mainloop()
@@ -25,6 +25,76 @@ hum_offset_var = None
 
 
 
+# ===============================================================
+#   📅 Export-Zeitraum
+# ===============================================================
+def ask_export_range(root):
+    """Modaler Dialog: Voreinstellung oder eigener Zeitraum → (t_from, t_to) oder None."""
+    import datetime
+    import export
+
+    custom = "Eigener Zeitraum"
+    result = {"range": None}
+    win = tk.Toplevel(root)
+    win.title("💾 Export – Zeitraum")
+    win.configure(bg=THEME.BG_MAIN)
+    win.resizable(False, False)
+    win.transient(root)
+
+    body = tk.Frame(win, bg=THEME.BG_MAIN, padx=20, pady=16)
+    body.pack(fill="both", expand=True)
+
+    tk.Label(body, text="📅 Zeitraum:", bg=THEME.BG_MAIN, fg=THEME.TEXT,
+             font=THEME.FONT_LABEL).grid(row=0, column=0, sticky="w", pady=6)
+    choice = tk.StringVar(value="Alles")
+    tk.OptionMenu(body, choice, *export.RANGE_PRESETS, custom).grid(row=0, column=1, sticky="we", pady=6)
+
+    now = datetime.datetime.now()
+    from_var = tk.StringVar(value=(now - datetime.timedelta(days=1)).strftime("%Y-%m-%d %H:%M"))
+    to_var = tk.StringVar(value=now.strftime("%Y-%m-%d %H:%M"))
+    entries = []
+    for row, (label, var) in enumerate((("Von:", from_var), ("Bis:", to_var)), start=1):
+        tk.Label(body, text=label, bg=THEME.BG_MAIN, fg=THEME.TEXT,
+                 font=THEME.FONT_LABEL).grid(row=row, column=0, sticky="w", pady=4)
+        entry = tk.Entry(body, textvariable=var, width=18)
+        entry.grid(row=row, column=1, sticky="we", pady=4)
+        entries.append(entry)
+    hint = tk.Label(body, text="JJJJ-MM-TT [HH:MM]", bg=THEME.BG_MAIN, fg="#888")
+    hint.grid(row=3, column=1, sticky="w")
+
+    def on_choice(*_):
+        state = "normal" if choice.get() == custom else "disabled"
+        for entry in entries:
+            entry.config(state=state)
+    choice.trace_add("write", on_choice)
+    on_choice()
+
+    def on_ok():
+        try:
+            if choice.get() == custom:
+                t_from, t_to = export.parse_time(from_var.get()), export.parse_time(to_var.get())
+                if t_to <= t_from:
+                    raise export.ExportError("„Bis“ muss nach „Von“ liegen")
+            else:
+                t_from, t_to = export.preset_range(choice.get())
+        except export.ExportError as e:
+            hint.config(text=f"⚠️ {e}", fg="#ff5555")
+            return
+        result["range"] = (t_from, t_to)
+        win.destroy()
+
+    buttons = tk.Frame(body, bg=THEME.BG_MAIN)
+    buttons.grid(row=4, column=0, columnspan=2, sticky="e", pady=(12, 0))
+    tk.Button(buttons, text="Abbrechen", command=win.destroy).pack(side="right", padx=4)
+    tk.Button(buttons, text="Weiter …", command=on_ok).pack(side="right", padx=4)
+    win.bind("<Return>", lambda e: on_ok())
+    win.bind("<Escape>", lambda e: win.destroy())
+
+    win.grab_set()
+    root.wait_window(win)
+    return result["range"]
+
+
 # ===============================================================
 #   🧩 GUI-Header
 # ===============================================================
@@ -213,7 +283,10 @@ def build_header(root, config, data_buffers, time_buffer, log=lambda *a, **k: No
         try:
             import main_gui.charts_gui as charts_gui
 
-            if hasattr(charts_gui, "global_data_buffers") and charts_gui.global_data_buffers:
+            frame = getattr(config, "active_charts_frame", None)
+            if frame is not None and hasattr(frame, "reset_charts"):
+                frame.reset_charts(keep_history=False)  # auch vorgeladene Historie verwerfen
+            elif hasattr(charts_gui, "global_data_buffers") and charts_gui.global_data_buffers:
                 for key, buf in charts_gui.global_data_buffers.items():
                     if isinstance(buf, list):
                         buf.clear()
@@ -227,37 +300,50 @@ def build_header(root, config, data_buffers, time_buffer, log=lambda *a, **k: No
             print(f"⚠️ Fehler beim Chart-Reset: {e}")
 
             
+    export_state = {"job": None, "button": None}
+
     def export_chart():
+        """Zeitraum wählen, Historie streamen (export.py, Hintergrund-Thread); erneuter Klick bricht ab."""
+        import datetime
         from tkinter import filedialog
-        import csv, datetime
+        import export
+
+        job = export_state["job"]
+        if job is not None and job.is_alive():
+            job.cancel()
+            return
         try:
-            export_dir = filedialog.askdirectory(title="Exportziel wählen", mustexist=True)
-            if not export_dir:
-                print("❌ Export abgebrochen – kein Ordner gewählt")
+            span = ask_export_range(root)
+            if span is None:
+                print("❌ Export abgebrochen – kein Zeitraum gewählt")
                 return
-
+            t_from, t_to = span
             timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M")
-            filename = f"chart_export_{timestamp}.csv"
-            path = os.path.join(export_dir, filename)
-
-            with open(path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(["Timestamp", "T_in", "H_in", "VPD_in", "T_out", "H_out", "VPD_out"])
-                for i in range(len(time_buffer)):
-                    ts = time_buffer[i].strftime("%Y-%m-%d %H:%M:%S") if i < len(time_buffer) else ""
-                    row = [
-                        ts,
-                        data_buffers["t_main"][i] if i < len(data_buffers["t_main"]) else "",
-                        data_buffers["h_main"][i] if i < len(data_buffers["h_main"]) else "",
-                        data_buffers["vpd_int"][i] if i < len(data_buffers["vpd_int"]) else "",
-                        data_buffers["t_ext"][i] if i < len(data_buffers["t_ext"]) else "",
-                        data_buffers["h_ext"][i] if i < len(data_buffers["h_ext"]) else "",
-                        data_buffers["vpd_ext"][i] if i < len(data_buffers["vpd_ext"]) else "",
-                    ]
-                    writer.writerow(row)
-            print(f"💾 CSV exportiert → {path}")
+            path = filedialog.asksaveasfilename(
+                title="Historie exportieren",
+                initialfile=f"history_export_{timestamp}.csv",
+                filetypes=[("CSV", "*.csv"), ("CSV gzip", "*.csv.gz"), ("JSON Lines", "*.jsonl"),
+                           ("JSON Lines zstd", "*.jsonl.zst"), ("Parquet", "*.parquet")],
+            )
+            if not path:
+                print("❌ Export abgebrochen – keine Datei gewählt")
+                return
+            cfg = utils.safe_read_json(config.CONFIG_FILE) or {}
+            step = float(cfg.get("export_step", getattr(config, "EXPORT_STEP", 0)))
+            job = export_state["job"] = export.start_export(path, t_from, t_to, step=step)
+            _poll_export(job)
         except Exception as e:
-            print(f"❌ CSV-Export fehlgeschlagen: {e}")
+            print(f"❌ Export fehlgeschlagen: {e}")
+
+    def _poll_export(job):
+        btn = export_state["button"]
+        if job.is_alive():
+            if btn is not None:
+                btn.config(text=f"⏹ Export {job.progress * 100:.0f}%")
+            root.after(250, _poll_export, job)
+        elif btn is not None:
+            btn.config(text="💾 Export")
+            log(f"💾 Export {job.state}: {job.rows} Zeilen")
 
     def open_settings():
         try:
@@ -341,10 +427,19 @@ def build_header(root, config, data_buffers, time_buffer, log=lambda *a, **k: No
 
 
       
+    def open_perf_overlay():
+        try:
+            from widgets.perf_overlay import toggle_overlay
+            toggle_overlay(root)
+        except Exception as e:
+            print(f"⚠️ Fehler beim Öffnen des Perf-Overlays: {e}")
+
     # ---------- BUTTONS ----------
     THEME.make_button(row1, "🧹 Reset Charts", reset_charts, color=THEME.LIME).pack(side="left", padx=6)
-    THEME.make_button(row1, "💾 Export Chart", export_chart, color=THEME.LIME).pack(side="left", padx=6)
+    export_state["button"] = THEME.make_button(row1, "💾 Export", export_chart, color=THEME.LIME)
+    export_state["button"].pack(side="left", padx=6)
     THEME.make_button(row1, "⚙️ Settings", open_settings, color=THEME.LIME).pack(side="left", padx=6)
+    THEME.make_button(row1, "⏱ Perf", open_perf_overlay, color=THEME.LIME).pack(side="left", padx=6)
     THEME.make_button(row2, "📈 VPD Scatter old", open_scattered_vpd, color=THEME.LIME).pack(side="left", padx=6)
     THEME.make_button(row2, "📊 GrowHub CSV", open_growhub_csv, color=THEME.LIME).pack(side="left", padx=6)
     THEME.make_button(row2, "🧪 Test Window", open_test_window, color=THEME.LIME).pack(side="left", padx=6)
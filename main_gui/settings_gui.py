@@ -90,6 +90,8 @@ def open_settings_window(root=None, log=None):
     var_vdec = tk.IntVar(value=cfg.get("VPD_DECIMALS", 2))
     var_dev = tk.StringVar(value=device_id)
     debug_var = tk.BooleanVar(value=cfg.get("debug_logging", True))
+    perf_var = tk.BooleanVar(value=cfg.get("perf_enabled", getattr(config, "PERF_ENABLED", False)))
+    power_var = tk.StringVar(value=cfg.get("power_profile", getattr(config, "POWER_PROFILE", "normal")))
 
     def add_row(row, label, widget):
         tk.Label(body, text=label, bg=theme.BG_MAIN, fg=theme.TEXT,
@@ -131,6 +133,17 @@ def open_settings_window(root=None, log=None):
                    activebackground=theme.BG_MAIN, font=theme.FONT_LABEL).pack(side="left", padx=6)
     add_row(10, "Debug Mode:", debug_frame)
 
+    perf_frame = theme.make_frame(body, bg=theme.BG_MAIN)
+    tk.Checkbutton(perf_frame, text="⏱ Performance-Messung aktivieren", variable=perf_var,
+                   bg=theme.BG_MAIN, fg=theme.TEXT, selectcolor=theme.CARD_BG,
+                   activebackground=theme.BG_MAIN, font=theme.FONT_LABEL).pack(side="left", padx=6)
+    add_row(11, "Performance:", perf_frame)
+
+    profiles = list(getattr(config, "POWER_PROFILES", {"normal": {}})) + list(cfg.get("power_profiles") or {})
+    power_menu = tk.OptionMenu(body, power_var, *dict.fromkeys(profiles))
+    power_menu.config(bg=theme.CARD_BG, fg=theme.TEXT, relief="flat", highlightthickness=0)
+    add_row(12, "🔋 Energieprofil:", power_menu)
+
     # ---------- FOOTER ----------
     footer = theme.make_frame(win, bg=theme.CARD_BG)
     footer.pack(fill="x", pady=(10, 0))
@@ -147,8 +160,15 @@ def open_settings_window(root=None, log=None):
             "VPD_DECIMALS": int(var_vdec.get()),
             "theme": theme_var.get(),
             "debug_logging": debug_var.get(),
+            "perf_enabled": perf_var.get(),
+            "power_profile": power_var.get(),
         })
         utils.safe_write_json(config.CONFIG_FILE, cfg)
+        try:
+            import perf
+            perf.enable(perf_var.get())
+        except Exception:
+            pass
         if log:
             log("💾 Settings gespeichert.")
         print("💾 Einstellungen gespeichert.")
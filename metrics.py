@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+metrics.py – In-Memory-Metriken im Prometheus-Textformat (GET /metrics der HTTP-API)
+Gauges, Counter und Histogramme mit Labels. Ein Update kostet ein Lock + Dict-Zugriff,
+formatiert wird erst beim Scrape (render()). Anders als perf.py immer aktiv.
+
+Befüllt von async_reader (Messwerte, Verbindung, Latenz) und der GUI (Frame-Zeit).
+"""
+
+import math
+import os
+import sys
+import threading
+import time
+
+_lock = threading.Lock()
+_registry = []   # Reihenfolge = Ausgabe-Reihenfolge
+
+
+def _fmt(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "NaN"
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    parts = []
+    for n, v in zip(names, values):
+        v = str(v).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+        parts.append(f'{n}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+# ===============================================================
+# 📏 METRIK-TYPEN
+# ===============================================================
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labels)
+        self._values = {}   # Label-Tupel → Wert
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def clear(self):
+        with _lock:
+            self._values.clear()
+
+    def samples(self):
+        """[(suffix, label-namen, label-werte, wert)] – unter _lock aufrufen."""
+        return [("", self.labelnames, k, v) for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with _lock:
+            self._values[self._key(labels)] = float("nan") if value is None else value
+
+    def remove(self, **labels):
+        with _lock:
+            self._values.pop(self._key(labels), None)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, n=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + n
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=(0.005, 0.01, 0.025, 0.05, 0.1,
+                                                             0.25, 0.5, 1.0, 2.5, 5.0, 10.0)):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            h = self._values.get(key)
+            if h is None:
+                # [Zähler je Bucket (nicht kumuliert), count, sum]
+                h = self._values[key] = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    h[0][i] += 1
+                    break
+            h[1] += 1
+            h[2] += value
+
+    def samples(self):
+        out = []
+        names = self.labelnames + ("le",)
+        for key, (counts, n, total) in self._values.items():
+            acc = 0
+            for bound, c in zip(self.buckets, counts):
+                acc += c
+                out.append(("_bucket", names, key + (_fmt(bound),), acc))
+            out.append(("_bucket", names, key + ("+Inf",), n))
+            out.append(("_count", self.labelnames, key, n))
+            out.append(("_sum", self.labelnames, key, total))
+        return out
+
+
+# ===============================================================
+# 🌱 METRIKEN DES DASHBOARDS
+# ===============================================================
+temperature = Gauge("vivosun_temperature_celsius", "Letzte Temperatur je Sonde", ("device", "probe"))
+humidity = Gauge("vivosun_humidity_percent", "Letzte relative Luftfeuchte je Sonde", ("device", "probe"))
+vpd = Gauge("vivosun_vpd_kpa", "Luft-VPD je Sonde (mit Humidity-Offset)", ("device", "probe"))
+leaf_vpd = Gauge("vivosun_leaf_vpd_kpa", "Blatt-VPD je Sonde (mit Leaf-Offset)", ("device", "probe"))
+dew_point = Gauge("vivosun_dew_point_celsius", "Taupunkt je Sonde", ("device", "probe"))
+abs_humidity = Gauge("vivosun_absolute_humidity_grams_per_m3", "Absolute Feuchte je Sonde", ("device", "probe"))
+sensor_ok = Gauge("vivosun_sensor_ok", "1 = Sonde liefert gültige Werte", ("device", "probe"))
+connected = Gauge("vivosun_connected", "1 = Gerät verbunden", ("device",))
+last_sample = Gauge("vivosun_last_sample_timestamp_seconds", "Zeitstempel der letzten Messung (Epoch)", ("device",))
+
+samples_total = Counter("vivosun_samples_total", "Gelesene Messzyklen", ("device",))
+reconnects = Counter("vivosun_reconnects_total", "Erneute Verbindungen nach Abbruch", ("device",))
+read_errors = Counter("vivosun_read_errors_total", "Lesefehler (führen zu Reconnect)", ("device",))
+connect_failures = Counter("vivosun_connect_failures_total", "Fehlgeschlagene Verbindungsversuche", ("device",))
+
+read_latency = Histogram("vivosun_read_latency_seconds", "Dauer eines Lesezyklus (4 Werte)", ("device",),
+                         buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0))
+ui_frame = Histogram("vivosun_ui_frame_seconds", "Renderdauer eines GUI-Updates", ("view",),
+                     buckets=(0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0))
+tick_jitter = Histogram("vivosun_tick_jitter_seconds", "Verspätung eines Messtakts gegenüber der Deadline",
+                        ("device",), buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0))
+time_to_first_sample = Histogram("vivosun_time_to_first_sample_seconds",
+                                 "Verbindungsversuch bis zum ersten Sample (path = fast | full)",
+                                 ("device", "path"), buckets=(0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0))
+sample_interval = Gauge("vivosun_sample_interval_seconds", "Aktuelles (adaptives) Messintervall", ("device",))
+ticks_skipped = Counter("vivosun_ticks_skipped_total", "Übersprungene Messtakte (Reader zu spät)", ("device",))
+
+# Werden erst beim Scrape berechnet
+sample_age = Gauge("vivosun_sample_age_seconds", "Alter der letzten Messung", ("device",))
+rss_bytes = Gauge("process_resident_memory_bytes", "Resident Set Size des Prozesses")
+
+
+# ===============================================================
+# 📡 HOOKS FÜR READER & GUI
+# ===============================================================
+def observe_sample(sample):
+    """Reader-Sample → Gauges (Hauptsonde "main", externe Sonde "ext").
+    Abgeleitete Werte kommen fertig aus derived.py."""
+    dev = sample.get("device_id") or ""
+    for probe, suffix in (("main", "int"), ("ext", "ext")):
+        t, h = sample.get(f"t_{probe}"), sample.get(f"h_{probe}")
+        temperature.set(t, device=dev, probe=probe)
+        humidity.set(h, device=dev, probe=probe)
+        sensor_ok.set(1 if t is not None and h is not None else 0, device=dev, probe=probe)
+        vpd.set(sample.get(f"vpd_air_{suffix}"), device=dev, probe=probe)
+        leaf_vpd.set(sample.get(f"vpd_{suffix}"), device=dev, probe=probe)
+        dew_point.set(sample.get(f"dew_{suffix}"), device=dev, probe=probe)
+        abs_humidity.set(sample.get(f"ah_{suffix}"), device=dev, probe=probe)
+    if sample.get("ts") is not None:
+        last_sample.set(sample["ts"], device=dev)
+    samples_total.inc(device=dev)
+
+
+def frame_timer(view):
+    """Decorator für GUI-Update-Funktionen → vivosun_ui_frame_seconds{view}."""
+    def deco(func):
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                ui_frame.observe(time.perf_counter() - t0, view=view)
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
+        return wrapper
+    return deco
+
+
+def _current_rss():
+    """Aktuelle RSS in Bytes (Linux /proc, sonst Maximum via resource)."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        pass
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+    except Exception:
+        return None
+
+
+def _refresh_derived():
+    now = time.time()
+    with _lock:
+        stamps = dict(last_sample._values)
+    for key, ts in stamps.items():
+        sample_age.set(max(0.0, now - ts), device=key[0])
+    rss = _current_rss()
+    if rss is not None:
+        rss_bytes.set(rss)
+
+
+# ===============================================================
+# 📄 EXPOSITION
+# ===============================================================
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def render():
+    """Prometheus-Textformat 0.0.4."""
+    _refresh_derived()
+    lines = []
+    with _lock:
+        for m in _registry:
+            samples = m.samples()
+            if not samples:
+                continue
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            for suffix, names, values, value in samples:
+                lines.append(f"{m.name}{suffix}{_labels(names, values)} {_fmt(value)}")
+    return "\n".join(lines) + "\n"
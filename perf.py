@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+perf.py – leichtgewichtige Performance-Instrumentierung für 🌱 VIVOSUN Dashboard
+Timer & Counter mit rollierendem Fenster (p50 / p95 / max).
+Deaktiviert kostet ein Timer nur einen Flag-Check → darf im Release bleiben.
+"""
+
+import time
+import threading
+from collections import deque
+
+import config
+
+# Anzahl Messwerte pro Timer im rollierenden Fenster
+WINDOW = getattr(config, "PERF_WINDOW", 256)
+
+_enabled = False
+_lock = threading.Lock()
+_timers = {}     # name -> deque[Sekunden]
+_counters = {}   # name -> int
+
+
+# ===============================================================
+# 🔧 AN / AUS
+# ===============================================================
+def enable(flag=True):
+    global _enabled
+    _enabled = bool(flag)
+
+
+def is_enabled():
+    return _enabled
+
+
+def load_from_config():
+    """Übernimmt perf_enabled aus config.json (Default: aus)."""
+    try:
+        import utils
+        cfg = utils.safe_read_json(config.CONFIG_FILE) or {}
+        enable(cfg.get("perf_enabled", getattr(config, "PERF_ENABLED", False)))
+    except Exception:
+        enable(False)
+
+
+# ===============================================================
+# ⏱️ TIMER & COUNTER
+# ===============================================================
+class _NullTimer:
+    """Wird zurückgegeben, wenn Messung deaktiviert ist (kein Zeitstempel)."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name):
+        self.name = name
+        self.t0 = 0.0
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+def timer(name):
+    """Context-Manager: `with perf.timer("json_write"): ...`"""
+    return _Timer(name) if _enabled else _NULL
+
+
+def timed(name):
+    """Decorator-Variante von timer() – prüft das Flag erst beim Aufruf."""
+    def deco(func):
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - t0)
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
+        return wrapper
+    return deco
+
+
+def record(name, seconds):
+    """Trägt eine Dauer (Sekunden) in das Fenster des Timers ein."""
+    if not _enabled:
+        return
+    with _lock:
+        buf = _timers.get(name)
+        if buf is None:
+            buf = _timers[name] = deque(maxlen=WINDOW)
+        buf.append(seconds)
+
+
+def count(name, n=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+# ===============================================================
+# 📊 AUSWERTUNG
+# ===============================================================
+def _percentile(sorted_vals, q):
+    if not sorted_vals:
+        return 0.0
+    idx = min(len(sorted_vals) - 1, int(round(q * (len(sorted_vals) - 1))))
+    return sorted_vals[idx]
+
+
+def snapshot():
+    """
+    Liefert {"timers": {name: {n, last, p50, p95, max}}, "counters": {...}}.
+    Alle Zeiten in Millisekunden. Sortiert wird erst hier (nicht im Hot-Path).
+    """
+    with _lock:
+        timers = {k: list(v) for k, v in _timers.items()}
+        counters = dict(_counters)
+
+    out = {}
+    for name, vals in timers.items():
+        if not vals:
+            continue
+        s = sorted(vals)
+        out[name] = {
+            "n": len(vals),
+            "last": vals[-1] * 1000.0,
+            "p50": _percentile(s, 0.50) * 1000.0,
+            "p95": _percentile(s, 0.95) * 1000.0,
+            "max": s[-1] * 1000.0,
+        }
+    return {"timers": out, "counters": counters}
+
+
+def format_table(snap=None):
+    """Textdarstellung für Overlay / Konsole."""
+    snap = snap or snapshot()
+    lines = [f"{'Timer':<22}{'n':>5}{'last':>9}{'p50':>9}{'p95':>9}{'max':>9}"]
+    for name in sorted(snap["timers"]):
+        t = snap["timers"][name]
+        lines.append(
+            f"{name:<22}{t['n']:>5}{t['last']:>9.2f}{t['p50']:>9.2f}{t['p95']:>9.2f}{t['max']:>9.2f}"
+        )
+    if snap["counters"]:
+        lines.append("")
+        lines.append(f"{'Counter':<22}{'Wert':>10}")
+        for name in sorted(snap["counters"]):
+            lines.append(f"{name:<22}{snap['counters'][name]:>10}")
+    return "\n".join(lines)
+
+
+# ===============================================================
+# 🖥️ TK EVENT-LOOP LAG
+# ===============================================================
+def watch_tk_lag(widget, interval_ms=250):
+    """
+    Misst, wie spät ein after()-Callback gegenüber dem Soll feuert → "tk_lag".
+    Läuft immer, misst aber nur, wenn aktiviert.
+    """
+    expected = [0.0]
+
+    def tick():
+        try:
+            if not widget.winfo_exists():
+                return
+        except Exception:
+            return
+        now = time.perf_counter()
+        if _enabled and expected[0]:
+            record("tk_lag", max(0.0, now - expected[0]))
+        expected[0] = now + interval_ms / 1000.0
+        widget.after(interval_ms, tick)
+
+    tick()
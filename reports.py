@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+reports.py – Tages-/Wochenberichte als PNG/PDF (offscreen, Agg – nie Tk)
+
+    fut = reports.submit_report(t_from, t_to, "data/reports/2025-01-31.png")
+    reports.start_scheduler()   # jede Mitternacht Bericht für den Vortag
+
+Rendern läuft in einem eigenen Prozess (spawn, 1 Worker): die Live-Charts
+teilen sich weder GIL noch matplotlib-Zustand mit dem Bericht.
+Inhalt: je Kanal ein Verlauf (aus history_store, auf max_points gemittelt),
+Tabelle min/max/Ø, Zeit je VPD-Zone (Blatt-VPD mit aktuellen Offsets).
+"""
+
+import concurrent.futures
+import datetime
+import multiprocessing
+import os
+import threading
+
+import config
+
+PANELS = (
+    ("Temperatur (°C)", ("t_main", "t_ext"), ("#ff6633", "#ff00aa")),
+    ("Luftfeuchte (%)", ("h_main", "h_ext"), ("#4ac1ff", "#ffaa00")),
+    ("Blatt-VPD (kPa)", ("vpd_int", "vpd_ext"), ("#00aa66", "#ff4444")),
+)
+LABELS = {"t_main": "intern", "t_ext": "extern", "h_main": "intern", "h_ext": "extern",
+          "vpd_int": "intern", "vpd_ext": "extern"}
+
+_pool = None
+_pool_lock = threading.Lock()
+_scheduler = None
+
+
+# ===============================================================
+# 📊 DATEN
+# ===============================================================
+def load_series(t_from, t_to, device_id=None, max_points=1500):
+    """Gemittelte Historie → {"ts": [...], kanal: [...]} inkl. Blatt-VPD (NaN = fehlend)."""
+    import numpy as np
+    import derived
+    import history_store
+    import utils
+
+    points = history_store.query_range(t_from, t_to, device_id=device_id, max_points=max_points)
+    series = {"ts": np.array([p["ts"] for p in points], dtype=float),
+              "n": np.array([p["n"] for p in points], dtype=float)}
+    utils.offsets.load_from_config()
+    leaf, hum = utils.offsets.leaf_offset, utils.offsets.hum_offset
+    for p, s in derived.PROBES:
+        t = np.array([np.nan if x[f"t_{p}"] is None else x[f"t_{p}"] for x in points], dtype=float)
+        h = np.array([np.nan if x[f"h_{p}"] is None else x[f"h_{p}"] for x in points], dtype=float)
+        out = derived.derive_arrays(t, h, leaf, hum)
+        series[f"t_{p}"] = t
+        series[f"h_{p}"] = out["h_adj"]
+        series[f"vpd_{s}"] = out["vpd"]
+    return series
+
+
+def summarize(series, zones):
+    """min/max/Ø je Kanal + Anteil der Messungen je VPD-Zone (gewichtet mit n)."""
+    import numpy as np
+
+    table = {}
+    for _, keys, _ in PANELS:
+        for key in keys:
+            v = series[key]
+            ok = ~np.isnan(v)
+            if ok.any():
+                w = series["n"][ok]
+                table[key] = (float(v[ok].min()), float(v[ok].max()),
+                              float(np.average(v[ok], weights=w)))
+    time_in_zone = {}
+    for key in ("vpd_int", "vpd_ext"):
+        v, w = series[key], series["n"]
+        ok = ~np.isnan(v)
+        total = w[ok].sum()
+        if total:
+            time_in_zone[key] = [
+                (name, float(w[ok & (v >= lo) & (v < hi)].sum() / total)) for name, lo, hi in zones
+            ]
+    return table, time_in_zone
+
+
+# ===============================================================
+# 🖼️ RENDERN (läuft im Worker-Prozess)
+# ===============================================================
+def render_report(t_from, t_to, out_path, device_id=None, max_points=1500, title=None):
+    """Erzeugt den Bericht (PNG oder PDF nach Dateiendung) und liefert out_path."""
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    import matplotlib.dates as mdates
+    import numpy as np
+
+    zones = [(z[0], float(z[1]), float("inf") if z[2] is None else float(z[2]))
+             for z in getattr(config, "REPORT_VPD_ZONES", [])]
+    series = load_series(t_from, t_to, device_id, max_points)
+    table, time_in_zone = summarize(series, zones)
+
+    fig = Figure(figsize=(11.69, 8.27), dpi=110)  # A4 quer
+    FigureCanvasAgg(fig)
+    grid = fig.add_gridspec(len(PANELS), 2, width_ratios=(3, 1.25), hspace=0.35, wspace=0.3)
+    start = datetime.datetime.fromtimestamp(t_from)
+    end = datetime.datetime.fromtimestamp(t_to)
+    fig.suptitle(title or f"VIVOSUN Bericht {start:%d.%m.%Y %H:%M} – {end:%d.%m.%Y %H:%M}",
+                 fontsize=14, weight="bold")
+
+    xs = [datetime.datetime.fromtimestamp(t) for t in series["ts"]]
+    for row, (label, keys, colors) in enumerate(PANELS):
+        ax = fig.add_subplot(grid[row, 0])
+        for key, color in zip(keys, colors):
+            if key in table:
+                ax.plot(xs, series[key], color=color, linewidth=1.4, label=LABELS[key])
+        ax.set_ylabel(label, fontsize=9)
+        ax.grid(True, linestyle=":", alpha=0.5)
+        ax.tick_params(labelsize=8)
+        locator = mdates.AutoDateLocator(maxticks=8)
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        if ax.get_legend_handles_labels()[0]:
+            ax.legend(fontsize=8, loc="upper right")
+        if label.startswith("Blatt-VPD"):
+            for _, lo, _ in zones[1:]:
+                ax.axhline(lo, color="#888", linewidth=0.6, linestyle="--")
+
+    # --- Tabelle min/max/Ø ---
+    ax_tab = fig.add_subplot(grid[0:2, 1])
+    ax_tab.axis("off")
+    rows = [[f"{k} ", f"{mn:.2f}", f"{mx:.2f}", f"{avg:.2f}"] for k, (mn, mx, avg) in table.items()]
+    if rows:
+        tab = ax_tab.table(cellText=rows, colLabels=["Kanal", "min", "max", "Ø"], loc="upper center")
+        tab.auto_set_font_size(False)
+        tab.set_fontsize(8)
+        tab.scale(1.0, 1.3)
+    else:
+        ax_tab.text(0.5, 0.9, "keine Daten im Zeitraum", ha="center", fontsize=10)
+
+    # --- Zeit je VPD-Zone ---
+    ax_zone = fig.add_subplot(grid[2, 1])
+    names = [z[0] for z in zones]
+    y = np.arange(len(names))
+    for i, (key, color) in enumerate((("vpd_int", "#00aa66"), ("vpd_ext", "#ff4444"))):
+        if key in time_in_zone:
+            shares = [share * 100 for _, share in time_in_zone[key]]
+            ax_zone.barh(y + (i - 0.5) * 0.38, shares, height=0.38, color=color, label=LABELS[key])
+    ax_zone.set_yticks(y)
+    ax_zone.set_yticklabels(names, fontsize=8)
+    ax_zone.set_xlabel("Zeit in Zone (%)", fontsize=8)
+    ax_zone.tick_params(labelsize=8)
+    ax_zone.set_xlim(0, 100)
+    if ax_zone.get_legend_handles_labels()[0]:
+        ax_zone.legend(fontsize=7, loc="lower right")
+
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    tmp = out_path + ".part"
+    fig.savefig(tmp, format=os.path.splitext(out_path)[1].lstrip(".").lower() or "png")
+    os.replace(tmp, out_path)
+    return out_path
+
+
+# ===============================================================
+# 🧵 WORKER-PROZESS
+# ===============================================================
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            ctx = multiprocessing.get_context("spawn")  # kein Fork von Tk/Threads
+            _pool = concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=ctx)
+        return _pool
+
+
+def submit_report(t_from, t_to, out_path, **kwargs):
+    """Rendert im Worker-Prozess; liefert ein Future (Ergebnis = out_path)."""
+    try:
+        fut = _get_pool().submit(render_report, t_from, t_to, out_path, **kwargs)
+    except concurrent.futures.process.BrokenProcessPool:
+        shutdown(wait=False)  # Worker abgestürzt → frischer Pool
+        fut = _get_pool().submit(render_report, t_from, t_to, out_path, **kwargs)
+
+    def _done(f):
+        if f.cancelled():
+            return
+        if f.exception() is not None:
+            print(f"❌ Bericht fehlgeschlagen ({out_path}): {f.exception()}")
+        else:
+            print(f"🖼️ Bericht erstellt → {f.result()}")
+
+    fut.add_done_callback(_done)
+    return fut
+
+
+def shutdown(wait=False):
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait, cancel_futures=True)
+            _pool = None
+
+
+# ===============================================================
+# 🕛 ZEITPLAN (Mitternacht)
+# ===============================================================
+def settings_from_config(cfg=None):
+    settings = dict(getattr(config, "REPORTS", {}))
+    if cfg is None:
+        import utils
+        cfg = utils.safe_read_json(config.CONFIG_FILE) or {}
+    settings.update(cfg.get("reports") or {})
+    return settings
+
+
+def due_reports(day, settings):
+    """Berichte, die um Mitternacht zu Beginn von `day` (date) fällig sind."""
+    out_dir = settings.get("dir") or os.path.join(str(config.DATA_DIR), "reports")
+    end = datetime.datetime.combine(day, datetime.time())
+    jobs = []
+    periods = []
+    if settings.get("daily", True):
+        periods.append(("daily", end - datetime.timedelta(days=1)))
+    if settings.get("weekly", False) and day.weekday() == 0:
+        periods.append(("weekly", end - datetime.timedelta(days=7)))
+    for kind, start in periods:
+        for fmt in settings.get("formats", ["png"]):
+            name = f"{kind}_{start:%Y-%m-%d}.{fmt}"
+            jobs.append((start.timestamp(), end.timestamp(), os.path.join(out_dir, name)))
+    return jobs
+
+
+class ReportScheduler(threading.Thread):
+    """Schläft bis Mitternacht (lokale Zeit) und reicht dann die Berichte ein."""
+
+    def __init__(self):
+        super().__init__(name="reports", daemon=True)
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            now = datetime.datetime.now()
+            midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1),
+                                                 datetime.time())
+            # in Etappen schlafen: Uhrumstellung / Suspend verschieben das Ziel nicht
+            if self._stop_event.wait(min(600.0, max(1.0, (midnight - now).total_seconds()))):
+                break
+            if datetime.datetime.now() < midnight:
+                continue
+            settings = settings_from_config()
+            if not settings.get("enabled"):
+                continue
+            for t_from, t_to, path in due_reports(midnight.date(), settings):
+                try:
+                    submit_report(t_from, t_to, path, device_id=settings.get("device_id"))
+                except Exception as e:
+                    print(f"⚠️ Bericht konnte nicht eingereicht werden: {e}")
+
+
+def start_scheduler():
+    """Startet den Mitternachts-Zeitplan (idempotent)."""
+    global _scheduler
+    if _scheduler is None or not _scheduler.is_alive():
+        _scheduler = ReportScheduler()
+        _scheduler.start()
+    return _scheduler
+
+
+def stop_scheduler():
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.stop()
+        _scheduler = None
+    shutdown(wait=False)
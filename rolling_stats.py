@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+rolling_stats.py – inkrementelle Statistik je Kanal über gleitende Zeitfenster
+min / max / mean / std / Änderungsrate für 5 min, 1 h, 24 h (konfigurierbar).
+
+Statt Rohwerte zu halten, wird jedes Fenster in STATS_BUCKETS Zeit-Buckets
+aufgeteilt (je Bucket: n, Mittel, M2, min, max). Pro Sample:
+    - Welford-Update für Bucket und Fenster-Aggregat           O(1)
+    - abgelaufene Buckets per inversem Chan-Merge entfernen    O(1) amortisiert
+    - min/max über monotone Deques der Bucket-Extrema          O(1) amortisiert
+Speicher pro Fenster ist dadurch konstant (≤ STATS_BUCKETS + 1 Buckets).
+"""
+
+import math
+import threading
+from collections import deque
+
+import config
+
+CHANNELS = ("t_main", "h_main", "vpd_int", "t_ext", "h_ext", "vpd_ext")
+
+
+# ===============================================================
+# 📐 EIN FENSTER
+# ===============================================================
+class RollingWindow:
+    """Gleitendes Zeitfenster über span_s Sekunden, aufgeteilt in `buckets` Buckets."""
+
+    __slots__ = ("span", "width", "buckets", "_closed", "_mins", "_maxs", "_cur",
+                 "n", "mean", "m2", "_removals")
+
+    def __init__(self, span_s, buckets=120):
+        self.span = float(span_s)
+        self.buckets = max(1, int(buckets))
+        self.width = self.span / self.buckets
+        self._closed = deque()  # (start, n, mean, m2, t_mean)
+        self._mins = deque()    # (start, min) – aufsteigend
+        self._maxs = deque()    # (start, max) – absteigend
+        self._cur = None        # [start, n, mean, m2, min, max, t_mean]
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._removals = 0
+
+    def add(self, ts, value):
+        start = ts - ts % self.width
+        cur = self._cur
+        if cur is None or start > cur[0]:
+            self._close_current()
+            cur = self._cur = [start, 0, 0.0, 0.0, value, value, 0.0]
+        # Bucket (Werte und mittlere Zeit – für die Änderungsrate)
+        cur[1] += 1
+        d = value - cur[2]
+        cur[2] += d / cur[1]
+        cur[3] += d * (value - cur[2])
+        if value < cur[4]:
+            cur[4] = value
+        if value > cur[5]:
+            cur[5] = value
+        cur[6] += (ts - cur[6]) / cur[1]
+        # Fenster-Aggregat
+        self.n += 1
+        d = value - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (value - self.mean)
+        self.expire(ts)
+
+    def _close_current(self):
+        cur = self._cur
+        if cur is None:
+            return
+        start, n, mean, m2, lo, hi, t_mean = cur
+        self._closed.append((start, n, mean, m2, t_mean))
+        while self._mins and self._mins[-1][1] >= lo:
+            self._mins.pop()
+        self._mins.append((start, lo))
+        while self._maxs and self._maxs[-1][1] <= hi:
+            self._maxs.pop()
+        self._maxs.append((start, hi))
+        self._cur = None
+
+    def expire(self, now):
+        """Entfernt Buckets, die komplett vor now - span liegen."""
+        limit = now - self.span
+        if self._cur is not None and self._cur[0] + self.width <= limit:
+            self._close_current()
+        closed = self._closed
+        while closed and closed[0][0] + self.width <= limit:
+            start, n, mean, m2, _ = closed.popleft()
+            self._remove(n, mean, m2)
+            if self._mins and self._mins[0][0] == start:
+                self._mins.popleft()
+            if self._maxs and self._maxs[0][0] == start:
+                self._maxs.popleft()
+
+    def _remove(self, nb, mb, m2b):
+        """Inverser Chan-Merge; nach `buckets` Entfernungen exakt neu aufbauen (Drift)."""
+        na = self.n - nb
+        if na <= 0:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        mean_a = (self.n * self.mean - nb * mb) / na
+        delta = mb - mean_a
+        self.m2 = max(0.0, self.m2 - m2b - delta * delta * na * nb / self.n)
+        self.n, self.mean = na, mean_a
+        self._removals += 1
+        if self._removals >= self.buckets:
+            self._rebuild()
+
+    def _rebuild(self):
+        n, mean, m2 = 0, 0.0, 0.0
+        parts = [(b[1], b[2], b[3]) for b in self._closed]
+        if self._cur is not None:
+            parts.append((self._cur[1], self._cur[2], self._cur[3]))
+        for nb, mb, m2b in parts:
+            total = n + nb
+            delta = mb - mean
+            mean += delta * nb / total
+            m2 += m2b + delta * delta * n * nb / total
+            n = total
+        self.n, self.mean, self.m2 = n, mean, m2
+        self._removals = 0
+
+    def result(self):
+        """{"n", "min", "max", "mean", "std", "rate_h"} oder None ohne Daten."""
+        if self.n == 0:
+            return None
+        cur = self._cur
+        lo = [self._mins[0][1]] if self._mins else []
+        hi = [self._maxs[0][1]] if self._maxs else []
+        if cur is not None:
+            lo.append(cur[4])
+            hi.append(cur[5])
+
+        # Änderungsrate: Mittel des jüngsten vs. ältesten Buckets (robust gegen Rauschen)
+        rate = None
+        first = self._closed[0] if self._closed else None
+        last = (cur[2], cur[6]) if cur is not None else (
+            (self._closed[-1][2], self._closed[-1][4]) if len(self._closed) > 1 else None)
+        if first is not None and last is not None and last[1] > first[4]:
+            rate = (last[0] - first[2]) / (last[1] - first[4]) * 3600.0
+
+        return {
+            "n": self.n,
+            "min": min(lo),
+            "max": max(hi),
+            "mean": self.mean,
+            "std": math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0,
+            "rate_h": rate,
+        }
+
+
+# ===============================================================
+# 📊 ALLE KANÄLE × ALLE FENSTER
+# ===============================================================
+def windows_from_config(cfg=None):
+    """{"5m": 300, …} aus config.json "stats_windows" bzw. config.STATS_WINDOWS."""
+    if cfg is None:
+        import utils
+        cfg = utils.safe_read_json(config.CONFIG_FILE) or {}
+    wins = cfg.get("stats_windows") or getattr(config, "STATS_WINDOWS", {"5m": 300, "1h": 3600, "24h": 86400})
+    return {str(k): float(v) for k, v in wins.items()}
+
+
+class StatsEngine:
+    """Threadsicher; update() aus Reader- oder Tk-Thread, stats() aus der GUI."""
+
+    def __init__(self, windows=None, buckets=None, channels=CHANNELS):
+        self.windows = dict(windows or windows_from_config())
+        self.buckets = buckets or getattr(config, "STATS_BUCKETS", 120)
+        self.channels = tuple(channels)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, channels=None):
+        with self._lock:
+            if channels is None:
+                self._data = {}
+                channels = self.channels
+            for ch in channels:
+                self._data[ch] = {name: RollingWindow(span, self.buckets)
+                                  for name, span in self.windows.items()}
+            self.last_ts = None
+
+    def update(self, ts, values):
+        """values: {kanal: wert}; None/NaN werden übersprungen."""
+        with self._lock:
+            for ch, wins in self._data.items():
+                v = values.get(ch)
+                if v is None or v != v:
+                    continue
+                for w in wins.values():
+                    w.add(ts, float(v))
+            self.last_ts = ts
+
+    def stats(self, channel, window, now=None):
+        with self._lock:
+            w = self._data.get(channel, {}).get(window)
+            if w is None:
+                return None
+            if now is not None:
+                w.expire(now)
+            return w.result()
+
+    def snapshot(self, now=None):
+        """{kanal: {fenster: result}} – für Enlarged View / API."""
+        with self._lock:
+            out = {}
+            for ch, wins in self._data.items():
+                for name, w in wins.items():
+                    if now is not None:
+                        w.expire(now)
+                    out.setdefault(ch, {})[name] = w.result()
+            return out
+
+
+_engine = None
+
+
+def get_engine():
+    """Gemeinsame Instanz für Charts & Enlarged View (Fenster aus config.json)."""
+    global _engine
+    if _engine is None:
+        _engine = StatsEngine()
+    return _engine
+
+
+# ===============================================================
+# 🏷️ ANZEIGE
+# ===============================================================
+def format_summary(st, key, celsius=True, decimals=1, window=""):
+    """Kurzzeile für Karten/Enlarged: "1h ↓22.1 ↑25.3 ⌀23.8 σ0.6 +0.4/h"."""
+    if not st:
+        return f"{window} –".strip()
+    scale, shift = 1.0, 0.0
+    if key.startswith("t_") and not celsius:
+        scale, shift = 9.0 / 5.0, 32.0
+    f = lambda v: f"{v * scale + shift:.{decimals}f}"
+    parts = [window, f"↓{f(st['min'])}", f"↑{f(st['max'])}", f"⌀{f(st['mean'])}",
+             f"σ{st['std'] * scale:.{decimals}f}"]
+    if st.get("rate_h") is not None:
+        parts.append(f"{st['rate_h'] * scale:+.{decimals}f}/h")
+    return " ".join(p for p in parts if p)
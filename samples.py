@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+samples.py – ein Messwert als kompakter, typisierter Datensatz
+
+    rec = Sample.build(device_id, seq, ts, values, quality, interval)
+    rec.ts                       # Epoch-Sekunden (float) – einzige Zeitbasis
+    rec.values()                 # {"t_main", "h_main", "t_ext", "h_ext"}
+    rec.flags()                  # {"t_main": "ok", …} (filters.py)
+    rec = rec.with_derived()     # VPD, Taupunkt … (derived.py, aktuelle Offsets)
+    d = rec.as_dict(cal=…)       # bisheriges Sample-Dict (Sinks, Listener, JSON-Spiegel)
+
+    buf = rec.pack()             # feste 64 Byte (RECORD) – Shared Memory, Queues, Dateien
+    rec = Sample.unpack_from(buf, 0, device_id)
+
+Sample ist ein NamedTuple (keine Instanz-Dicts, unveränderlich, picklebar).
+Qualität steckt als Bitfeld in einem int: ein Byte je Rohkanal (Index aus
+QUALITY). Die Geräte-ID steht nicht im Binärformat – sie gehört zum Strom
+(Ring-Header, Dateiname) und wird beim Entpacken mitgegeben. Abgeleitete
+Kanäle werden nicht gespeichert, sondern beim Lesen mit den Offsets des
+Lesers berechnet.
+"""
+
+import datetime
+import math
+import struct
+from typing import NamedTuple, Optional
+
+import derived
+import filters
+
+QUALITY = (filters.OK, filters.MISSING, filters.RANGE, filters.SPIKE, filters.STUCK)
+_QUALITY_CODE = {flag: i for i, flag in enumerate(QUALITY)}
+
+# seq, ts, interval, t_main, h_main, t_ext, h_ext, quality (1 Byte je Kanal)
+RECORD = struct.Struct("<Qdd4dI4x")
+SIZE = RECORD.size
+
+
+def quality_bits(quality):
+    """{"t_main": "spike", …} → Bitfeld (unbekannte Flags zählen als ok)."""
+    if not quality:
+        return 0
+    bits = 0
+    for i, key in enumerate(derived.RAW_KEYS):
+        bits |= _QUALITY_CODE.get(quality.get(key), 0) << (8 * i)
+    return bits
+
+
+def _nan(value):
+    return float("nan") if value is None else float(value)
+
+
+def _none(value):
+    return None if math.isnan(value) else value
+
+
+class Sample(NamedTuple):
+    device_id: str
+    seq: int
+    ts: float
+    interval: float
+    t_main: Optional[float]
+    h_main: Optional[float]
+    t_ext: Optional[float]
+    h_ext: Optional[float]
+    quality: int = 0
+    derived: Optional[dict] = None
+
+    @classmethod
+    def build(cls, device_id, seq, ts, values, quality=None, interval=0.0, derived_values=None):
+        return cls(device_id, seq, ts, interval or 0.0,
+                   values.get("t_main"), values.get("h_main"), values.get("t_ext"), values.get("h_ext"),
+                   quality_bits(quality), derived_values)
+
+    @classmethod
+    def from_dict(cls, d, device_id=None):
+        """Sample-Dict (Reader, DATA_FILE "recent") → Sample; abgeleitete Werte werden übernommen."""
+        present = {k: d[k] for k in derived.KEYS if k in d}
+        return cls(device_id if device_id is not None else (d.get("device_id") or ""),
+                   int(d.get("seq") or 0), float(d.get("ts") or 0.0), float(d.get("interval") or 0.0),
+                   d.get("t_main"), d.get("h_main"), d.get("t_ext"), d.get("h_ext"),
+                   quality_bits(d.get("quality")), present or None)
+
+    # --- Zugriff ---
+    def values(self):
+        return {"t_main": self.t_main, "h_main": self.h_main, "t_ext": self.t_ext, "h_ext": self.h_ext}
+
+    def flags(self):
+        q = self.quality
+        return {key: QUALITY[(q >> (8 * i)) & 0xFF] for i, key in enumerate(derived.RAW_KEYS)}
+
+    def with_derived(self, leaf_offset=None, hum_offset=None):
+        return self._replace(derived=derived.derive(self.values(), leaf_offset, hum_offset))
+
+    def as_dict(self, **extra):
+        """Bisheriges Sample-Dict; "timestamp" (UTC, ISO) nur noch für DATA_FILE-Leser."""
+        d = {
+            "timestamp": datetime.datetime.fromtimestamp(self.ts, datetime.timezone.utc)
+                         .replace(tzinfo=None).isoformat(),
+            "t_main": self.t_main, "h_main": self.h_main,
+            "t_ext": self.t_ext, "h_ext": self.h_ext,
+            "device_id": self.device_id, "seq": self.seq, "ts": self.ts,
+            "quality": self.flags(),
+        }
+        d.update(extra)
+        if self.derived:
+            d.update(self.derived)
+        if self.interval:
+            d["interval"] = self.interval
+        return d
+
+    # --- Binärformat (RECORD, 64 Byte) ---
+    def pack(self):
+        return RECORD.pack(self.seq, self.ts, self.interval, _nan(self.t_main), _nan(self.h_main),
+                           _nan(self.t_ext), _nan(self.h_ext), self.quality)
+
+    def pack_into(self, buf, offset):
+        RECORD.pack_into(buf, offset, self.seq, self.ts, self.interval, _nan(self.t_main),
+                         _nan(self.h_main), _nan(self.t_ext), _nan(self.h_ext), self.quality)
+
+    @classmethod
+    def from_record(cls, rec, device_id=""):
+        """Entpacktes RECORD-Tupel → Sample (ohne abgeleitete Werte)."""
+        seq, ts, interval, t_main, h_main, t_ext, h_ext, quality = rec
+        return cls(device_id, seq, ts, interval,
+                   _none(t_main), _none(h_main), _none(t_ext), _none(h_ext), quality)
+
+    @classmethod
+    def unpack_from(cls, buf, offset=0, device_id=""):
+        return cls.from_record(RECORD.unpack_from(buf, offset), device_id)
+
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+scheduler.py – driftfreier Mess-Takt für den Reader (Deadlines auf time.monotonic)
+
+    ticker = scheduler.Ticker(time_scale=client.time_scale)
+    while ...:
+        skipped = await ticker.wait()   # erster Aufruf sofort, dann alle `poll` s
+        ... messen ...
+
+Die Deadlines liegen auf einem festen Raster (t0 + k·Intervall), unabhängig
+davon, wie lange das BLE-Lesen dauert. Verspätet < 1 Intervall → sofort
+nachholen (Raster bleibt); ≥ 1 Intervall → verpasste Takte überspringen
+(kein Burst nach Hängern/Suspend), Anzahl in "skipped".
+
+Intervalle kommen aus config.json ("SENSOR_POLL_INTERVAL", "RECONNECT_DELAY",
+wie sie das Einstellungsfenster speichert) mit config.py als Default und
+werden per mtime nachgeladen – Änderungen greifen ab dem nächsten Takt.
+
+AdaptiveRate passt das Intervall dem Signal an (schnell bei Änderung/Alarm,
+langsam bei stabilem Verlauf); das Energieprofil ("normal" | "kiosk") setzt
+zusätzlich FPS-Grenze und Zeichenaufwand der Charts.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+import config
+import metrics
+import perf
+
+MIN_INTERVAL = 0.05
+JITTER_WINDOW = 256
+
+_lock = threading.Lock()
+_state = {"checked": 0.0, "mtime": None, "settings": None}
+
+
+# ===============================================================
+# ⚙️ EINSTELLUNGEN (Hot-Reload über mtime der config.json)
+# ===============================================================
+def _seconds(value, default):
+    try:
+        return max(MIN_INTERVAL, float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+def _profile(cfg):
+    profiles = dict(getattr(config, "POWER_PROFILES", {}))
+    profiles.update(cfg.get("power_profiles") or {})
+    name = cfg.get("power_profile", getattr(config, "POWER_PROFILE", "normal"))
+    if name not in profiles:
+        print(f"⚠️ Unbekanntes Energieprofil '{name}' → normal")
+        name = "normal"
+    profile = {"max_fps": 1.0, "fill": True, "adaptive": {}}
+    profile.update(profiles.get(name) or {})
+    profile["name"] = name
+    return profile
+
+
+def _adaptive(cfg, profile):
+    settings = dict(getattr(config, "ADAPTIVE_SAMPLING", {}))
+    for override in (cfg.get("adaptive_sampling") or {}, profile.get("adaptive") or {}):
+        for key, value in override.items():
+            settings[key] = dict(settings.get(key) or {}, **value) if key == "deadband" else value
+    return settings
+
+
+def settings():
+    """
+    → {"poll", "reconnect", "adaptive", "profile"} – höchstens alle 2 s ein
+    stat() auf config.json, geparst nur bei geänderter mtime.
+    """
+    now = time.monotonic()
+    with _lock:
+        if _state["settings"] is not None and now - _state["checked"] < 2.0:
+            return _state["settings"]
+        _state["checked"] = now
+        try:
+            mtime = os.path.getmtime(config.CONFIG_FILE)
+        except OSError:
+            mtime = None
+        if _state["settings"] is None or mtime != _state["mtime"]:
+            import utils
+            cfg = utils.safe_read_json(config.CONFIG_FILE) or {}
+            poll = _seconds(getattr(config, "SENSOR_POLL_INTERVAL", 1), 1.0)
+            reconnect = _seconds(getattr(config, "RECONNECT_DELAY", 3), 3.0)
+            profile = _profile(cfg)
+            new = {"poll": _seconds(cfg.get("SENSOR_POLL_INTERVAL"), poll),
+                   "reconnect": _seconds(cfg.get("RECONNECT_DELAY"), reconnect),
+                   "adaptive": _adaptive(cfg, profile),
+                   "profile": profile}
+            old = _state["settings"]
+            if old is not None and old != new:
+                print(f"⏱️ Takt neu geladen: Messung {new['poll']:g}s, Reconnect {new['reconnect']:g}s, "
+                      f"Profil {profile['name']}")
+            _state["settings"] = new
+            _state["mtime"] = mtime
+        return _state["settings"]
+
+
+def poll_interval():
+    return settings()["poll"]
+
+
+def reconnect_delay():
+    return settings()["reconnect"]
+
+
+def power_profile():
+    """Aktives Energieprofil: {"name", "max_fps", "fill", "adaptive"}."""
+    return settings()["profile"]
+
+
+# ===============================================================
+# ⏱️ TAKTGEBER
+# ===============================================================
+class Ticker:
+    def __init__(self, interval=poll_interval, time_scale=1.0, clock=time.monotonic, device=""):
+        self.interval = interval        # Callable → Sekunden (live)
+        self.time_scale = float(time_scale) or 1.0
+        self.clock = clock
+        self.device = device
+        self.deadline = None
+        self.period = None
+        self.ticks = 0
+        self.skipped = 0
+        self._jitter = deque(maxlen=JITTER_WINDOW)
+
+    def reset(self):
+        """Neues Raster (z. B. nach Reconnect) – nächster wait() feuert sofort."""
+        self.deadline = None
+
+    async def wait(self):
+        """Schläft bis zur nächsten Deadline; liefert die Zahl übersprungener Takte."""
+        period = self.interval() / self.time_scale
+        now = self.clock()
+        skipped = 0
+        if self.deadline is None:
+            self.deadline = now
+        else:
+            # Raster ab der letzten Deadline – ein neues Intervall gilt ab hier
+            self.deadline += period
+            late = now - self.deadline
+            if late >= period > 0:
+                skipped = int(late // period)
+                self.deadline += skipped * period
+        self.period = period
+
+        delay = self.deadline - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+        lateness = max(0.0, self.clock() - self.deadline)
+
+        self.ticks += 1
+        self._jitter.append(lateness)
+        perf.record("tick_jitter", lateness)
+        metrics.tick_jitter.observe(lateness, device=self.device)
+        if skipped:
+            self.skipped += skipped
+            perf.count("ticks_skipped", skipped)
+            metrics.ticks_skipped.inc(skipped, device=self.device)
+        return skipped
+
+    def stats(self):
+        """Jitter im Fenster (ms) + Zähler: {"ticks", "skipped", "interval", "mean", "p95", "max"}."""
+        vals = sorted(self._jitter)
+        out = {"ticks": self.ticks, "skipped": self.skipped, "interval": self.period,
+               "mean": 0.0, "p95": 0.0, "max": 0.0}
+        if vals:
+            out["mean"] = sum(vals) / len(vals) * 1000.0
+            out["p95"] = vals[min(len(vals) - 1, int(round(0.95 * (len(vals) - 1))))] * 1000.0
+            out["max"] = vals[-1] * 1000.0
+        return out
+
+
+# ===============================================================
+# 🔋 ADAPTIVER TAKT
+# ===============================================================
+class AdaptiveRate:
+    """
+    Wählt das Messintervall nach dem Signal (Zeiten in Gerätezeit, Sample-ts):
+      burst – bis burst_s nach einer Änderung ≥ deadband (seit dem letzten Anker)
+              bzw. solange ein Alarm aktiv ist → fast_s
+      base  – bis stable_after_s nach der letzten Änderung → SENSOR_POLL_INTERVAL
+      idle  – danach wächst das Intervall je Takt um backoff bis idle_s
+    """
+
+    def __init__(self, base=poll_interval, config_fn=None):
+        self.base = base
+        self.config_fn = config_fn or (lambda: settings()["adaptive"])
+        self.current = None
+        self.mode = "base"
+        self._anchor = {}
+        self._last_change = None
+
+    def interval(self):
+        return self.current or self.base()
+
+    def update(self, values, ts, alert=False):
+        """Nach jeder Messung: values = {kanal: Wert}; liefert das nächste Intervall."""
+        cfg = self.config_fn()
+        base = self.base()
+        if not cfg.get("enabled"):
+            self.current, self.mode = base, "base"
+            return base
+
+        deadband = cfg.get("deadband") or {}
+        changed = bool(alert)
+        for ch, value in values.items():
+            band = deadband.get(ch.split("_", 1)[0])
+            if value is None or band is None:
+                continue
+            anchor = self._anchor.get(ch)
+            if anchor is None or abs(value - anchor) >= band:
+                if anchor is not None:
+                    changed = True
+                self._anchor[ch] = value
+
+        if changed:
+            self._last_change = ts
+        elif self._last_change is None:
+            self._last_change = ts - float(cfg.get("burst_s", 60.0))  # Start: base, kein Burst
+        fast = min(base, _seconds(cfg.get("fast_s"), base))
+        idle = max(base, _seconds(cfg.get("idle_s"), base))
+        quiet = ts - self._last_change
+        if changed or quiet < float(cfg.get("burst_s", 60.0)):
+            self.current, self.mode = fast, "burst"
+        elif quiet < float(cfg.get("stable_after_s", 300.0)):
+            self.current, self.mode = base, "base"
+        else:
+            grown = max(self.current or base, base) * max(1.0, float(cfg.get("backoff", 1.5)))
+            self.current, self.mode = min(idle, grown), "idle"
+        return self.current
@@ -6,8 +6,8 @@ setup_logic.py – Logik für VIVOSUN Setup (Scan, Save, Progress, Queue)
 
 import asyncio
 import queue
-import re
 import threading
+import time
 import tkinter as tk
 from tkinter import messagebox
 
@@ -69,35 +69,79 @@ def try_get_result(q: queue.Queue):
 
 
 # ========== Scan ==========
-def start_device_scan(text_widget: tk.Text, result_queue: queue.Queue, scan_btn: tk.Widget, start_pulse):
+MATCH_NAMES = ("vivosun", "thermobeacon")
+RSSI_STEP = 3   # dBm – kleinere Schwankungen nicht melden (Listbox nicht flackern lassen)
+
+
+def _matches(name):
+    return bool(name) and any(x in name.lower() for x in MATCH_NAMES)
+
+
+async def _discover_streaming(result_queue, stop, timeout):
+    """bleak-Scanner mit detection_callback: jedes passende Gerät sofort in die Queue."""
+    from bleak import BleakScanner
+
+    reported = {}   # Adresse → zuletzt gemeldeter RSSI
+
+    def on_detect(device, adv=None):
+        name = (getattr(device, "name", None) or getattr(adv, "local_name", None) or "").strip()
+        if not _matches(name):
+            return
+        addr = device.address
+        rssi = getattr(adv, "rssi", None)
+        if rssi is None:
+            rssi = getattr(device, "rssi", None)
+        last = reported.get(addr, "neu")
+        if last != "neu" and (rssi is None or last is None or abs(rssi - last) < RSSI_STEP):
+            return
+        reported[addr] = rssi
+        result_queue.put(("device", addr, name, rssi))
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    async with BleakScanner(detection_callback=on_detect):
+        while not stop.is_set() and loop.time() < deadline:
+            await asyncio.sleep(0.1)
+    return len(reported)
+
+
+async def _discover_blocking(result_queue, timeout):
+    """Fallback ohne bleak-Callback: VivosunThermoScanner, Ergebnis am Ende."""
+    found = await VivosunThermoScanner().discover(timeout=timeout)
+    n = 0
+    for d in found or []:
+        name = (getattr(d, "name", "") or "").strip()
+        addr = getattr(d, "identifier", None) or getattr(d, "address", None)
+        if addr and _matches(name):
+            result_queue.put(("device", addr, name, getattr(d, "rssi", None)))
+            n += 1
+    return n
+
+
+def start_device_scan(text_widget: tk.Text, result_queue: queue.Queue, scan_btn: tk.Widget, start_pulse,
+                      timeout=None):
     """
-    Startet asynchron den BLE-Scan (10s) und schreibt Ergebnis in result_queue.
+    Startet den BLE-Scan im Hintergrund. Die Queue erhält laufend
+        ("device", id, name, rssi)   – neues Gerät bzw. deutlich geänderter RSSI
+        ("done", anzahl, dauer_s)    – Scan beendet (Timeout oder stop.set())
+        ("error", text)
+    Rückgabe: threading.Event – set() beendet den Scan vorzeitig (z. B. Auswahl).
     """
+    timeout = float(timeout or getattr(config, "SETUP_SCAN_TIMEOUT", 10.0))
+    stop = threading.Event()
+
     def worker():
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
+        t0 = time.monotonic()
         try:
-            scanner = VivosunThermoScanner()
-            found = loop.run_until_complete(scanner.discover(timeout=10))
-            if not found:
-                result_queue.put("⚠️ Keine Geräte gefunden.")
-            else:
-                lines = []
-                for d in found:
-                    name = (getattr(d, "name", "") or "").strip()
-                    addr = getattr(d, "address", None) or getattr(d, "identifier", None)
-                    if not name or not addr:
-                        continue
-                    if not any(x in name.lower() for x in ("vivosun", "thermobeacon")):
-                        continue
-                    device_id = getattr(d, "identifier", addr)
-                    lines.append(f"{device_id}  |  {name}")
-                if lines:
-                    result_queue.put("\n".join(lines))
-                else:
-                    result_queue.put("⚠️ Keine passenden VIVOSUN-Geräte gefunden.")
+            try:
+                n = loop.run_until_complete(_discover_streaming(result_queue, stop, timeout))
+            except ImportError:
+                n = loop.run_until_complete(_discover_blocking(result_queue, timeout))
+            result_queue.put(("done", n, time.monotonic() - t0))
         except Exception as e:
-            result_queue.put(f"❌ Scanfehler: {e}")
+            result_queue.put(("error", f"❌ Scanfehler: {e}"))
         finally:
             try:
                 loop.close()
@@ -105,7 +149,7 @@ def start_device_scan(text_widget: tk.Text, result_queue: queue.Queue, scan_btn:
                 pass
 
     try:
-        text_widget.insert("end", "🔍 Suche nach Geräten (10s)…\n")
+        text_widget.insert("end", f"🔍 Suche nach Geräten (max. {timeout:g}s – Auswahl beendet den Scan)…\n")
         text_widget.see("end")
     except Exception:
         pass
@@ -117,43 +161,64 @@ def start_device_scan(text_widget: tk.Text, result_queue: queue.Queue, scan_btn:
 
     start_pulse()
     threading.Thread(target=worker, daemon=True).start()
+    return stop
 
 
-def finish_scan_output(output: str, text_widget: tk.Text, device_listbox: tk.Listbox, devices: list, add_device_cb):
+def drain_scan_queue(q: queue.Queue, found: dict):
     """
-    Verarbeitet Ausgabe nach einem Scan: Log-Text + Listbox + Devices-Liste.
+    Holt alle wartenden Scan-Meldungen. found: {id: (name, rssi)} wird aktualisiert.
+    Rückgabe: (Liste geänderter ids, Endmeldung oder None).
     """
+    changed, final = [], None
+    while True:
+        msg = try_get_result(q)
+        if msg is None:
+            return changed, final
+        if msg[0] == "device":
+            _, dev_id, name, rssi = msg
+            found[dev_id] = (name, rssi)
+            changed.append(dev_id)
+        else:
+            final = msg
+
+
+def render_device_list(device_listbox: tk.Listbox, devices: list, found: dict):
+    """Listbox nach Signalstärke sortiert neu aufbauen; Auswahl bleibt beim selben Gerät."""
+    selected = None
     try:
-        text_widget.insert("end", output + "\n✅ Scan abgeschlossen.\n")
-        text_widget.see("end")
+        sel = device_listbox.curselection()
+        if sel and sel[0] < len(devices):
+            selected = devices[sel[0]]
     except Exception:
         pass
 
+    order = sorted(found, key=lambda d: -999 if found[d][1] is None else -found[d][1])
+    devices[:] = order
+    device_listbox.delete(0, tk.END)
+    for dev_id in order:
+        name, rssi = found[dev_id]
+        signal = "?" if rssi is None else f"{rssi}"
+        device_listbox.insert(tk.END, f"⚪ {dev_id} | {name} | 📶 {signal} dBm")
+    if selected in order:
+        i = order.index(selected)
+        device_listbox.selection_set(i)
+        device_listbox.see(i)
+
+
+def finish_scan_output(final, text_widget: tk.Text, devices: list):
+    """Abschlussmeldung des Scans ins Log."""
+    if final[0] == "error":
+        line = final[1]
+    elif devices:
+        line = f"✅ Scan beendet: {len(devices)} Gerät(e) in {final[2]:.1f}s."
+    else:
+        line = "⚠️ Keine passenden VIVOSUN-Geräte gefunden."
     try:
-        devices.clear()
-        device_listbox.delete(0, tk.END)
+        text_widget.insert("end", line + "\n")
+        text_widget.see("end")
     except Exception:
         pass
 
-    pattern = r"([0-9A-F]{8}(?:-[0-9A-F]{4}){3}-[0-9A-F]{12}|(?:[0-9A-F]{2}:){5}[0-9A-F]{2})"
-    for line in output.splitlines():
-        m = re.search(pattern, line, re.IGNORECASE)
-        if m:
-            dev_id = m.group(1)
-            name = line.split("|")[-1].strip() if "|" in line else "Device"
-            devices.append(dev_id)
-            try:
-                add_device_cb(dev_id, name)
-            except Exception:
-                pass
-
-    if not devices:
-        try:
-            text_widget.insert("end", "⚠️ Keine gültigen Device-IDs gefunden.\n")
-            text_widget.see("end")
-        except Exception:
-            pass
-
 
 # ========== Save ==========
 def save_selected_device(root: tk.Tk, device_listbox: tk.Listbox, text_widget: tk.Text, theme_var: tk.StringVar):
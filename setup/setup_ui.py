@@ -146,14 +146,23 @@ def build_gui(root, theme):
     btn_frame = tk.Frame(footer, bg=theme.CARD_BG)
     btn_frame.pack(side="right")
 
-    devices = []
+    devices = []                       # ids in Listbox-Reihenfolge
+    found = {}                         # id → (name, rssi)
     result_queue = setup_logic.make_result_queue()
-
-    def add_device(dev_id, name):
-        device_listbox.insert(tk.END, f"⚪ {dev_id} | {name}")
+    scan = {"stop": None}
 
     def on_scan():
-        setup_logic.start_device_scan(text, result_queue, btn_scan, start_pulse)
+        found.clear()
+        setup_logic.render_device_list(device_listbox, devices, found)
+        status_label.config(text="Scanning… 🔍")
+        scan["stop"] = setup_logic.start_device_scan(text, result_queue, btn_scan, start_pulse)
+
+    def on_select(event=None):
+        # Gerät gewählt → Scan sofort beenden (spart die restliche Scanzeit)
+        if scan["stop"] is not None and device_listbox.curselection():
+            scan["stop"].set()
+
+    device_listbox.bind("<<ListboxSelect>>", on_select)
 
     def on_save():
         setup_logic.save_selected_device(root, device_listbox, text, theme_var)
@@ -176,16 +185,26 @@ def build_gui(root, theme):
     status_label.pack(side="left", padx=10)
 
     # ===================== QUEUE HANDLING =====================
-    def finish_scan(output):
+    def finish_scan(final):
+        scan["stop"] = None
         stop_pulse()
         btn_scan.config(state="normal")
-        setup_logic.finish_scan_output(output, text, device_listbox, devices, add_device)
+        setup_logic.finish_scan_output(final, text, devices)
         status_label.config(text="Scan complete ✅")
 
     def poll_queue():
-        output = setup_logic.try_get_result(result_queue)
-        if output:
-            finish_scan(output)
-        root.after(300, poll_queue)
+        known = set(found)
+        changed, final = setup_logic.drain_scan_queue(result_queue, found)
+        if changed:
+            setup_logic.render_device_list(device_listbox, devices, found)
+            for dev_id in dict.fromkeys(changed):
+                if dev_id not in known:
+                    name, rssi = found[dev_id]
+                    text.insert("end", f"📡 {name} ({dev_id}) {'' if rssi is None else f'{rssi} dBm'}\n")
+                    text.see("end")
+            status_label.config(text=f"Scanning… {len(found)} gefunden")
+        if final:
+            finish_scan(final)
+        root.after(150, poll_queue)
 
     poll_queue()
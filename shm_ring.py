@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shm_ring.py – Sample-Ring im Shared Memory (Reader-Prozess → GUI-Prozess)
+
+    ring = SampleRing.create(name, slots=1024, device_id="AA:BB:…")   # Collector (Sink "shm")
+    ring.write(sample)
+
+    reader = RingReader.attach(name)                                   # GUI
+    new, last_seq = reader.read_since(last_seq)                        # nur neue Samples
+
+Layout (little endian, alles 8-Byte-ausgerichtet):
+    Header  magic "VVSR", Layout-Version, Slots, Slotgröße, head (letzte fertige
+            seq), epoch (+1 je Leeren), Writer-PID, Startzeit, Device-ID
+    Slot    Seqlock-Zähler (ungerade = wird geschrieben) + samples.RECORD
+Slot = seq % slots. Der Leser liest direkt aus dem Puffer (struct.unpack_from,
+keine Zwischenkopie) und verwirft Slots, deren Zähler sich währenddessen
+geändert hat oder die schon überschrieben sind (→ missed).
+
+Abgeleitete Kanäle (VPD, Taupunkt …) stehen nicht im Ring – der Leser
+berechnet sie mit derived.derive() und seinen aktuellen Offsets.
+"""
+
+import os
+import struct
+import sys
+import time
+import zlib
+from multiprocessing import shared_memory
+
+import samples
+
+MAGIC = b"VVSR"
+LAYOUT = 2
+DEVICE_LEN = 64            # Bytes für die Device-ID (macOS-UUIDs haben 36 Zeichen)
+
+# magic, layout, slots, slot_size, head, epoch, pid, created, device_id
+HEADER = struct.Struct(f"<4sIIIQQQd{DEVICE_LEN}s")
+RECORD = samples.RECORD
+VERSION = struct.Struct("<Q")
+SLOT_SIZE = VERSION.size + RECORD.size
+_HEAD_OFFSET = 16          # Offset von head im Header
+_EPOCH_OFFSET = 24
+_DEVICE_OFFSET = HEADER.size - DEVICE_LEN   # Device-ID (NUL-aufgefüllt)
+
+
+def name_for(data_path):
+    """Stabiler Segmentname je DATA_FILE (mehrere Geräte / Installationen getrennt)."""
+    key = os.path.abspath(str(data_path)).encode("utf-8")
+    return f"vivosun_{zlib.crc32(key):08x}"
+
+
+def _untrack(shm):
+    """
+    Python < 3.13 meldet auch angehängte Segmente beim resource_tracker an,
+    der sie beim Beenden des Lesers löscht – der Collector verlöre seinen Ring.
+    """
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+
+# ===============================================================
+# ✍️ SCHREIBER (genau einer je Ring)
+# ===============================================================
+class SampleRing:
+    def __init__(self, shm, slots, owner, device_id=""):
+        self.shm = shm
+        self.slots = slots
+        self.owner = owner
+        self.buf = shm.buf
+        self.device_id = device_id
+
+    @classmethod
+    def create(cls, name, slots=1024, device_id=""):
+        slots = max(2, int(slots))
+        size = HEADER.size + slots * SLOT_SIZE
+        try:
+            stale = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            pass
+        else:
+            # Rest eines abgestürzten Collectors → ersetzen
+            stale.close()
+            stale.unlink()
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        HEADER.pack_into(shm.buf, 0, MAGIC, LAYOUT, slots, SLOT_SIZE, 0, 0, os.getpid(),
+                         time.time(), str(device_id or "").encode("utf-8")[:DEVICE_LEN])
+        return cls(shm, slots, owner=True, device_id=str(device_id or ""))
+
+    def set_device(self, device_id):
+        """Device-ID im Header setzen (Sink kennt sie erst mit dem ersten Sample)."""
+        self.device_id = str(device_id or "")
+        struct.pack_into(f"{DEVICE_LEN}s", self.buf, _DEVICE_OFFSET, self.device_id.encode("utf-8")[:DEVICE_LEN])
+
+    def write(self, sample):
+        """sample: samples.Sample oder Sample-Dict des Readers."""
+        if not isinstance(sample, samples.Sample):
+            sample = samples.Sample.build(sample.get("device_id") or self.device_id, int(sample["seq"]),
+                                          float(sample["ts"]), sample, sample.get("quality"),
+                                          sample.get("interval"))
+        if sample.device_id and sample.device_id != self.device_id:
+            self.set_device(sample.device_id)
+        seq = sample.seq
+        off = HEADER.size + (seq % self.slots) * SLOT_SIZE
+        (version,) = VERSION.unpack_from(self.buf, off)
+        VERSION.pack_into(self.buf, off, version + 1)          # ungerade → in Arbeit
+        sample.pack_into(self.buf, off + VERSION.size)
+        VERSION.pack_into(self.buf, off, version + 2)          # gerade → fertig
+        struct.pack_into("<Q", self.buf, _HEAD_OFFSET, seq)
+
+    def clear(self):
+        """Sensorwechsel/Trennung: Leser verwerfen ihre Puffer (epoch + 1)."""
+        (epoch,) = struct.unpack_from("<Q", self.buf, _EPOCH_OFFSET)
+        struct.pack_into("<Q", self.buf, _EPOCH_OFFSET, epoch + 1)
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+# ===============================================================
+# 👀 LESER (beliebig viele, nur lesend)
+# ===============================================================
+class RingReader:
+    def __init__(self, shm):
+        self.shm = shm
+        self.buf = shm.buf
+        magic, layout, slots, slot_size, _, epoch, pid, created, device = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or layout != LAYOUT or slot_size != SLOT_SIZE:
+            raise ValueError(f"fremdes/inkompatibles Segment {shm.name}")
+        self.slots = slots
+        self.pid = pid
+        self.created = created
+        self.device_id = device.rstrip(b"\0").decode("utf-8", "replace")
+        self.epoch = epoch
+        self.missed = 0
+
+    @classmethod
+    def attach(cls, name):
+        """→ RingReader oder None, wenn (noch) kein Ring existiert."""
+        try:
+            if sys.version_info >= (3, 13):
+                shm = shared_memory.SharedMemory(name=name, track=False)
+            else:
+                shm = shared_memory.SharedMemory(name=name)
+                _untrack(shm)
+        except FileNotFoundError:
+            return None
+        try:
+            return cls(shm)
+        except Exception:
+            shm.close()
+            raise
+
+    def writer_alive(self):
+        try:
+            os.kill(self.pid, 0)
+        except ProcessLookupError:
+            return False
+        except (PermissionError, OSError):
+            return True
+        return True
+
+    def head(self):
+        return struct.unpack_from("<Q", self.buf, _HEAD_OFFSET)[0]
+
+    def cleared(self):
+        """True, wenn der Schreiber seit dem letzten Aufruf geleert hat."""
+        (epoch,) = struct.unpack_from("<Q", self.buf, _EPOCH_OFFSET)
+        if epoch != self.epoch:
+            self.epoch = epoch
+            return True
+        return False
+
+    def _read_slot(self, seq):
+        off = HEADER.size + (seq % self.slots) * SLOT_SIZE
+        for _ in range(4):
+            (v1,) = VERSION.unpack_from(self.buf, off)
+            if v1 & 1:
+                continue                                       # Schreiber mittendrin
+            rec = RECORD.unpack_from(self.buf, off + VERSION.size)
+            (v2,) = VERSION.unpack_from(self.buf, off)
+            if v1 == v2:
+                return rec if rec[0] == seq else None          # None = schon überschrieben
+        return None
+
+    def read_since(self, last_seq=None):
+        """→ (neue Samples als Dicts inkl. abgeleiteter Kanäle, neue last_seq)."""
+        head = self.head()
+        if not head:
+            return [], last_seq
+        (device,) = struct.unpack_from(f"{DEVICE_LEN}s", self.buf, _DEVICE_OFFSET)
+        self.device_id = device.rstrip(b"\0").decode("utf-8", "replace")
+        if last_seq is None or last_seq > head:                # erster Aufruf / Writer neu
+            last_seq = max(0, head - self.slots)
+        first = max(last_seq + 1, head - self.slots + 1)
+        self.missed += first - (last_seq + 1)
+        out = []
+        for seq in range(first, head + 1):
+            rec = self._read_slot(seq)
+            if rec is None:
+                self.missed += 1
+                continue
+            out.append(self._to_sample(rec))
+        return out, head
+
+    def _to_sample(self, rec):
+        return samples.Sample.from_record(rec, self.device_id).with_derived().as_dict()
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+sinks.py – Ausgabe-Pipeline für Messwerte (ein Worker-Thread + Queue je Sink)
+
+Der Reader ruft nur noch pipeline.publish(sample) auf – das ist ein
+nicht-blockierendes Einreihen. Jeder Sink schreibt in seinem eigenen Thread,
+gebündelt (batch / flush_s), mit Wiederholversuchen (retries, backoff_s).
+Ist eine Queue voll, greift die Back-Pressure-Policy:
+    "drop_oldest"  – ältesten Eintrag verwerfen (Standard)
+    "drop_newest"  – neuen Eintrag verwerfen
+    "latest"       – nur der jüngste Eintrag zählt (JSON-Spiegel)
+Ein langsamer Sink bremst so weder BLE noch die anderen Sinks.
+
+Konfiguration (config.json), ohne "sinks" gilt DEFAULT_SINKS:
+    "sinks": [
+        {"type": "json"},
+        {"type": "csv"},
+        {"type": "sqlite", "batch": 50, "flush_s": 5},
+        {"type": "influx", "path": "data/influx.lp"},
+        {"type": "mqtt", "host": "127.0.0.1", "topic": "vivosun/{device_id}"},
+        {"type": "http", "url": "http://127.0.0.1:8086/ingest", "batch": 20},
+        {"type": "shm", "slots": 1024}   – automatisch bei "reader_process": {"enabled": true}
+    ]
+Gemeinsame Optionen: enabled, batch, flush_s, queue_size, policy, retries, backoff_s.
+"""
+
+import collections
+import csv
+import datetime
+import json
+import os
+import threading
+import time
+import urllib.request
+
+try:
+    from . import utils, config, perf, history_store, derived
+except ImportError:
+    import utils, config, perf, history_store, derived
+
+CSV_HEADER = ["Timestamp", "Temperature", "Humidity", "VPD"]
+EMPTY_PAYLOAD = {"timestamp": None, "t_main": None, "h_main": None, "t_ext": None, "h_ext": None}
+
+_mirrors = {}            # Pfad → JsonMirrorSink (für clear_mirror)
+_rings = {}              # Pfad → ShmRingSink (für clear_mirror)
+_mirrors_lock = threading.Lock()
+
+
+def _log(msg):
+    print(msg)
+
+
+def _resolve(path):
+    if path is None:
+        return None
+    return path if os.path.isabs(str(path)) else str(config.BASE_DIR / str(path))
+
+
+# ===============================================================
+# 🧱 BASIS
+# ===============================================================
+class Sink:
+    """Basisklasse: Queue, Batching, Retry. Unterklassen implementieren write_batch()."""
+    kind = "base"
+    defaults = {"batch": 1, "flush_s": 0.0, "queue_size": 1000,
+                "policy": "drop_oldest", "retries": 3, "backoff_s": 1.0}
+
+    def __init__(self, name=None, **options):
+        opts = dict(Sink.defaults, **self.defaults)
+        opts.update({k: v for k, v in options.items() if v is not None})
+        self.name = name or self.kind
+        self.batch = max(1, int(opts["batch"]))
+        self.flush_s = max(0.0, float(opts["flush_s"]))
+        self.queue_size = max(1, int(opts["queue_size"]))
+        self.policy = str(opts["policy"])
+        self.retries = max(0, int(opts["retries"]))
+        self.backoff_s = max(0.0, float(opts["backoff_s"]))
+        self.options = opts
+
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+        self._closing = False
+        self._thread = None
+        self.stats = {"written": 0, "dropped": 0, "errors": 0}
+
+    # --- Lebenszyklus ---
+    def start(self):
+        self.open()
+        self._thread = threading.Thread(target=self._worker, name=f"sink-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def open(self):
+        pass
+
+    def shutdown(self):
+        pass
+
+    def close(self, timeout=5.0):
+        """Restliche Einträge schreiben und Thread beenden (max. timeout Sekunden)."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                _log(f"⚠️ Sink {self.name}: Flush nach {timeout}s abgebrochen "
+                     f"({len(self._queue)} Einträge offen)")
+
+    # --- Einreihen (Reader-Thread) ---
+    def put(self, record):
+        with self._cond:
+            if self._closing:
+                return
+            if self.policy == "latest":
+                self._queue.clear()
+            elif len(self._queue) >= self.queue_size:
+                self._drop()
+                if self.policy == "drop_newest":
+                    return
+                self._queue.popleft()
+            self._queue.append(record)
+            if len(self._queue) >= self.batch or self.flush_s == 0:
+                self._cond.notify()
+
+    def _drop(self):
+        self.stats["dropped"] += 1
+        perf.count(f"sink.{self.name}.dropped")
+
+    # --- Worker ---
+    def _take_batch(self):
+        """Wartet auf volle Batch oder flush_s; liefert None beim Beenden."""
+        with self._cond:
+            deadline = None
+            while True:
+                if self._queue and (len(self._queue) >= self.batch or self._closing):
+                    break
+                if self._queue and deadline is None:
+                    deadline = time.monotonic() + self.flush_s
+                if self._closing and not self._queue:
+                    return None
+                timeout = None if deadline is None else deadline - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    break
+                self._cond.wait(timeout)
+            n = min(self.batch, len(self._queue))
+            return [self._queue.popleft() for _ in range(n)]
+
+    def _worker(self):
+        try:
+            while True:
+                batch = self._take_batch()
+                if batch is None:
+                    break
+                self._write_with_retry(batch)
+        finally:
+            try:
+                self.shutdown()
+            except Exception as e:
+                _log(f"⚠️ Sink {self.name}: Fehler beim Schließen: {e}")
+
+    def _write_with_retry(self, batch):
+        delay = self.backoff_s
+        for attempt in range(self.retries + 1):
+            try:
+                with perf.timer(f"sink.{self.name}"):
+                    self.write_batch(batch)
+                self.stats["written"] += len(batch)
+                return True
+            except Exception as e:
+                self.stats["errors"] += 1
+                perf.count(f"sink.{self.name}.errors")
+                if attempt >= self.retries or self._closing:
+                    _log(f"⚠️ Sink {self.name}: {len(batch)} Einträge verworfen "
+                         f"({type(e).__name__}: {e})")
+                    self.stats["dropped"] += len(batch)
+                    return False
+                time.sleep(delay)
+                delay *= 2
+
+    def write_batch(self, records):
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name} batch={self.batch} policy={self.policy}>"
+
+
+# ===============================================================
+# 💾 DATEI-SINKS
+# ===============================================================
+class JsonMirrorSink(Sink):
+    """
+    Spiegelt die jüngste Messung (inkl. abgeleiteter Kanäle) nach DATA_FILE.
+    "recent" enthält zusätzlich die letzten N Messungen (seq, ts, …) – Leser, die
+    langsamer pollen als gemessen wird, holen damit verpasste Samples nach.
+    """
+    kind = "json"
+    defaults = {"policy": "latest", "retries": 1, "backoff_s": 0.2, "recent": None}
+
+    def __init__(self, path, **options):
+        super().__init__(**options)
+        self.path = path
+        recent = self.options.get("recent")
+        if recent is None:
+            recent = getattr(config, "MIRROR_RECENT", 20)
+        self._recent = collections.deque(maxlen=max(1, int(recent)))
+        self._recent_lock = threading.Lock()
+
+    def put(self, record):
+        # vor der "latest"-Policy merken – die verwirft Zwischenstände in der Queue
+        with self._recent_lock:
+            if record is EMPTY_PAYLOAD:
+                self._recent.clear()
+            else:
+                self._recent.append({k: v for k, v in record.items() if k != "raw"})
+        super().put(record)
+
+    def open(self):
+        with _mirrors_lock:
+            _mirrors[self.path] = self
+
+    def shutdown(self):
+        with _mirrors_lock:
+            if _mirrors.get(self.path) is self:
+                del _mirrors[self.path]
+
+    def write_batch(self, records):
+        rec = records[-1]
+        if rec is EMPTY_PAYLOAD:
+            utils.safe_write_json(self.path, dict(EMPTY_PAYLOAD))
+        else:
+            with self._recent_lock:
+                recent = list(self._recent)
+            utils.safe_write_json(self.path, dict(rec, recent=recent))
+
+
+class CsvSink(Sink):
+    """HISTORY_FILE im bisherigen Format (Timestamp, Temperature, Humidity, VPD).
+    VPD wie bisher aus den Rohwerten (ohne Offsets) – die Datei bleibt offsetfrei."""
+    kind = "csv"
+    defaults = {"batch": 10, "flush_s": 2.0}
+
+    def __init__(self, path, **options):
+        super().__init__(**options)
+        self.path = path
+
+    def write_batch(self, records):
+        rows = [
+            [datetime.datetime.fromtimestamp(r["ts"]).strftime("%Y-%m-%d %H:%M:%S"),
+             r.get("t_main"), r.get("h_main"), utils.calc_vpd(r.get("t_main"), r.get("h_main"))]
+            for r in records if r is not EMPTY_PAYLOAD
+        ]
+        if not rows:
+            return
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, "a", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            if new_file:
+                w.writerow(CSV_HEADER)
+            w.writerows(rows)
+
+
+class SqliteSink(Sink):
+    """Persistente Historie in SQLite (history_store.py), eine Transaktion je Batch."""
+    kind = "sqlite"
+    defaults = {"batch": 50, "flush_s": 5.0}
+
+    def __init__(self, path=None, **options):
+        super().__init__(**options)
+        self.path = path or history_store.default_path()
+        self._conn = None
+
+    def write_batch(self, records):
+        if self._conn is None:
+            self._conn = history_store.connect(self.path)
+        try:
+            history_store.insert_samples(self._conn, [r for r in records if r is not EMPTY_PAYLOAD])
+        except Exception:
+            self._conn.close()
+            self._conn = None
+            raise
+
+    def shutdown(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def _line_protocol(rec, measurement="vivosun"):
+    device = str(rec.get("device_id") or "unknown").replace(" ", r"\ ").replace(",", r"\,")
+    keys = ("t_main", "h_main", "t_ext", "h_ext") + derived.KEYS
+    fields = ",".join(f"{k}={float(rec[k])}" for k in keys if rec.get(k) is not None)
+    if not fields:
+        return None
+    return f"{measurement},device={device} {fields} {int(rec['ts'] * 1e9)}"
+
+
+class InfluxFileSink(Sink):
+    """InfluxDB Line-Protocol als Datei (z. B. für Telegraf tail / influx write)."""
+    kind = "influx"
+    defaults = {"batch": 20, "flush_s": 5.0}
+
+    def __init__(self, path=None, measurement="vivosun", **options):
+        super().__init__(**options)
+        self.path = path or str(config.DATA_DIR / "influx.lp")
+        self.measurement = measurement
+
+    def write_batch(self, records):
+        lines = [_line_protocol(r, self.measurement) for r in records if r is not EMPTY_PAYLOAD]
+        lines = [l for l in lines if l]
+        if lines:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+
+
+# ===============================================================
+# 🧠 SHARED MEMORY
+# ===============================================================
+class ShmRingSink(Sink):
+    """
+    Schreibt jede Messung in einen Shared-Memory-Ring (shm_ring.py) – für eine
+    GUI in einem anderen Prozess (config.json "reader_process"). Der Ring lebt
+    so lange wie der Reader; Name aus dem DATA_FILE-Pfad (shm_ring.name_for).
+    """
+    kind = "shm"
+    defaults = {"retries": 0, "slots": None}
+
+    def __init__(self, path, ring=None, **options):
+        super().__init__(**options)
+        self.path = path
+        self.ring_name = ring
+        self.ring = None
+
+    def open(self):
+        import shm_ring
+        slots = self.options.get("slots") or reader_process_settings().get("slots", 1024)
+        self.ring_name = self.ring_name or shm_ring.name_for(self.path)
+        self.ring = shm_ring.SampleRing.create(self.ring_name, slots)
+        with _mirrors_lock:
+            _rings[self.path] = self
+        _log(f"🧠 Shared-Memory-Ring {self.ring_name} ({slots} Slots)")
+
+    def shutdown(self):
+        with _mirrors_lock:
+            if _rings.get(self.path) is self:
+                del _rings[self.path]
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def write_batch(self, records):
+        for rec in records:
+            if rec is EMPTY_PAYLOAD:
+                self.ring.clear()
+            elif rec.get("seq") is not None:
+                self.ring.write(rec)
+
+
+# ===============================================================
+# 📡 NETZWERK-SINKS
+# ===============================================================
+class MqttSink(Sink):
+    """MQTT an lokalen Broker (benötigt paho-mqtt, sonst wird der Sink übersprungen)."""
+    kind = "mqtt"
+    defaults = {"batch": 10, "flush_s": 1.0, "backoff_s": 2.0}
+
+    def __init__(self, host="127.0.0.1", port=1883, topic="vivosun/{device_id}",
+                 qos=0, retain=False, username=None, password=None, **options):
+        super().__init__(**options)
+        import paho.mqtt.client as mqtt  # ImportError → pipeline_from_config überspringt
+        self._mqtt = mqtt
+        self.host, self.port = host, int(port)
+        self.topic, self.qos, self.retain = topic, int(qos), bool(retain)
+        self.username, self.password = username, password
+        self._client = None
+
+    def _connect(self):
+        try:
+            client = self._mqtt.Client(self._mqtt.CallbackAPIVersion.VERSION2)
+        except AttributeError:
+            client = self._mqtt.Client()  # paho-mqtt < 2.0
+        if self.username:
+            client.username_pw_set(self.username, self.password)
+        client.connect(self.host, self.port, keepalive=30)
+        client.loop_start()
+        self._client = client
+
+    def write_batch(self, records):
+        if self._client is None:
+            self._connect()
+        try:
+            for r in records:
+                if r is EMPTY_PAYLOAD:
+                    continue
+                topic = self.topic.format(device_id=r.get("device_id") or "unknown")
+                info = self._client.publish(topic, json.dumps(r), qos=self.qos, retain=self.retain)
+                if info.rc != 0:
+                    raise ConnectionError(f"MQTT publish rc={info.rc}")
+        except Exception:
+            self.shutdown()
+            raise
+
+    def shutdown(self):
+        if self._client is not None:
+            try:
+                self._client.loop_stop()
+                self._client.disconnect()
+            except Exception:
+                pass
+            self._client = None
+
+
+class HttpPushSink(Sink):
+    """POST einer JSON-Liste je Batch an einen lokalen Endpunkt."""
+    kind = "http"
+    defaults = {"batch": 20, "flush_s": 5.0, "backoff_s": 2.0}
+
+    def __init__(self, url, timeout=5.0, headers=None, **options):
+        super().__init__(**options)
+        self.url = url
+        self.timeout = float(timeout)
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+
+    def write_batch(self, records):
+        payload = [r for r in records if r is not EMPTY_PAYLOAD]
+        if not payload:
+            return
+        body = json.dumps(payload).encode("utf-8")
+        req = urllib.request.Request(self.url, data=body, headers=self.headers, method="POST")
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            if resp.status >= 300:
+                raise ConnectionError(f"HTTP {resp.status}")
+
+
+SINK_TYPES = {
+    "json": JsonMirrorSink,
+    "csv": CsvSink,
+    "sqlite": SqliteSink,
+    "influx": InfluxFileSink,
+    "mqtt": MqttSink,
+    "http": HttpPushSink,
+    "shm": ShmRingSink,
+}
+
+
+# ===============================================================
+# 🔀 PIPELINE
+# ===============================================================
+class SinkPipeline:
+    """Verteilt jede Messung an alle Sinks (nur Einreihen, kein I/O im Aufrufer)."""
+
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+
+    def start(self):
+        """Startet alle Sinks; einer, der sich nicht öffnen lässt, fällt heraus."""
+        started = []
+        for s in self.sinks:
+            try:
+                s.start()
+            except Exception as e:
+                _log(f"⚠️ Sink {s.name} deaktiviert – Start fehlgeschlagen: {type(e).__name__}: {e}")
+                try:
+                    s.shutdown()
+                except Exception:
+                    pass
+                continue
+            started.append(s)
+        self.sinks = started
+        return self
+
+    def publish(self, record):
+        for s in self.sinks:
+            s.put(record)
+
+    def close(self, timeout=5.0):
+        """Alle Sinks parallel flushen; Gesamtdauer ≤ timeout."""
+        deadline = time.monotonic() + timeout
+        for s in self.sinks:
+            with s._cond:
+                s._closing = True
+                s._cond.notify()
+        for s in self.sinks:
+            s.close(max(0.0, deadline - time.monotonic()))
+
+    def stats(self):
+        return {s.name: dict(s.stats, queued=len(s._queue)) for s in self.sinks}
+
+
+def clear_mirror(path):
+    """Leert den JSON-Spiegel – über die Queue des Sinks, damit kein älteres
+    Sample den leeren Zustand später überschreibt. Ohne Sink: direkt schreiben."""
+    with _mirrors_lock:
+        sink = _mirrors.get(path)
+        ring = _rings.get(path)
+    if sink is not None and not sink._closing:
+        sink.put(EMPTY_PAYLOAD)
+    else:
+        utils.safe_write_json(path, dict(EMPTY_PAYLOAD))
+    if ring is not None and not ring._closing:
+        ring.put(EMPTY_PAYLOAD)
+
+
+def sink_specs_from_config(cfg=None):
+    if cfg is None:
+        cfg = utils.safe_read_json(config.CONFIG_FILE) or {}
+    specs = cfg.get("sinks")
+    if not isinstance(specs, list):
+        specs = getattr(config, "DEFAULT_SINKS", [{"type": "json"}, {"type": "csv"}])
+    if reader_process_settings(cfg).get("enabled") and not any(s.get("type") == "shm" for s in specs):
+        specs = list(specs) + [{"type": "shm"}]
+    return specs
+
+
+def reader_process_settings(cfg=None):
+    """config.READER_PROCESS, überschrieben von config.json "reader_process"."""
+    if cfg is None:
+        cfg = utils.safe_read_json(config.CONFIG_FILE) or {}
+    settings = dict(getattr(config, "READER_PROCESS", {}))
+    settings.update(cfg.get("reader_process") or {})
+    return settings
+
+
+def pipeline_from_config(cfg=None, paths=None):
+    """Baut die Pipeline für einen Reader. json/csv ohne "path" → paths["data"/"history"]."""
+    paths = paths or {}
+    sinks, names = [], set()
+    for spec in sink_specs_from_config(cfg):
+        spec = dict(spec)
+        kind = spec.pop("type", None)
+        if not spec.pop("enabled", True):
+            continue
+        cls = SINK_TYPES.get(kind)
+        if cls is None:
+            _log(f"⚠️ Unbekannter Sink-Typ: {kind!r}")
+            continue
+        if kind in ("json", "shm"):
+            spec["path"] = _resolve(spec.get("path")) or paths.get("data")
+        elif kind == "csv":
+            spec["path"] = _resolve(spec.get("path")) or paths.get("history")
+        elif "path" in spec:
+            spec["path"] = _resolve(spec["path"])
+
+        name = spec.pop("name", None) or kind
+        while name in names:
+            name += "_"
+        names.add(name)
+        try:
+            sinks.append(cls(name=name, **spec))
+        except ImportError as e:
+            _log(f"⚠️ Sink {name} deaktiviert – Modul fehlt: {e.name}")
+        except Exception as e:
+            _log(f"⚠️ Sink {name} ungültig konfiguriert: {type(e).__name__}: {e}")
+    return SinkPipeline(sinks).start()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+status.py – Verbindungs-/Sensorstatus als Zustandsautomat (status.json)
+
+StatusPublisher (Reader): schreibt nur bei echten Übergängen von
+connected / sensor_ok_main / sensor_ok_ext – mit fortlaufender Sequenznummer
+("seq") und Zeitpunkt der letzten Änderung je Feld ("since").
+
+StatusWatcher (GUI-Poller): prüft per os.stat, ob sich status.json geändert
+hat, und parst nur dann; poll() → (status, changed).
+"""
+
+import os
+import threading
+import time
+
+import utils
+
+FIELDS = ("connected", "sensor_ok_main", "sensor_ok_ext")
+DISCONNECTED = {"connected": False, "sensor_ok_main": False, "sensor_ok_ext": False}
+
+
+# ===============================================================
+# 📣 SCHREIBER
+# ===============================================================
+class StatusPublisher:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.state = None  # erster update() gilt immer als Übergang
+        previous = utils.safe_read_json(path) or {}
+        self.seq = int(previous.get("seq", 0) or 0)  # über Neustarts monoton
+        self.since = {}
+
+    def update(self, connected, sensor_ok_main, sensor_ok_ext, now=None):
+        """
+        Neuer Zustand → None, wenn unverändert; sonst {"prev", "status", "changed"}
+        (prev = None beim ersten Aufruf). Nur dann wird status.json geschrieben.
+        """
+        new = {"connected": bool(connected), "sensor_ok_main": bool(sensor_ok_main),
+               "sensor_ok_ext": bool(sensor_ok_ext)}
+        with self._lock:
+            prev = self.state
+            if prev == new:
+                return None
+            now = time.time() if now is None else now
+            changed = [f for f in FIELDS if prev is None or prev[f] != new[f]]
+            for f in changed:
+                self.since[f] = now
+            self.seq += 1
+            self.state = new
+            status = dict(new, sensor_ok=new["sensor_ok_main"] or new["sensor_ok_ext"],
+                          seq=self.seq, changed_at=now, since=dict(self.since))
+            utils.safe_write_json(self.path, status)
+        return {"prev": prev, "status": status, "changed": changed}
+
+
+_publishers = {}
+_publishers_lock = threading.Lock()
+
+
+def publisher(path):
+    """Ein Publisher je Statusdatei (mehrere Geräte im Collector)."""
+    with _publishers_lock:
+        pub = _publishers.get(path)
+        if pub is None:
+            pub = _publishers[path] = StatusPublisher(path)
+        return pub
+
+
+# ===============================================================
+# 👀 LESER
+# ===============================================================
+class StatusWatcher:
+    """Günstiges Pollen: stat() statt JSON-Parse, solange sich nichts ändert."""
+
+    def __init__(self, path):
+        self.path = utils.resource_path(path)
+        self._stamp = None
+        self.status = {}
+        self.seq = None
+
+    def poll(self):
+        try:
+            st = os.stat(self.path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        if stamp == self._stamp:
+            return self.status, False
+        self._stamp = stamp
+        status = (utils.safe_read_json(self.path) or {}) if stamp else {}
+        seq = status.get("seq")
+        changed = seq is None or seq != self.seq or status != self.status
+        self.status, self.seq = status, seq
+        return status, changed
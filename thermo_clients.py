@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+thermo_clients.py – austauschbare Client-Backends für den Async-Reader
+- "ble":    echter VIVOSUN THB-1S über vivosun_thermo (Standard)
+- "sim":    simuliertes Gerät (Wellenformen, Dropouts, Ext-Probe ein/aus)
+- "replay": Wiedergabe einer thermo_history.csv / GrowHub-CSV mit N× Echtzeit
+
+Auswahl über config.json:
+    "backend": "sim",
+    "simulator": {"waveform": "sine", "speed": 60, "dropout_rate": 0.01, ...},
+    "replay": {"file": "data/replay/grow_week1.csv", "speed": 120, "loop": true}
+"""
+
+import asyncio
+import bisect
+import csv
+import datetime
+import math
+import os
+import random
+import time
+from array import array
+
+import config
+
+PROBE_MAIN = 0
+PROBE_EXTERNAL = 1
+UNIT_CELSIUS = 0
+
+
+# ===============================================================
+# 🔌 INTERFACE
+# ===============================================================
+class ThermoClientBase:
+    """
+    Minimales Client-Interface, das _read_loop benötigt (wie VivosunThermoClient):
+      async with Client(device_id) as c:
+          await c.current_temperature(probe, unit) -> float | None
+          await c.current_humidity(probe)          -> float | None
+    Optional:
+      c.clock()     -> Epoch-Sekunden der Messung (Simulationszeit)
+      c.time_scale  -> Zeitraffer-Faktor; Reader teilt seine Wartezeiten dadurch
+    """
+    PROBE_MAIN = PROBE_MAIN
+    PROBE_EXTERNAL = PROBE_EXTERNAL
+    UNIT_CELSIUS = UNIT_CELSIUS
+    time_scale = 1.0
+
+    def __init__(self, device_id):
+        self.device_id = device_id
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def clock(self):
+        return time.time()
+
+    async def current_temperature(self, probe, unit=UNIT_CELSIUS):
+        raise NotImplementedError
+
+    async def current_humidity(self, probe):
+        raise NotImplementedError
+
+
+class ClientFactory:
+    """Callable(device_id) → Client, trägt die Probe-Konstanten wie vivosun_thermo."""
+    PROBE_MAIN = PROBE_MAIN
+    PROBE_EXTERNAL = PROBE_EXTERNAL
+    UNIT_CELSIUS = UNIT_CELSIUS
+
+    def __init__(self, cls, **options):
+        self.cls = cls
+        self.options = options
+
+    def __call__(self, device_id):
+        return self.cls(device_id, **self.options)
+
+    def __repr__(self):
+        return f"ClientFactory({self.cls.__name__}, {self.options})"
+
+
+class SimulatedReadError(Exception):
+    """Simulierter BLE-Lesefehler (Timeout / Verbindungsabbruch)."""
+
+
+# ===============================================================
+# 🧮 SIMULATIONSUHR
+# ===============================================================
+class _SimClock:
+    """Simulationszeit = Start + vergangene Echtzeit × speed (monotone Basis)."""
+
+    def __init__(self, start_epoch=None, speed=1.0):
+        self.speed = max(float(speed), 1e-6)
+        self.start_epoch = time.time() if start_epoch is None else float(start_epoch)
+        self._t0 = time.monotonic()
+
+    def __call__(self):
+        return self.start_epoch + (time.monotonic() - self._t0) * self.speed
+
+    def elapsed(self):
+        return self() - self.start_epoch
+
+
+# ===============================================================
+# 🧪 SIMULIERTES GERÄT
+# ===============================================================
+class SimulatedThermoClient(ThermoClientBase):
+    """
+    Synthetischer THB-1S.
+    waveform:         "sine" | "square" | "random_walk" | "constant"
+    period_s:         Periodendauer der Wellenform (Simulationszeit)
+    t_base/t_amp, h_base/h_amp, noise: Temperatur-/Feuchteverlauf
+    ext_offset_t/ext_offset_h: Abweichung des externen Fühlers
+    dropout_rate:     Wahrscheinlichkeit pro Lesezugriff für einen Lesefehler
+    connect_fail_rate: Wahrscheinlichkeit, dass der Verbindungsaufbau scheitert
+    latency_s:        simulierte BLE-Latenz pro Lesezugriff (Echtzeit)
+    ext_plug_period_s: externer Fühler wechselt alle N s zwischen ein/aus (0 = immer an)
+    ext_present:      Startzustand des externen Fühlers
+    speed:            Zeitraffer (N× Echtzeit)
+    seed:             Zufalls-Seed für reproduzierbare Läufe
+    """
+
+    # Uhr über Reconnects hinweg beibehalten (sonst springt die Simulation zurück)
+    _clocks = {}
+
+    def __init__(self, device_id, waveform="sine", period_s=3600.0,
+                 t_base=24.0, t_amp=3.0, h_base=60.0, h_amp=10.0, noise=0.1,
+                 ext_offset_t=-4.0, ext_offset_h=8.0,
+                 dropout_rate=0.0, connect_fail_rate=0.0, latency_s=0.0,
+                 ext_plug_period_s=0.0, ext_present=True, speed=1.0, seed=None):
+        super().__init__(device_id)
+        self.waveform = waveform
+        self.period_s = max(float(period_s), 1.0)
+        self.t_base, self.t_amp = float(t_base), float(t_amp)
+        self.h_base, self.h_amp = float(h_base), float(h_amp)
+        self.noise = float(noise)
+        self.ext_offset_t, self.ext_offset_h = float(ext_offset_t), float(ext_offset_h)
+        self.dropout_rate = float(dropout_rate)
+        self.connect_fail_rate = float(connect_fail_rate)
+        self.latency_s = float(latency_s)
+        self.ext_plug_period_s = float(ext_plug_period_s)
+        self.ext_present = bool(ext_present)
+        self.time_scale = max(float(speed), 1e-6)
+        self._rnd = random.Random(seed)
+        self._walk = [0.0, 0.0]
+
+        key = (device_id, self.time_scale)
+        if key not in self._clocks:
+            self._clocks[key] = _SimClock(speed=self.time_scale)
+        self.clock = self._clocks[key]
+
+    async def __aenter__(self):
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        if self._rnd.random() < self.connect_fail_rate:
+            raise SimulatedReadError("simulated connect failure")
+        return self
+
+    # --- Wellenformen ---
+    def _wave(self):
+        phase = 2 * math.pi * (self.clock.elapsed() % self.period_s) / self.period_s
+        if self.waveform == "square":
+            return 1.0 if math.sin(phase) >= 0 else -1.0
+        if self.waveform == "constant":
+            return 0.0
+        if self.waveform == "random_walk":
+            return 0.0
+        return math.sin(phase)
+
+    def _ext_plugged(self):
+        if self.ext_plug_period_s <= 0:
+            return self.ext_present
+        toggles = int(self.clock.elapsed() // self.ext_plug_period_s)
+        return self.ext_present if toggles % 2 == 0 else not self.ext_present
+
+    async def _io(self):
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        if self.dropout_rate and self._rnd.random() < self.dropout_rate:
+            raise SimulatedReadError("simulated BLE timeout")
+
+    def _value(self, base, amp, idx):
+        if self.waveform == "random_walk":
+            self._walk[idx] = max(-1.0, min(1.0, self._walk[idx] + self._rnd.gauss(0, 0.05)))
+            shape = self._walk[idx]
+        else:
+            shape = self._wave()
+        return base + amp * shape + self._rnd.gauss(0, self.noise)
+
+    async def current_temperature(self, probe, unit=UNIT_CELSIUS):
+        await self._io()
+        if probe == PROBE_EXTERNAL:
+            if not self._ext_plugged():
+                return None
+            return round(self._value(self.t_base, self.t_amp, 0) + self.ext_offset_t, 2)
+        return round(self._value(self.t_base, self.t_amp, 0), 2)
+
+    async def current_humidity(self, probe):
+        await self._io()
+        # Feuchte läuft gegenphasig zur Temperatur (wie im Zelt)
+        if probe == PROBE_EXTERNAL:
+            if not self._ext_plugged():
+                return None
+            val = self._value(self.h_base, -self.h_amp, 1) + self.ext_offset_h
+        else:
+            val = self._value(self.h_base, -self.h_amp, 1)
+        return round(min(max(val, 0.0), 100.0), 1)
+
+
+# ===============================================================
+# ⏩ REPLAY
+# ===============================================================
+_TS_FORMATS = (
+    "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M",
+    "%Y/%m/%d %H:%M:%S", "%Y/%m/%d %H:%M",
+    "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M",
+    "%m/%d/%Y %H:%M:%S", "%m/%d/%Y %H:%M",
+)
+
+
+def _parse_ts(text, fmt_hint):
+    text = text.strip()
+    if fmt_hint[0]:
+        try:
+            return datetime.datetime.strptime(text, fmt_hint[0]).timestamp()
+        except ValueError:
+            pass
+    try:
+        return datetime.datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        pass
+    for fmt in _TS_FORMATS:
+        try:
+            ts = datetime.datetime.strptime(text, fmt).timestamp()
+            fmt_hint[0] = fmt
+            return ts
+        except ValueError:
+            continue
+    return None
+
+
+def _find_col(cols, *needles, exclude=()):
+    for i, c in enumerate(cols):
+        if all(n in c for n in needles) and not any(x in c for x in exclude):
+            return i
+    return None
+
+
+def _to_float(text):
+    try:
+        v = float(text)
+        return v if not math.isnan(v) else None
+    except (TypeError, ValueError):
+        return None
+
+
+def load_replay_file(path):
+    """
+    Lädt thermo_history.csv (Timestamp, Temperature, Humidity, VPD) oder einen
+    GrowHub-Export (Inside/Outside Temp/Humidity) in kompakte array('d')-Spalten.
+    Fehlende Werte → NaN. Rückgabe: dict mit ts, t_main, h_main, t_ext, h_ext.
+    """
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [str(c).strip().lower() for c in next(reader)]
+
+        i_ts = _find_col(header, "timestamp")
+        if i_ts is None:
+            i_ts = next((i for i, c in enumerate(header) if "time" in c or "date" in c), None)
+        if i_ts is None:
+            raise ValueError(f"Keine Zeitspalte in {path}")
+
+        i_tm = _find_col(header, "inside", "temp")
+        i_hm = _find_col(header, "inside", "hum")
+        if i_tm is None:
+            i_tm = _find_col(header, "temp", exclude=("outside", "ext"))
+        if i_hm is None:
+            i_hm = _find_col(header, "hum", exclude=("outside", "ext"))
+        i_te = _find_col(header, "outside", "temp")
+        i_he = _find_col(header, "outside", "hum")
+
+        cols = {k: array("d") for k in ("ts", "t_main", "h_main", "t_ext", "h_ext")}
+        nan = float("nan")
+        fmt_hint = [None]
+        for row in reader:
+            if len(row) <= i_ts:
+                continue
+            ts = _parse_ts(row[i_ts], fmt_hint)
+            if ts is None:
+                continue
+            cols["ts"].append(ts)
+            for key, idx in (("t_main", i_tm), ("h_main", i_hm), ("t_ext", i_te), ("h_ext", i_he)):
+                v = _to_float(row[idx]) if idx is not None and idx < len(row) else None
+                cols[key].append(nan if v is None else v)
+
+    if not cols["ts"]:
+        raise ValueError(f"Keine gültigen Zeilen in {path}")
+
+    # sortieren, falls die Datei nicht chronologisch ist
+    ts = cols["ts"]
+    if any(ts[i] > ts[i + 1] for i in range(len(ts) - 1)):
+        order = sorted(range(len(ts)), key=ts.__getitem__)
+        cols = {k: array("d", (v[i] for i in order)) for k, v in cols.items()}
+    return cols
+
+
+class ReplayThermoClient(ThermoClientBase):
+    """
+    Spielt eine aufgezeichnete CSV mit `speed`× Echtzeit ab.
+    Jeder Lesezugriff liefert die letzte Zeile mit Zeitstempel ≤ Simulationszeit.
+    loop: am Dateiende von vorne beginnen (sonst letzter Wert bleibt stehen).
+    """
+
+    _cache = {}   # Pfad → geladene Spalten (über Reconnects hinweg)
+    _clocks = {}
+
+    def __init__(self, device_id, file=None, speed=60.0, loop=True):
+        super().__init__(device_id)
+        if not file:
+            raise ValueError("Replay braucht eine Datei (config.json: replay.file)")
+        # Hinweis: nicht direkt HISTORY_FILE verwenden – der Reader hängt dort
+        # laufend an (Datei bleibt über Neustarts erhalten). Vorher kopieren.
+        path = str(file)
+        if not os.path.isabs(path):
+            path = os.path.join(str(config.BASE_DIR), path)
+        self.path = path
+        self.loop = bool(loop)
+        self.time_scale = max(float(speed), 1e-6)
+
+        if path not in self._cache:
+            self._cache[path] = load_replay_file(path)
+        self.data = self._cache[path]
+        self.t_first = self.data["ts"][0]
+        self.duration = max(self.data["ts"][-1] - self.t_first, 1.0)
+
+        key = (path, self.time_scale)
+        if key not in self._clocks:
+            self._clocks[key] = _SimClock(start_epoch=self.t_first, speed=self.time_scale)
+        self._sim = self._clocks[key]
+
+    def clock(self):
+        """
+        Wiedergabezeit ab Aufnahmebeginn – monoton, auch über Schleifen hinweg
+        (seq/ts, Filterfenster, Statistik und SQLite verlangen steigende Zeit).
+        """
+        return self.t_first + self._sim.elapsed()
+
+    def _row(self):
+        """Zeile der aktuellen Aufnahme-Position (Schleife: modulo Dauer, sonst letzte Zeile)."""
+        elapsed = self._sim.elapsed()
+        if self.loop:
+            elapsed %= self.duration
+        i = bisect.bisect_right(self.data["ts"], self.t_first + elapsed) - 1
+        return max(i, 0)
+
+    def _get(self, key):
+        v = self.data[key][self._row()]
+        return None if math.isnan(v) else v
+
+    async def current_temperature(self, probe, unit=UNIT_CELSIUS):
+        return self._get("t_ext" if probe == PROBE_EXTERNAL else "t_main")
+
+    async def current_humidity(self, probe):
+        return self._get("h_ext" if probe == PROBE_EXTERNAL else "h_main")
+
+
+# ===============================================================
+# 🏭 AUSWAHL ÜBER CONFIG
+# ===============================================================
+BACKENDS = {
+    "sim": SimulatedThermoClient,
+    "replay": ReplayThermoClient,
+}
+
+
+def backend_name(cfg=None):
+    if cfg is None:
+        import utils
+        cfg = utils.safe_read_json(config.CONFIG_FILE) or {}
+    return str(cfg.get("backend", getattr(config, "CLIENT_BACKEND", "ble"))).lower()
+
+
+def client_factory_from_config(cfg=None):
+    """
+    Liefert eine ClientFactory für "sim"/"replay" oder None für "ble"
+    (dann importiert der Reader vivosun_thermo selbst).
+    """
+    if cfg is None:
+        import utils
+        cfg = utils.safe_read_json(config.CONFIG_FILE) or {}
+    name = backend_name(cfg)
+    if name not in BACKENDS:
+        return None
+    section = "simulator" if name == "sim" else name
+    options = dict(getattr(config, "SIMULATOR_DEFAULTS", {})) if name == "sim" else {}
+    options.update(cfg.get(section) or {})
+    return ClientFactory(BACKENDS[name], **options)
@@ -6,12 +6,9 @@ utils.py – zentrale Hilfsfunktionen für 🌱 VIVOSUN Dashboard
 """
 
 import json, math, os, csv, sys
-try:
-    import tkinter as tk
-except Exception:
-    tk = None
 
 import config
+import perf
 
 
 # ===============================================================
@@ -38,11 +35,12 @@ def safe_read_json(path):
 
 
 def safe_write_json(path, obj):
-    full_path = resource_path(path)
-    tmp = full_path + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(obj, f, indent=4)
-    os.replace(tmp, full_path)
+    with perf.timer("json_write"):
+        full_path = resource_path(path)
+        tmp = full_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(obj, f, indent=4)
+        os.replace(tmp, full_path)
 
 
 # ===============================================================
@@ -54,6 +52,7 @@ def c_to_f(c): return c * 9.0 / 5.0 + 32.0
 # ===============================================================
 # 💧 VPD CALCULATION
 # ===============================================================
+@perf.timed("vpd_calc")
 def calc_vpd(temp_c, rh):
     if temp_c is None or rh is None:
         return None
@@ -66,13 +65,14 @@ def calc_vpd(temp_c, rh):
 # ===============================================================
 def append_csv_row(path, header, row):
     try:
-        full_path = resource_path(path)
-        file_exists = os.path.exists(full_path)
-        with open(full_path, "a", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            if not file_exists:
-                writer.writerow(header)
-            writer.writerow(row)
+        with perf.timer("csv_append"):
+            full_path = resource_path(path)
+            file_exists = os.path.exists(full_path)
+            with open(full_path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                if not file_exists:
+                    writer.writerow(header)
+                writer.writerow(row)
     except Exception as e:
         raise RuntimeError(f"CSV append failed for {path}: {e}")
 
@@ -90,15 +90,20 @@ class OffsetManager:
             cls._instance = super(OffsetManager, cls).__new__(cls)
             cls._instance.leaf_offset = 0.0
             cls._instance.hum_offset = 0.0
+            cls._instance.version = 0      # +1 bei jeder echten Änderung (Caches, derived.py)
             cls._instance._callbacks = []  # Widgets, die benachrichtigt werden
         return cls._instance
 
+    def _bump(self, leaf, hum):
+        if (leaf, hum) != (self.leaf_offset, self.hum_offset):
+            self.version += 1
+        self.leaf_offset, self.hum_offset = leaf, hum
+        config.leaf_offset_c[0] = leaf
+        config.humidity_offset[0] = hum
+
     def load_from_config(self):
         cfg = safe_read_json(config.CONFIG_FILE) or {}
-        self.leaf_offset = float(cfg.get("leaf_offset", 0.0))
-        self.hum_offset = float(cfg.get("humidity_offset", 0.0))
-        config.leaf_offset_c[0] = self.leaf_offset
-        config.humidity_offset[0] = self.hum_offset
+        self._bump(float(cfg.get("leaf_offset", 0.0)), float(cfg.get("humidity_offset", 0.0)))
 
     def save_to_config(self):
         cfg = safe_read_json(config.CONFIG_FILE) or {}
@@ -119,12 +124,10 @@ class OffsetManager:
                 pass
 
     def set_offsets(self, leaf=None, hum=None, persist=True):
-        if leaf is not None:
-            self.leaf_offset = float(leaf)
-            config.leaf_offset_c[0] = self.leaf_offset
-        if hum is not None:
-            self.hum_offset = float(hum)
-            config.humidity_offset[0] = self.hum_offset
+        self._bump(
+            self.leaf_offset if leaf is None else float(leaf),
+            self.hum_offset if hum is None else float(hum),
+        )
         if persist:
             self.save_to_config()
         self.notify()
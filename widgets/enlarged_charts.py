@@ -16,7 +16,13 @@ import datetime
 import os
 import math
 
+import perf
+import metrics
+import rolling_stats
+import scheduler
+
 from widgets.footer_widget import create_footer
+from status import StatusWatcher
 
 
 # -------------------------------------------------------------------
@@ -46,6 +52,39 @@ def open_window(parent, data_buffers, focus_key="t_main"):
                           time_buffer=time_buffer, unit_celsius=unit_celsius)
 
 
+# -------------------------------------------------------------------
+# Plot-Helfer (ohne Tk nutzbar, z. B. für Benchmarks)
+# -------------------------------------------------------------------
+def _c_to_f(c): return c * 9.0 / 5.0 + 32.0
+
+
+def build_series(values, is_temp, celsius=True):
+    """Wandelt Pufferwerte in Plot-Werte (None/NaN → NaN, Temp ggf. in °F)."""
+    ys = []
+    for v in values:
+        if v is None or (isinstance(v, float) and math.isnan(v)):
+            ys.append(float("nan"))
+        elif is_temp and not celsius:
+            ys.append(_c_to_f(v))
+        else:
+            ys.append(v)
+    return ys
+
+
+def apply_series(ax, line, xs, ys, span_days):
+    """Setzt Linie, X-Fenster (span_days) und Y-Skalierung auf die gültigen Werte."""
+    line.set_data(xs, ys)
+    right, left = xs[-1], xs[-1] - span_days
+    ax.set_xlim(left, right)
+
+    # Y-Skalierung auf sichtbare Daten (ignoriere NaNs)
+    y_valid = [y for y in ys if y is not None and not (isinstance(y, float) and math.isnan(y))]
+    if y_valid:
+        y_min, y_max = min(y_valid), max(y_valid)
+        pad = (y_max - y_min) * 0.2 if y_max != y_min else 0.5
+        ax.set_ylim(y_min - pad, y_max + pad)
+
+
 # -------------------------------------------------------------------
 # Hauptfenster
 # -------------------------------------------------------------------
@@ -112,7 +151,23 @@ def _open_enlarged(parent, config, utils,
         zorder=5,
     )
 
+    # Rollierende Statistik (alle Fenster, aus rolling_stats)
+    stats_label = ax.text(
+        0.02, 0.80, "",
+        transform=ax.transAxes,
+        color=config.TEXT,
+        fontsize=11,
+        family="monospace",
+        va="top", ha="left",
+        path_effects=[path_effects.withStroke(linewidth=3, foreground="black")],
+        zorder=5,
+    )
+    stats = rolling_stats.get_engine()
+
     line, = ax.plot([], [], color=color, linewidth=2.3, alpha=0.95)
+    # Auffällige Werte (filters.py: range/spike/stuck) als Marker
+    suspect_line, = ax.plot([], [], linestyle="none", marker="x", markersize=9,
+                            markeredgewidth=2, color="#ff3030", zorder=4)
 
     canvas = FigureCanvasTkAgg(fig, master=win)
     canvas.get_tk_widget().pack(fill="both", expand=True, padx=8, pady=8)
@@ -183,17 +238,17 @@ def _open_enlarged(parent, config, utils,
     # NEU: aktuelles Footer-Interface (3 Rückgaben)
     set_status, mark_data_update, set_sensor_status = create_footer(bottom, config)
 
-    # ---------- STATUS-POLL (debounced wie Test-Window) ----------
+    # ---------- STATUS-POLL (debounced wie Test-Window, Parse nur bei Übergang) ----------
+    status_watcher = StatusWatcher(config.STATUS_FILE)
+
     def poll_status():
         if not hasattr(poll_status, "_fail_counter"):
             poll_status._fail_counter = 0
             poll_status._last_connected = None
 
         try:
-            status = utils.safe_read_json(config.STATUS_FILE) or {}
+            status, changed = status_watcher.poll()
             connected = bool(status.get("connected", False))
-            main_ok  = bool(status.get("sensor_ok_main", False))
-            ext_ok   = bool(status.get("sensor_ok_ext", False))
 
             if connected:
                 poll_status._fail_counter = 0
@@ -202,9 +257,12 @@ def _open_enlarged(parent, config, utils,
                 poll_status._fail_counter += 1
                 smooth = poll_status._fail_counter >= 3 and False or poll_status._last_connected
 
+            if changed or smooth != poll_status._last_connected:
+                set_status(smooth)
+            if changed:
+                set_sensor_status(bool(status.get("sensor_ok_main", False)),
+                                  bool(status.get("sensor_ok_ext", False)))
             poll_status._last_connected = smooth
-            set_status(smooth)
-            set_sensor_status(main_ok, ext_ok)
         except Exception:
             # leise bleiben
             pass
@@ -215,14 +273,29 @@ def _open_enlarged(parent, config, utils,
 
     # ---------- UPDATE ----------
     _prev_span = [span_choice.get()]
+    _drawn = [None]
 
-    def _c_to_f(c): return c * 9.0 / 5.0 + 32.0
+    def frame_delay():
+        """Redraw-Takt: höchstens max_fps des Energieprofils, mindestens 1 s."""
+        max_fps = float(scheduler.power_profile().get("max_fps") or 1.0)
+        return int(max(1000.0, 1000.0 / max(max_fps, 0.01)))
 
+    @perf.timed("render.enlarged")
+    @metrics.frame_timer("enlarged")
     def update():
         if paused.get():
             win.after(1000, update)
             return
 
+        # Nur neu zeichnen, wenn neue Daten / anderes Fenster / andere Einheit
+        stamps = data_buffers.get("timestamps", [])
+        view = (len(stamps), stamps[-1] if stamps else None, tuple(data_buffers.get(key, [])[-1:]),
+                span_choice.get(), unit_celsius.get())
+        if view == _drawn[0]:
+            win.after(frame_delay(), update)
+            return
+        _drawn[0] = view
+
         # time_buffer regelmäßig aktualisieren (Referenz aus charts_gui)
         time_buffer[:] = data_buffers.get("timestamps", [])
         xs_num = mdates.date2num(time_buffer)
@@ -230,31 +303,16 @@ def _open_enlarged(parent, config, utils,
         xs.extend(xs_num)
 
         # Y-Werte erstellen (NaNs sauber behandeln)
-        ys = []
-        for v in data_buffers.get(key, []):
-            if v is None or (isinstance(v, float) and math.isnan(v)):
-                ys.append(float("nan"))
-            elif key in ("t_main", "t_ext"):
-                # Temp ggf. in °F darstellen
-                val = v if unit_celsius.get() else _c_to_f(v)
-                ys.append(val)
-            else:
-                ys.append(v)
+        ys = build_series(data_buffers.get(key, []), key in ("t_main", "t_ext"), unit_celsius.get())
 
         # Plot aktualisieren
         if xs and ys:
-            line.set_data(xs, ys)
             span_days = SPANS_DAYS.get(span_choice.get(), 1 / 24)
-            right, left = xs[-1], xs[-1] - span_days
-            ax.set_xlim(left, right)
-
-            # Y-Skalierung auf sichtbare Daten
-            # (ignoriere NaNs)
-            y_valid = [y for y in ys if y is not None and not (isinstance(y, float) and math.isnan(y))]
-            if y_valid:
-                y_min, y_max = min(y_valid), max(y_valid)
-                pad = (y_max - y_min) * 0.2 if y_max != y_min else 0.5
-                ax.set_ylim(y_min - pad, y_max + pad)
+            apply_series(ax, line, xs, ys, span_days)
+            flags = data_buffers.get("suspect", [])[-len(ys):]
+            marked = [(x, y) for x, y, f in zip(xs[-len(flags):], ys[-len(flags):], flags)
+                      if key in f and y is not None and not math.isnan(y)]
+            suspect_line.set_data([m[0] for m in marked], [m[1] for m in marked])
 
             # Zeitformatierung neu anwenden, wenn Fenster gewechselt
             if span_choice.get() != _prev_span[0]:
@@ -277,13 +335,21 @@ def _open_enlarged(parent, config, utils,
             # Keine Daten → Achse stehen lassen, Label leeren
             value_label.set_text("--")
 
+        # Statistikzeilen (Werte kommen aus dem Charts-Tick, hier nur lesen)
+        snap = stats.snapshot(datetime.datetime.now().timestamp()).get(key, {})
+        decimals = 2 if key.startswith("vpd") else 1
+        stats_label.set_text("\n".join(
+            rolling_stats.format_summary(st, key, unit_celsius.get(), decimals, f"{name:>4}")
+            for name, st in snap.items()
+        ))
+
         try:
             mark_data_update()
         except Exception:
             pass
 
         canvas.draw_idle()
-        win.after(1000, update)
+        win.after(frame_delay(), update)
 
     # Initiale Formatierung & Start
     apply_locator(SPANS_DAYS[span_choice.get()])
@@ -3,16 +3,19 @@
 """
 footer_widget.py – universelles Footer-Widget für VIVOSUN Dashboard & Module
 Zeigt Verbindungsstatus + interne & externe Sensorzustände an.
-Lesbar aus status.json (connected, sensor_ok_main, sensor_ok_ext)
+Lesbar aus status.json (connected, sensor_ok_main, sensor_ok_ext) – über
+status.StatusWatcher, geparst wird nur bei einem neuen Statusübergang.
 """
 
 import tkinter as tk
 import webbrowser
 import datetime
-import utils, config
+import config
+from status import StatusWatcher
 
 
 def create_footer(parent, config):
+    watcher = StatusWatcher(config.STATUS_FILE)
     footer = tk.Frame(parent, bg=config.CARD)
     footer.pack(side="bottom", fill="x", padx=10, pady=6)
 
@@ -83,10 +86,8 @@ def create_footer(parent, config):
             poll_status._last_connected = None
 
         try:
-            status = utils.safe_read_json(config.STATUS_FILE) or {}
+            status, changed = watcher.poll()
             connected = status.get("connected", False)
-            main_ok = status.get("sensor_ok_main", False)
-            ext_ok = status.get("sensor_ok_ext", False)
 
             # --- Glättung (Debounce) ---
             if connected:
@@ -101,8 +102,10 @@ def create_footer(parent, config):
                         set_status(False)
                     poll_status._last_connected = False
 
-            # --- Sensorstatus direkt aktualisieren ---
-            set_sensor_status(main_ok, ext_ok)
+            # --- Sensorstatus nur bei Übergang aktualisieren ---
+            if changed:
+                set_sensor_status(status.get("sensor_ok_main", False),
+                                  status.get("sensor_ok_ext", False))
 
         except Exception as e:
             print(f"⚠️ Footer Poll Error: {e}")
@@ -111,7 +114,7 @@ def create_footer(parent, config):
 
     # ---------- INITIAL STATUS ----------
     try:
-        current = utils.safe_read_json(config.STATUS_FILE) or {}
+        current, _ = watcher.poll()
         set_status(current.get("connected"))
         set_sensor_status(
             current.get("sensor_ok_main", False),
@@ -16,6 +16,7 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.dates as mdates
 from widgets.footer_widget import create_footer_light
+import perf
 
 # ---------- Globale Helper ----------
 def _find_time_col(cols):
@@ -55,6 +56,29 @@ def _parse_ts_series(s):
     return pd.to_datetime(s, errors="coerce", dayfirst=True)
 
 
+def load_growhub_csv(path):
+    """Lädt eine GrowHub-CSV → DataFrame mit Spalte "timestamp" + numerischen Werten."""
+    with perf.timer("growhub.load"):
+        df = pd.read_csv(path)
+        df.columns = [str(c).strip().lower() for c in df.columns]
+
+        time_col = _find_time_col(df.columns)
+        if not time_col:
+            raise ValueError("Keine Zeitspalte gefunden.")
+        ts = _parse_ts_series(df[time_col])
+        if ts.isna().all():
+            raise ValueError("Konnte keine gültigen Zeitstempel parsen.")
+
+        df[time_col] = ts
+        df = df.dropna(subset=[time_col]).sort_values(time_col)
+        df = df.rename(columns={time_col: "timestamp"})
+
+        for c in df.columns:
+            if c != "timestamp":
+                df[c] = pd.to_numeric(df[c], errors="coerce")
+        return df
+
+
 # ---------- Main Window ----------
 _current_csv_window = None
 
@@ -178,24 +202,7 @@ def open_window(parent, config=None):
         if not path:
             return
         try:
-            df = pd.read_csv(path)
-            df.columns = [str(c).strip().lower() for c in df.columns]
-
-            time_col = _find_time_col(df.columns)
-            if not time_col:
-                raise ValueError("Keine Zeitspalte gefunden.")
-            ts = _parse_ts_series(df[time_col])
-            if ts.isna().all():
-                raise ValueError("Konnte keine gültigen Zeitstempel parsen.")
-
-            df[time_col] = ts
-            df = df.dropna(subset=[time_col]).sort_values(time_col)
-            df = df.rename(columns={time_col: "timestamp"})
-
-            for c in df.columns:
-                if c != "timestamp":
-                    df[c] = pd.to_numeric(df[c], errors="coerce")
-
+            df = load_growhub_csv(path)
             x_full_range = (df["timestamp"].min(), df["timestamp"].max())
             messagebox.showinfo("CSV geladen", f"{len(df)} Zeilen geladen.")
             reset_view()
@@ -211,6 +218,7 @@ def open_window(parent, config=None):
                 return col
         return None
 
+    @perf.timed("render.growhub")
     def update_chart():
         nonlocal df
         ax.clear()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+perf_overlay.py – ⏱️ Live-Overlay der Performance-Messwerte (perf.py)
+Kleines, immer-oben Fenster mit Timer-Tabelle (ms) und Countern.
+Öffnen aktiviert die Messung, Schließen stellt den vorherigen Zustand wieder her.
+"""
+
+import tkinter as tk
+
+import config
+import perf
+
+_overlay = [None]
+
+
+def toggle_overlay(parent):
+    """Öffnet das Overlay bzw. schließt es, wenn es schon offen ist."""
+    win = _overlay[0]
+    if win is not None:
+        try:
+            if win.winfo_exists():
+                win.close()
+                return None
+        except Exception:
+            pass
+    return open_window(parent)
+
+
+def open_window(parent, refresh_ms=1000):
+    was_enabled = perf.is_enabled()
+    perf.enable(True)
+
+    win = tk.Toplevel(parent)
+    win.title("⏱️ VIVOSUN – Performance")
+    win.geometry("560x420")
+    win.configure(bg=config.BG)
+    try:
+        win.attributes("-topmost", True)
+    except Exception:
+        pass
+
+    text = tk.Label(
+        win,
+        text="⏳ Sammle Messwerte …",
+        bg=config.CARD,
+        fg=config.TEXT,
+        font=("Consolas", 10),
+        justify="left",
+        anchor="nw",
+    )
+    text.pack(fill="both", expand=True, padx=8, pady=8)
+
+    ctrl = tk.Frame(win, bg=config.BG)
+    ctrl.pack(side="bottom", fill="x", pady=(0, 8))
+    tk.Button(ctrl, text="🧹 Reset", command=perf.reset,
+              bg="orange", fg="black", font=("Segoe UI", 10, "bold")).pack(side="left", padx=8)
+
+    def refresh():
+        try:
+            if not win.winfo_exists():
+                return
+            text.config(text=perf.format_table())
+        except tk.TclError:
+            return
+        win.after(refresh_ms, refresh)
+
+    def close():
+        perf.enable(was_enabled)
+        _overlay[0] = None
+        try:
+            win.destroy()
+        except Exception:
+            pass
+
+    win.close = close
+    win.protocol("WM_DELETE_WINDOW", close)
+    _overlay[0] = win
+    refresh()
+    return win
@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 """
 scattered_chart_widget.py – VPD Comfort Chart Widget (modern VIVOSUN Edition)
-- nutzt zentrale utils.calc_vpd()
+- Live-Punkt (Blatttemp., Feuchte mit Offset) aus derived.py, VPD wie der Hintergrund
 - sauberes Contour-Design (Theme-basiert)
 - Live-Punkte mit sanfter Animation
 - Header-Sync & Offsets
@@ -18,7 +18,8 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.colors import ListedColormap
 
-import utils, config
+import utils, config, perf, metrics, derived
+from status import StatusWatcher
 
 
 # --- Optionaler Header-Sync ---
@@ -42,14 +43,38 @@ def _read_unit_flag():
 def _c_to_f(c): return c * 9.0 / 5.0 + 32.0
 
 
+@perf.timed("vpd_background")
+def build_vpd_background(fig, ax, unit_celsius=True, text_color="white", resolution=300):
+    """Zeichnet die VPD-Komfortzonen (Contour + Colorbar). Ohne Tk nutzbar."""
+    temps_c = np.linspace(10, 40, resolution)
+    temps_disp = temps_c if unit_celsius else _c_to_f(temps_c)
+    hums = np.linspace(0, 100, resolution)
+    T_c, H = np.meshgrid(temps_c, hums)
+
+    # Luft-VPD wie utils.calc_vpd, vektorisiert über das ganze Raster (derived.py)
+    VPD = derived.derive_arrays(T_c, H)["vpd_air"]
+
+    cmap = ListedColormap([
+        "#005522", "#1b7837", "#5aae61", "#a6dba0",
+        "#fddbc7", "#f4a582", "#d6604d", "#b2182b"
+    ])
+
+    T_disp, H_disp = np.meshgrid(temps_disp, hums)
+    contour = ax.contourf(T_disp, H_disp, VPD, levels=np.linspace(0, 4, 60), cmap=cmap, alpha=0.9)
+
+    cbar = fig.colorbar(contour, ax=ax)
+    cbar.set_label("VPD (kPa)", color=text_color)
+    for t in cbar.ax.get_yticklabels():
+        t.set_color(text_color)
+    return contour
+
+
 def create_scattered_chart(parent, config=config):
     """Erstellt das Scatter-VPD-Diagramm und gibt (frame, reset, stop) zurück."""
     frame = tk.Frame(parent, bg=config.BG)
 
-    # --- Einheiten + Offsets ---
+    # --- Einheiten ---
     unit_celsius = _read_unit_flag()
-    leaf_off_c = float(getattr(config, "leaf_offset_c", [0.0])[0])
-    hum_off = float(getattr(config, "humidity_offset", [0.0])[0])
 
     # --- Figure Setup ---
     fig, ax = plt.subplots(figsize=(9, 7), facecolor=config.BG)
@@ -62,25 +87,7 @@ def create_scattered_chart(parent, config=config):
     ax.set_ylabel("Relative Humidity (%)", color=config.TEXT)
 
     # --- Contour vorbereiten ---
-    temps_c = np.linspace(10, 40, 300)
-    temps_disp = temps_c if unit_celsius else _c_to_f(temps_c)
-    hums = np.linspace(0, 100, 300)
-    T_c, H = np.meshgrid(temps_c, hums)
-
-    # zentrale VPD-Berechnung
-    VPD = np.vectorize(utils.calc_vpd)(T_c, H)
-
-    cmap = ListedColormap([
-        "#005522", "#1b7837", "#5aae61", "#a6dba0",
-        "#fddbc7", "#f4a582", "#d6604d", "#b2182b"
-    ])
-
-    T_disp, H_disp = np.meshgrid(temps_disp, hums)
-    contour = ax.contourf(T_disp, H_disp, VPD, levels=np.linspace(0, 4, 60), cmap=cmap, alpha=0.9)
-
-    cbar = fig.colorbar(contour, ax=ax)
-    cbar.set_label("VPD (kPa)", color=config.TEXT)
-    plt.setp(plt.getp(cbar.ax, "yticklabels"), color=config.TEXT)
+    build_vpd_background(fig, ax, unit_celsius, text_color=config.TEXT)
 
     # --- Punkte ---
     internal_dot = ax.scatter([], [], s=140, color="#00FF7F", edgecolor="black", label="Internal")
@@ -111,6 +118,8 @@ def create_scattered_chart(parent, config=config):
     canvas.get_tk_widget().pack(fill="both", expand=True, padx=8, pady=6)
 
     # --- Sanftes Status-Glätten ---
+    status_watcher = StatusWatcher(config.STATUS_FILE)
+
     def _smooth_connected(curr):
         if not hasattr(_smooth_connected, "_counter"):
             _smooth_connected._counter, _smooth_connected._state = 0, True
@@ -124,24 +133,23 @@ def create_scattered_chart(parent, config=config):
 
     # --- Update ---
 # --- Update ---
+    @perf.timed("render.scatter")
+    @metrics.frame_timer("scatter")
     def update_chart():
         try:
             # --- Status prüfen ---
-            status = utils.safe_read_json(config.STATUS_FILE) or {}
+            status, _ = status_watcher.poll()
             connected_raw = bool(status.get("connected", False))
             sensor_ok_main = bool(status.get("sensor_ok_main", False))
             sensor_ok_ext = bool(status.get("sensor_ok_ext", False))
             connected = _smooth_connected(connected_raw)
 
-            # --- Daten + Offsets dynamisch laden ---
+            # --- Daten + aktuelle Offsets der GUI ---
             d = utils.safe_read_json(config.DATA_FILE) or {}
             cfg = utils.safe_read_json(config.CONFIG_FILE) or {}
 
             ti, hi = d.get("t_main"), d.get("h_main")
             te, he = d.get("t_ext"), d.get("h_ext")
-
-            leaf_off_c = float(cfg.get("leaf_offset", 0.0))
-            hum_off = float(cfg.get("humidity_offset", 0.0))
             unit_celsius = bool(cfg.get("unit_celsius", True))
 
             if not connected:
@@ -152,11 +160,11 @@ def create_scattered_chart(parent, config=config):
                 frame.after(2000, update_chart)
                 return
 
-            # --- Interner Sensor ---
+            # --- Interner Sensor (VPD am Punkt = Wert des Hintergrunds an dieser Stelle) ---
+            leaf_off_c, hum_off = derived.current_offsets()
             vpd_int = vpd_ext = None
             if sensor_ok_main and ti is not None and hi is not None:
-                ti_eff = ti + leaf_off_c
-                hi_eff = min(max(hi + hum_off, 0), 100)  # clamp 0–100 %
+                hi_eff, ti_eff = derived.probe_values(ti, hi, leaf_off_c, hum_off)[:2]
                 internal_dot.set_offsets([[ti_eff if unit_celsius else _c_to_f(ti_eff), hi_eff]])
                 vpd_int = utils.calc_vpd(ti_eff, hi_eff)
             else:
@@ -164,8 +172,7 @@ def create_scattered_chart(parent, config=config):
 
             # --- Externer Sensor ---
             if sensor_ok_ext and te is not None and he is not None:
-                te_eff = te + leaf_off_c
-                he_eff = min(max(he + hum_off, 0), 100)
+                he_eff, te_eff = derived.probe_values(te, he, leaf_off_c, hum_off)[:2]
                 external_dot.set_offsets([[te_eff if unit_celsius else _c_to_f(te_eff), he_eff]])
                 vpd_ext = utils.calc_vpd(te_eff, he_eff)
             else:
@@ -22,7 +22,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from widgets.footer_widget import create_footer
-import config, utils, icon_loader
+import config, utils, icon_loader, perf, derived
 
 # --- Header-Sync importieren (bidirektional) ---
 try:
@@ -230,6 +230,7 @@ def open_window(parent, config=config, utils=utils):
         set_status = mark_data_update = lambda *a, **k: None
 
 # ---------- UPDATE LOOP ----------
+    @perf.timed("render.scatter_old")
     def update():
         # --- Sanftes Status-Glätten (3 Polls Toleranz) ---
         if not hasattr(update, "_disconnect_counter"):
@@ -272,8 +273,6 @@ def open_window(parent, config=config, utils=utils):
 
         # --- Daten prüfen ---
         d = utils.safe_read_json(config.DATA_FILE) or {}
-        leaf_off = float(config.leaf_offset_c[0])
-        hum_off = float(config.humidity_offset[0])
 
         ti, hi = d.get("t_main"), d.get("h_main")
         te, he = d.get("t_ext"), d.get("h_ext")
@@ -299,19 +298,20 @@ def open_window(parent, config=config, utils=utils):
             win.after(3000, update)
             return
 
-        # --- Interner Sensor ---
+        # --- Interner Sensor (aktuelle Offsets; VPD wie der Hintergrund am Punkt) ---
+        leaf_off_c, hum_off = derived.current_offsets()
         if sensor_ok_main and ti is not None and hi is not None:
-            ti_eff, hi_eff = ti + leaf_off, hi + hum_off
+            hi_eff, ti_eff = derived.probe_values(ti, hi, leaf_off_c, hum_off)[:2]
             internal_dot.set_offsets([[ti_eff, hi_eff]])
-            vpd_int = utils.calc_vpd(ti_eff, hi_eff)
+            vpd_int = calc_vpd(ti_eff, hi_eff)
         else:
             internal_dot.set_offsets(np.empty((0, 2)))
 
         # --- Externer Sensor ---
         if sensor_ok_ext and te is not None and he is not None:
-            te_eff, he_eff = te + leaf_off, he + hum_off
+            he_eff, te_eff = derived.probe_values(te, he, leaf_off_c, hum_off)[:2]
             external_dot.set_offsets([[te_eff, he_eff]])
-            vpd_ext = utils.calc_vpd(te_eff, he_eff)
+            vpd_ext = calc_vpd(te_eff, he_eff)
         else:
             external_dot.set_offsets(np.empty((0, 2)))
 
@@ -9,7 +9,7 @@ mit klarer 3-Achsen-Darstellung, schöner Auflösung & Echtzeit-Infobox.
 import tkinter as tk
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import utils, config, math
+import utils, config, math, perf
 
 # --- Matplotlib Optik ---
 plt.rcParams["lines.antialiased"] = True
@@ -113,6 +113,7 @@ def create_chart_widget(parent, theme=None, config=config, utils=utils):
     # =========================================================
     # 📡 POLL LOOP
     # =========================================================
+    @perf.timed("render.test_chart")
     def poll_chart():
         if not _running[0]:
             return
@@ -126,23 +127,16 @@ def create_chart_widget(parent, theme=None, config=config, utils=utils):
 
             cfg = utils.safe_read_json(config.CONFIG_FILE) or {}
             use_celsius = cfg.get("unit_celsius", True)
-            leaf_off = float(cfg.get("leaf_offset", 0.0))
-            hum_off = float(cfg.get("humidity_offset", 0.0))
 
+            # Daten puffern – Blatttemperatur, Feuchte mit Offset und VPD kommen
+            # fertig aus dem Reader (derived.py)
             d = utils.safe_read_json(config.DATA_FILE) or {}
-            t_main, h_main, t_ext, h_ext = d.get("t_main"), d.get("h_main"), d.get("t_ext"), d.get("h_ext")
-
-            # Daten puffern
-            add(data["t_main"], t_main + leaf_off if t_main is not None else None)
-            add(data["t_ext"], t_ext + leaf_off if t_ext is not None else None)
-            add(data["h_main"], h_main + hum_off if h_main is not None else None)
-            add(data["h_ext"], h_ext + hum_off if h_ext is not None else None)
-
-            # VPD berechnen
-            vi = utils.calc_vpd(last(data["t_main"]), last(data["h_main"]))
-            ve = utils.calc_vpd(last(data["t_ext"]), last(data["h_ext"]))
-            add(data["vpd_int"], vi)
-            add(data["vpd_ext"], ve)
+            add(data["t_main"], d.get("t_main_leaf"))
+            add(data["t_ext"], d.get("t_ext_leaf"))
+            add(data["h_main"], d.get("h_main_adj"))
+            add(data["h_ext"], d.get("h_ext_adj"))
+            add(data["vpd_int"], d.get("vpd_int"))
+            add(data["vpd_ext"], d.get("vpd_ext"))
 
             # --- Plot ---
             ax_temp.clear(); ax_hum.clear(); ax_vpd.clear()